@@ -0,0 +1,124 @@
+"""
+Activity log retention and archival.
+
+ActivityLog entries older than their organization's retention period are
+moved out of the live table into gzip-compressed NDJSON files, one per local
+day:
+
+    ACTIVITY_LOG_ARCHIVE_DIR/org_<id>/<YYYY>/<YYYY-MM-DD>.ndjson.gz
+
+Each line is the entry's to_api_dict(). Entries logged without an
+organization (failed logins) go under ``org_none`` with the default period.
+
+Retention is Organization.activity_log_retention_days when set, otherwise
+ACTIVITY_LOG_RETENTION_DAYS[<subscription plan>] ('default' for orgs without
+a subscription).
+
+Entries are archived oldest first in batches: a batch is appended to its day
+files as one gzip member per file, synced to disk, and only then deleted
+(their search tokens go with them). A run interrupted between the two steps
+re-archives that batch next time, so readers should de-duplicate on ``id``.
+
+Run it daily with `manage.py archive_activity_log`, or call
+``archive_expired()`` from any scheduler.
+"""
+import gzip
+import json
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+BATCH_SIZE = 5000
+
+
+def archive_root():
+    return Path(getattr(settings, 'ACTIVITY_LOG_ARCHIVE_DIR',
+                        Path(settings.BASE_DIR) / 'archive' / 'activity_log'))
+
+
+def _plan_days():
+    return getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', {'default': 365})
+
+
+def retention_by_org(org_ids):
+    """{org_id: days its entries stay in the live table} (None = no organization)."""
+    from subscription.models import Subscription
+
+    from .models import Organization
+
+    plan_days = _plan_days()
+    default = plan_days['default']
+    ids = [pk for pk in org_ids if pk is not None]
+    overrides = dict(
+        Organization.objects.filter(pk__in=ids, activity_log_retention_days__isnull=False)
+        .values_list('pk', 'activity_log_retention_days')
+    )
+    plans = dict(
+        Subscription.objects.filter(organization_id__in=ids)
+        .values_list('organization_id', 'plan')
+    )
+    return {
+        pk: overrides[pk] if pk in overrides else plan_days.get(plans.get(pk), default)
+        for pk in org_ids
+    }
+
+
+def day_path(org_id, day):
+    return archive_root() / f'org_{org_id or "none"}' / f'{day:%Y}' / f'{day:%Y-%m-%d}.ndjson.gz'
+
+
+def _append(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = gzip.compress(''.join(lines).encode())
+    with open(path, 'ab') as fh:
+        fh.write(payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def archive_org(org_id, before, dry_run=False):
+    """
+    Move ``org_id``'s entries logged before ``before`` to the archive.
+    Returns how many were archived (or would be, with ``dry_run``).
+    """
+    from .models import ActivityLog
+
+    expired = ActivityLog.objects.filter(organization_id=org_id, timestamp__lt=before)
+    if dry_run:
+        return expired.count()
+    archived = 0
+    while True:
+        batch = list(expired.order_by('timestamp', 'id')[:BATCH_SIZE])
+        if not batch:
+            return archived
+        days = {}
+        for log in batch:
+            line = json.dumps(log.to_api_dict(), separators=(',', ':')) + '\n'
+            days.setdefault(timezone.localdate(log.timestamp), []).append(line)
+        for day, lines in days.items():
+            _append(day_path(org_id, day), lines)
+        ActivityLog.objects.filter(pk__in=[log.pk for log in batch]).delete()
+        archived += len(batch)
+
+
+def archive_expired(org_id=None, now=None, dry_run=False):
+    """
+    Archive every organization's entries past its retention period, or only
+    ``org_id``'s. Returns {org_id: entries archived} for orgs with any.
+    """
+    from .models import Organization
+
+    now = now or timezone.now()
+    if org_id is not None:
+        org_ids = [org_id]
+    else:
+        org_ids = [*Organization.objects.values_list('pk', flat=True), None]
+    results = {}
+    for pk, days in retention_by_org(org_ids).items():
+        archived = archive_org(pk, now - timedelta(days=days), dry_run=dry_run)
+        if archived:
+            results[pk] = archived
+    return results
@@ -0,0 +1,169 @@
+"""
+Buffered ActivityLog writer.
+
+log_activity() runs on the request path of nearly every write endpoint.
+Instead of one INSERT per call, it hands an unsaved ActivityLog to
+``submit(entry)``:
+
+- once the surrounding transaction commits (entries of a rolled-back request
+  are dropped, as before) the entry is queued in process;
+- a background thread writes the queue with ``bulk_create`` whenever
+  ACTIVITY_LOG_BATCH_SIZE entries are waiting, or at least every
+  ACTIVITY_LOG_FLUSH_SECONDS;
+- when ACTIVITY_LOG_MAX_PENDING entries are already waiting (database slow
+  or down) the entry is written synchronously rather than growing the queue
+  without bound;
+- ``flush()`` is registered with atexit, so a clean shutdown writes whatever
+  is still queued. A killed process (SIGKILL, OOM) loses at most the entries
+  of the last interval.
+
+Each batch is written together with its search tokens (activity_search) in
+one transaction, with one bulk insert. Backends that cannot return ids from
+a bulk insert (MySQL) read the new ids back with one range query on
+(organization, timestamp) — see _insert_fetching_ids().
+
+The timestamp is set when the entry is built, not when it is written.
+ACTIVITY_LOG_BUFFERED = False writes every entry synchronously (dev, tests).
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import Max
+
+logger = logging.getLogger(__name__)
+
+_queue = None
+_pid = None
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def _buffered():
+    return getattr(settings, 'ACTIVITY_LOG_BUFFERED', True)
+
+
+def _batch_size():
+    return getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 50)
+
+
+def _interval():
+    return getattr(settings, 'ACTIVITY_LOG_FLUSH_SECONDS', 2)
+
+
+def _max_pending():
+    return getattr(settings, 'ACTIVITY_LOG_MAX_PENDING', 1000)
+
+
+def submit(entry):
+    """Write the unsaved ActivityLog ``entry`` once the current transaction commits."""
+    if not _buffered():
+        _write([entry])
+        return
+    transaction.on_commit(lambda: _enqueue(entry), robust=True)
+
+
+def _enqueue(entry):
+    pending = _worker_queue()
+    if pending.qsize() >= _max_pending():
+        _write([entry])
+        return
+    pending.put(entry)
+    if pending.qsize() >= _batch_size():
+        _wakeup.set()
+
+
+def _worker_queue():
+    global _queue, _pid
+    with _lock:
+        # First use in this process — or a forked child, where the parent's
+        # thread does not exist and its queued entries are the parent's to write.
+        if _pid != os.getpid():
+            _queue = queue.Queue()
+            _pid = os.getpid()
+            threading.Thread(target=_run, name='activity-log', daemon=True).start()
+        return _queue
+
+
+def _run():
+    while True:
+        _wakeup.wait(_interval())
+        _wakeup.clear()
+        close_old_connections()
+        try:
+            flush()
+        finally:
+            close_old_connections()
+
+
+def _write(entries):
+    from .activity_search import index_logs
+    from .models import ActivityLog
+
+    db = router.db_for_write(ActivityLog)
+    try:
+        with transaction.atomic(using=db):
+            if connections[db].features.can_return_rows_from_bulk_insert:
+                ActivityLog.objects.using(db).bulk_create(entries, batch_size=_batch_size())
+            else:
+                _insert_fetching_ids(db, entries)
+            index_logs(entries)
+    except Exception:
+        logger.exception('could not write %d activity log entries', len(entries))
+
+
+def _insert_fetching_ids(db, entries):
+    """
+    bulk_create ``entries`` and set their ids on a backend that does not
+    return them. The new rows are those past the previous highest id; each is
+    matched to its entry by organization, timestamp, user and action. Entries
+    without an organization are not indexed, so their ids are not needed.
+    """
+    from .models import ActivityLog
+
+    logs = ActivityLog.objects.using(db)
+    last = logs.aggregate(last=Max('pk'))['last'] or 0
+    logs.bulk_create(entries, batch_size=_batch_size())
+
+    waiting = {}
+    for entry in entries:
+        if entry.organization_id:
+            key = (entry.organization_id, entry.timestamp, entry.user_id, entry.action)
+            waiting.setdefault(key, []).append(entry)
+    if not waiting:
+        return
+    stamps = [key[1] for key in waiting]
+    rows = (
+        logs.filter(pk__gt=last, organization_id__in={key[0] for key in waiting},
+                    timestamp__range=(min(stamps), max(stamps)))
+        .order_by('pk')
+        .values_list('pk', 'organization_id', 'timestamp', 'user_id', 'action')
+    )
+    for pk, *key in rows:
+        matches = waiting.get(tuple(key))
+        if matches:
+            matches.pop(0).pk = pk
+
+
+def flush():
+    """Write every queued entry now. Returns how many were taken from the queue."""
+    if _queue is None or _pid != os.getpid():
+        return 0
+    with _flush_lock:
+        entries = []
+        while True:
+            try:
+                entries.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        if entries:
+            _write(entries)
+    return len(entries)
+
+
+atexit.register(flush)
@@ -0,0 +1,59 @@
+"""
+Word index for the activity log search.
+
+The words of each entry's action, username and description ("Completed
+sale", "Ngozi Okafor", 'Deleted "Paracetamol 500mg"') are lower-cased and
+stored in ActivityLogToken. A search query is
+split the same way and every word must prefix-match one of an entry's
+tokens, so "ngo sale" finds the entry above. Each word is one range scan on
+the (organization, token) index instead of a LIKE '%...%' over the org's
+whole history.
+
+Usage:
+    from authapp.activity_search import search_logs
+    logs = search_logs(org, ActivityLog.objects.filter(organization=org), "ngozi")
+
+activity_buffer indexes entries as it writes them; rows disappear with their
+entry (FK cascade). Index older entries with
+`manage.py rebuild_activity_search_index`.
+"""
+import re
+
+# ActivityLogToken.token max_length; longer words are indexed by their prefix.
+MAX_TOKEN_LENGTH = 30
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def tokens(*texts):
+    """Set of lower-cased words over ``texts``, cut to MAX_TOKEN_LENGTH."""
+    words = set()
+    for text in texts:
+        words.update(w[:MAX_TOKEN_LENGTH] for w in _WORD_RE.findall((text or "").lower()))
+    return words
+
+
+def log_tokens(log):
+    return tokens(log.action, log.username, log.description)
+
+
+def index_logs(logs):
+    """Create the tokens of freshly inserted ``logs`` (entries without an org are skipped)."""
+    from .models import ActivityLogToken
+
+    ActivityLogToken.objects.bulk_create([
+        ActivityLogToken(organization_id=log.organization_id, log_id=log.pk, token=token)
+        for log in logs if log.pk and log.organization_id
+        for token in log_tokens(log)
+    ])
+
+
+def search_logs(org, logs, query):
+    """Entries of ``logs`` whose action/username/description words start with every word of ``query``."""
+    from .models import ActivityLogToken
+
+    for word in tokens(query):
+        logs = logs.filter(pk__in=ActivityLogToken.objects.filter(
+            organization=org, token__startswith=word,
+        ).values("log_id"))
+    return logs
@@ -13,6 +13,7 @@ from django.db.models import Count, Max, Q
 
 from .admin_mixins import OrgScopedAdminMixin
 from .backup_views import backup_http_response, restore_org_backup
+from .permissions import bump_permissions
 from .utils import normalize_ng_phone
 from .models import (
     ActivityLog, CommissionConfig, Organization,
@@ -388,9 +389,12 @@ class OrganizationAdmin(admin.ModelAdmin):
 
         with transaction.atomic():
             # Deactivate users before SET_NULL leaves them orphaned
+            user_ids = list(PharmUser.objects.filter(organization=obj).values_list('pk', flat=True))
             deactivated = PharmUser.objects.filter(organization=obj).update(
                 is_active=False, is_staff=False
             )
+            for user_id in user_ids:
+                bump_permissions(user_id)   # invalidate their token claims
 
             # Log before delete (FK goes to NULL after, so capture now)
             ActivityLog.objects.create(
@@ -590,6 +594,25 @@ class PharmUserAdmin(OrgScopedAdminMixin, UserAdmin):
         # Auto-sync is_wholesale_operator with role
         obj.is_wholesale_operator = obj.role in _WHOLESALE_ROLES
         super().save_model(request, obj, form, change)
+        if change and {'role', 'organization', 'branch', 'is_active', 'is_superuser'} & set(form.changed_data):
+            bump_permissions(obj.pk)
+
+    def delete_model(self, request, obj):
+        user_id = obj.pk
+        super().delete_model(request, obj)
+        bump_permissions(user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            bump_permissions(user_id)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Override inline edits change effective permissions.
+        if any(fs.has_changed() for fs in formsets):
+            bump_permissions(form.instance.pk)
 
     # ── Quick role assignment + permission overrides ──────────────────────
 
@@ -622,6 +645,7 @@ class PharmUserAdmin(OrgScopedAdminMixin, UserAdmin):
                     obj.role = new_role
                     obj.is_wholesale_operator = new_role in _WHOLESALE_ROLES
                     obj.save(update_fields=['role', 'is_wholesale_operator'])
+                    bump_permissions(obj.pk)
                     self.message_user(
                         request,
                         f"Role updated to '{new_role}'. is_wholesale_operator synced automatically.",
@@ -649,6 +673,7 @@ class PharmUserAdmin(OrgScopedAdminMixin, UserAdmin):
                 else:  # inherit — remove any override
                     deleted, _ = UserPermissionOverride.objects.filter(user=obj, permission=perm).delete()
                     cleared += deleted
+            bump_permissions(obj.pk)
             self.message_user(
                 request,
                 f"Permission overrides saved: {saved} granted, {revoked} revoked, {cleared} cleared.",
@@ -0,0 +1,78 @@
+"""
+Claims-based JWT authentication.
+
+Access tokens issued by ``access_token_for(user)`` carry the fields most
+views need about the caller:
+
+    org_id, branch_id, role, perm_ver   (perm_ver = PharmUser.perm_version
+                                         at issue time)
+
+ClaimsJWTAuthentication builds ``request.user`` from those claims without
+touching the database: a PharmUser instance whose other columns are
+deferred. It is a real model instance, so FK assignment
+(``Sale(dispenser=request.user)``), ``user.organization`` and
+``user.branch`` work as usual; the first read of any other column
+(full_name, phone_number, ...) loads all of them in one query
+(PharmUser.refresh_from_db).
+
+The claims are trusted only while the user's permission version still
+equals ``perm_ver``. bump_permissions() runs on every change that could
+make them wrong — role, branch, organization, deactivation, deletion — and
+then the user is loaded from the database exactly as SimpleJWT's
+JWTAuthentication does. The version is compared against its cached copy
+(authapp.permissions.permissions_version), so the default cache must be
+shared by every worker process, as in prod.py. Tokens without the claims (issued before this
+change) and superusers (never given the claims) also take that path.
+"""
+from django.db import router
+from django.db.models import DEFERRED
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import PharmUser
+from .permissions import permissions_version
+
+CLAIM_ORG = 'org_id'
+CLAIM_BRANCH = 'branch_id'
+CLAIM_ROLE = 'role'
+CLAIM_VERSION = 'perm_ver'
+
+
+def access_token_for(user):
+    """Signed access token for ``user``, with identity claims when eligible."""
+    access = RefreshToken.for_user(user).access_token
+    if not user.is_superuser:
+        access[CLAIM_ORG] = user.organization_id
+        access[CLAIM_BRANCH] = user.branch_id
+        access[CLAIM_ROLE] = user.role
+        access[CLAIM_VERSION] = user.perm_version
+    return str(access)
+
+
+def user_from_claims(user_id, token):
+    """PharmUser with only the claim columns loaded; the rest are deferred."""
+    known = {
+        'id': user_id,
+        'organization_id': token[CLAIM_ORG],
+        'branch_id': token[CLAIM_BRANCH],
+        'role': token[CLAIM_ROLE],
+        'perm_version': token[CLAIM_VERSION],
+        'is_active': True,
+        'is_superuser': False,
+    }
+    names = [f.attname for f in PharmUser._meta.concrete_fields]
+    return PharmUser.from_db(
+        router.db_for_read(PharmUser), names, [known.get(n, DEFERRED) for n in names],
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if CLAIM_VERSION not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or validated_token[CLAIM_VERSION] != permissions_version(user_id):
+            return super().get_user(validated_token)
+        # SimpleJWT stores the id as a string claim.
+        return user_from_claims(PharmUser._meta.pk.to_python(user_id), validated_token)
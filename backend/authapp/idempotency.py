@@ -0,0 +1,165 @@
+"""
+Idempotency-Key support for mutating API views.
+
+The Flutter offline queue replays POST/PATCH calls when connectivity returns.
+If the original request reached the server but the response was lost, a blind
+retry would book the sale / top-up twice. Clients send a stable
+``Idempotency-Key`` header per logical operation; the first response for that
+key is stored per organization and returned verbatim to every replay.
+
+Usage (innermost decorator, below @api_view / @throttle_classes):
+
+    @api_view(["POST"])
+    @throttle_classes([ScopedRateThrottle])
+    @idempotent
+    def checkout(request): ...
+
+Behaviour:
+- No header, safe method (GET/HEAD/OPTIONS) or no organization → view runs as usual.
+- First request → row reserved, view runs, response (< 500) stored.
+- Replay after completion → stored response with ``Idempotent-Replayed: true``.
+- Replay while the first is still running → 409 ``idempotency_in_progress``.
+- Same key, different method/path/body → 422 ``idempotency_key_reused``.
+- 5xx or an exception releases the key so the client can retry.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+_MAX_KEY_LENGTH = 255
+
+
+def _ttl():
+    # How long a stored response stays replayable.
+    return timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+
+def _stale_after():
+    # An in-flight reservation older than this is assumed to belong to a
+    # worker that died mid-request and may be taken over.
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', 300))
+
+
+def _fingerprint(request):
+    try:
+        body = json.dumps(request.data, sort_keys=True, cls=JSONEncoder, default=str)
+    except Exception:
+        body = ''
+    raw = f"{request.method}\n{request.path}\n{body}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _replay(record):
+    response = Response(record.response, status=record.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _reserve(org, key, request, fingerprint):
+    """
+    Try to claim ``key`` for this request.
+    Returns (record, None) when claimed, or (None, Response) to short-circuit.
+    """
+    from authapp.models import IdempotencyKey
+
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    organization=org,
+                    key=key,
+                    method=request.method,
+                    path=request.path[:255],
+                    request_hash=fingerprint,
+                )
+            return record, None
+        except IntegrityError:
+            existing = IdempotencyKey.objects.filter(organization=org, key=key).first()
+            if existing is None:
+                continue  # released between our insert and read — try again
+            age = timezone.now() - existing.created_at
+            expired = age > _ttl() or (existing.status_code is None and age > _stale_after())
+            if expired:
+                IdempotencyKey.objects.filter(pk=existing.pk).delete()
+                continue
+            if existing.request_hash != fingerprint:
+                return None, Response(
+                    {'detail': 'This Idempotency-Key was already used for a different request.',
+                     'code': 'idempotency_key_reused'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if existing.status_code is None:
+                return None, Response(
+                    {'detail': 'A request with this Idempotency-Key is still being processed.',
+                     'code': 'idempotency_in_progress'},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return None, _replay(existing)
+    return None, Response(
+        {'detail': 'Could not reserve Idempotency-Key. Please retry.',
+         'code': 'idempotency_in_progress'},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+def idempotent(view_func):
+    """Decorator: make a DRF function view safe to retry with an Idempotency-Key."""
+
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = (request.META.get(IDEMPOTENCY_HEADER) or '').strip()
+        if not key or request.method in _SAFE_METHODS:
+            return view_func(request, *args, **kwargs)
+
+        user = request.user
+        org = getattr(user, 'organization', None) if user and user.is_authenticated else None
+        if org is None:
+            return view_func(request, *args, **kwargs)
+
+        if len(key) > _MAX_KEY_LENGTH:
+            return Response(
+                {'detail': f'Idempotency-Key must be at most {_MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        record, short_circuit = _reserve(org, key, request, _fingerprint(request))
+        if short_circuit is not None:
+            return short_circuit
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500 or not hasattr(response, 'data'):
+            record.delete()
+            return response
+
+        record.status_code = response.status_code
+        record.response = response.data
+        record.save(update_fields=['status_code', 'response'])
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    """Delete stored responses older than the replay window. Returns the count."""
+    from authapp.models import IdempotencyKey
+
+    deleted, _ = IdempotencyKey.objects.filter(
+        created_at__lt=timezone.now() - _ttl()
+    ).delete()
+    return deleted
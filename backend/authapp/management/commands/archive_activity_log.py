@@ -0,0 +1,40 @@
+"""
+Management command: archive_activity_log
+
+Moves activity log entries older than each organization's retention period
+(Organization.activity_log_retention_days, else ACTIVITY_LOG_RETENTION_DAYS
+for its plan) into gzip NDJSON files under ACTIVITY_LOG_ARCHIVE_DIR, one file
+per organization and local day. See authapp.activity_archive.
+
+Usage:
+    python manage.py archive_activity_log
+    python manage.py archive_activity_log --org 12
+    python manage.py archive_activity_log --dry-run   # count only
+
+Cron example (daily at 02:00):
+    0 2 * * * /path/to/venv/bin/python /path/to/manage.py archive_activity_log \
+              --settings pharmapi.settings.prod >> /var/log/archive_activity_log.log 2>&1
+"""
+from django.core.management.base import BaseCommand
+
+from authapp.activity_archive import archive_expired, archive_root
+
+
+class Command(BaseCommand):
+    help = 'Archive activity log entries past their retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Only archive this organization id.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Count the entries that would be archived without moving them.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        results = archive_expired(org_id=options.get('org'), dry_run=dry_run)
+        for org_id, count in results.items():
+            self.stdout.write(f'  org {org_id or "-"}: {count}')
+        total = sum(results.values())
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{total} log row(s) would be archived.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Archived {total} log row(s) to {archive_root()}.'))
@@ -0,0 +1,24 @@
+"""
+Management command: purge_idempotency_keys
+
+Deletes stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL_HOURS.
+Expired keys are already ignored at request time; this just keeps the table small.
+
+Usage:
+    python manage.py purge_idempotency_keys
+
+Cron example (hourly):
+    0 * * * * /path/to/venv/bin/python /path/to/manage.py purge_idempotency_keys \
+              --settings pharmapi.settings.prod >> /var/log/purge_idempotency_keys.log 2>&1
+"""
+from django.core.management.base import BaseCommand
+
+from authapp.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete expired Idempotency-Key records.'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired idempotency key(s).'))
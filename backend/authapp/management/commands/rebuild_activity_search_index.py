@@ -0,0 +1,43 @@
+"""
+Management command: rebuild_activity_search_index
+
+Recomputes the activity log word index (ActivityLogToken) for live entries.
+The buffered writer indexes new entries, so this is only needed once for
+entries logged before the index existed (or before descriptions were
+indexed), or after raw SQL edits.
+
+Usage:
+    python manage.py rebuild_activity_search_index
+    python manage.py rebuild_activity_search_index --org 12
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from authapp.activity_search import index_logs
+from authapp.models import ActivityLog, ActivityLogToken
+
+CHUNK = 1000
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index for activity log entries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Only rebuild entries of this organization id.')
+
+    def handle(self, *args, **options):
+        logs = ActivityLog.objects.filter(organization__isnull=False)
+        if options.get('org'):
+            logs = logs.filter(organization_id=options['org'])
+        logs = logs.only('id', 'organization_id', 'action', 'username', 'description').order_by('id')
+        count, last_id = 0, 0
+        while True:
+            chunk = list(logs.filter(id__gt=last_id)[:CHUNK])
+            if not chunk:
+                break
+            with transaction.atomic():
+                ActivityLogToken.objects.filter(log__in=[log.pk for log in chunk]).delete()
+                index_logs(chunk)
+            count += len(chunk)
+            last_id = chunk[-1].pk
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} activity log row(s).'))
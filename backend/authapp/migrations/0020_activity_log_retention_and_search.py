@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0019_activitylog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='activity_log_retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='Days activity log entries stay searchable before they are archived. Blank = the plan default (ACTIVITY_LOG_RETENTION_DAYS).', null=True),
+        ),
+        migrations.CreateModel(
+            name='ActivityLogToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=30)),
+                ('log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='authapp.activitylog')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_log_tokens', to='authapp.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'token'], name='activitytoken_org_token_idx')],
+            },
+        ),
+    ]
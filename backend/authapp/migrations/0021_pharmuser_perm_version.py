@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0020_activity_log_retention_and_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pharmuser',
+            name='perm_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
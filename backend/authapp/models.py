@@ -4,6 +4,8 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, Permis
 from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder as DRFJSONEncoder
 
 
 class Organization(models.Model):
@@ -21,6 +23,11 @@ class Organization(models.Model):
         null=True, blank=True,
         help_text='When the org admin was last sent an inactivity reminder.',
     )
+    activity_log_retention_days = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text='Days activity log entries stay searchable before they are archived. '
+                  'Blank = the plan default (ACTIVITY_LOG_RETENTION_DAYS).',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
@@ -96,6 +103,9 @@ class PharmUser(AbstractBaseUser, PermissionsMixin):
         on_delete=models.SET_NULL, related_name='users',
         help_text='Pre-assigned branch. Null = org-wide access (admin/manager scope).',
     )
+    # Raised by authapp.permissions.bump_permissions() on every change that
+    # invalidates cached permissions or token claims.
+    perm_version         = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD  = 'phone_number'
     REQUIRED_FIELDS = []
@@ -104,6 +114,26 @@ class PharmUser(AbstractBaseUser, PermissionsMixin):
     def get_full_name(self):
         return self.full_name or self.phone_number
 
+    def save(self, *args, **kwargs):
+        # perm_version only moves through bump_permissions()' F() update: a
+        # full save of an instance loaded earlier must not write it back.
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'perm_version' and f.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Users built from JWT claims (authapp.authentication) defer most
+        # columns; load them all on the first deferred access, not one by one.
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = list(deferred)
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
     def to_api_dict(self):
         org = self.organization
         return {
@@ -275,7 +305,8 @@ class ActivityLog(models.Model):
     category     = models.CharField(max_length=20, choices=ACTIVITY_CATEGORY_CHOICES, default='other')
     description  = models.TextField(blank=True, default='')
     ip_address   = models.GenericIPAddressField(null=True, blank=True)
-    timestamp    = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is built; activity_buffer may write it a little later.
+    timestamp    = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-timestamp']
@@ -301,6 +332,51 @@ class ActivityLog(models.Model):
         return f"[{self.category}] {self.username}: {self.action}"
 
 
+class ActivityLogToken(models.Model):
+    """One word of an ActivityLog's action/username — see authapp.activity_search."""
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name='activity_log_tokens'
+    )
+    log   = models.ForeignKey(ActivityLog, on_delete=models.CASCADE, related_name='tokens')
+    token = models.CharField(max_length=30)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'token'], name='activitytoken_org_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token!r} → log #{self.log_id}"
+
+
+# ── Idempotency Keys ──────────────────────────────────────────────────────────
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a mutating API call made with an ``Idempotency-Key``
+    header. A replay with the same key (per organization) gets the stored
+    response instead of running the view again — see authapp.idempotency.
+
+    status_code is NULL while the original request is still in flight.
+    """
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name='idempotency_keys'
+    )
+    key          = models.CharField(max_length=255)
+    method       = models.CharField(max_length=10)
+    path         = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code  = models.PositiveSmallIntegerField(null=True, blank=True)
+    response     = models.JSONField(null=True, blank=True, encoder=DRFJSONEncoder)
+    created_at   = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ('organization', 'key')
+
+    def __str__(self):
+        return f"{self.method} {self.path} [{self.key}] → {self.status_code or 'pending'}"
+
+
 # ── Pharmacy Network ──────────────────────────────────────────────────────────
 
 class PharmacyNetwork(models.Model):
@@ -12,6 +12,10 @@ Or as a helper:
     if err: return err
 """
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import BasePermission
 from rest_framework.response import Response
@@ -138,23 +142,23 @@ class OrgSubscriptionPermission(BasePermission):
         if any(path.startswith(prefix) for prefix in _SUBSCRIPTION_EXEMPT_PREFIXES):
             return True
 
-        # Check org subscription status.
-        org = getattr(user, 'organization', None)
-        if org is None:
+        # Check org subscription status (cached per org — subscription.cache).
+        org_id = getattr(user, 'organization_id', None)
+        if org_id is None:
             return True  # no org → other checks handle this
 
-        try:
-            sub = org.subscription
-        except Exception:
+        from subscription.cache import get_status
+        sub_status = get_status(org_id)
+        if sub_status is None:
             return True  # no subscription record → allow (trial not yet created)
 
-        if sub.status in _BLOCKED_STATUSES:
+        if sub_status in _BLOCKED_STATUSES:
             _status_map = {
                 'suspended': ('org_suspended',  'Organization subscription is suspended.'),
                 'cancelled': ('org_cancelled',  'Organization subscription has been cancelled.'),
                 'expired':   ('org_expired',    'Organization subscription has expired.'),
             }
-            code, detail = _status_map.get(sub.status, ('org_blocked', 'Organization access blocked.'))
+            code, detail = _status_map.get(sub_status, ('org_blocked', 'Organization access blocked.'))
             # Raise PermissionDenied directly so the response body includes `code`
             # alongside `detail`, giving the Flutter app a machine-readable signal.
             raise PermissionDenied({'detail': detail, 'code': code})
@@ -363,14 +367,76 @@ _PERMISSION_ROLE_MAP: dict[str, set] = {
 }
 
 
-def get_effective_permissions(user) -> dict:
-    """
-    Return the effective permission dict for a user:
-      1. Start from role defaults (from _PERMISSION_ROLE_MAP)
-      2. Apply any UserPermissionOverride rows for this user
+# ── Effective-permission cache ────────────────────────────────────────────────
+# Resolved permissions are cached per user under their permission version:
+#
+#     perms:<user id>:<version>:<role>
+#
+# The version is PharmUser.perm_version, so every worker agrees on it; the
+# cache holds a copy (perms:version:<user id>) to keep the database off the
+# hot path. bump_permissions(user_id) raises it whenever the user's overrides
+# or role change, so stale entries are never read again. The role is part of
+# the key as well, so a role edit that misses a bump still cannot serve the
+# old role's permissions. Within one request the resolved dict is also
+# memoized on the user object, keyed by version.
+
+_PERMS_VERSION_KEY = 'perms:version:{}'
+_PERMS_MEMO_ATTR = '_effective_permissions_memo'
+
+
+def _perms_timeout():
+    return getattr(settings, 'PERMISSION_CACHE_TIMEOUT', 300)
+
 
-    Keys match Flutter AppPermission constants.
+def _stored_version(user_id):
+    from authapp.models import PharmUser
+
+    return (PharmUser.objects.filter(pk=user_id)
+            .values_list('perm_version', flat=True).first())
+
+
+def permissions_version(user_id):
+    """PharmUser.perm_version of ``user_id`` via its cached copy (None if no such user)."""
+    key = _PERMS_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = _stored_version(user_id)
+        if version is not None:
+            cache.add(key, version, _perms_timeout())
+    return version
+
+
+def _publish_version(user_id):
+    key = _PERMS_VERSION_KEY.format(user_id)
+    version = _stored_version(user_id)
+    if version is None:
+        cache.delete(key)
+    else:
+        cache.set(key, version, _perms_timeout())
+
+
+def bump_permissions(user_id):
+    """
+    Invalidate the cached effective permissions of ``user_id``. Call after
+    changing a user's role or UserPermissionOverride rows — and their branch,
+    organization or active flag, or deleting them, since access tokens carry
+    those as claims valid only for the current version
+    (authapp.authentication).
+
+    perm_version is raised in the current transaction; the cached copy is
+    dropped now and replaced with the committed value on commit, so a copy
+    re-read from the old row while the write was in flight is overwritten.
     """
+    if not user_id:
+        return
+    from authapp.models import PharmUser
+
+    PharmUser.objects.filter(pk=user_id).update(perm_version=F('perm_version') + 1)
+    cache.delete(_PERMS_VERSION_KEY.format(user_id))
+    transaction.on_commit(lambda: _publish_version(user_id))
+
+
+def _resolve_permissions(user) -> dict:
     role = getattr(user, "role", "") or ""
     defaults = {perm: role in allowed for perm, allowed in _PERMISSION_ROLE_MAP.items()}
 
@@ -386,3 +452,34 @@ def get_effective_permissions(user) -> dict:
         pass
 
     return defaults
+
+
+def get_effective_permissions(user) -> dict:
+    """
+    Return the effective permission dict for a user:
+      1. Start from role defaults (from _PERMISSION_ROLE_MAP)
+      2. Apply any UserPermissionOverride rows for this user
+
+    Keys match Flutter AppPermission constants. Cached per user and version
+    (see bump_permissions); a cache hit costs no query.
+    """
+    user_id = getattr(user, "pk", None)
+    if user_id is None:
+        return _resolve_permissions(user)
+
+    role = getattr(user, "role", "") or ""
+    version = permissions_version(user_id)
+    memo = getattr(user, _PERMS_MEMO_ATTR, None)
+    if memo and memo[0] == (version, role):
+        return dict(memo[1])
+
+    key = f"perms:{user_id}:{version}:{role.replace(' ', '_')}"
+    perms = cache.get(key)
+    if perms is None:
+        perms = _resolve_permissions(user)
+        cache.set(key, perms, _perms_timeout())
+    try:
+        setattr(user, _PERMS_MEMO_ATTR, ((version, role), perms))
+    except AttributeError:
+        pass
+    return dict(perms)
@@ -0,0 +1,210 @@
+"""
+Offline queue batch replay.
+
+POST /api/sync/batch/ — replay an ordered list of queued mutations in one
+request instead of one HTTP round trip per mutation:
+
+    {
+      "atomic": false,
+      "operations": [
+        {"method": "POST",  "path": "/pos/checkout/", "body": {...},
+         "idempotency_key": "sale-1712345678"},
+        {"method": "PATCH", "path": "/inventory/items/42/", "body": {...},
+         "idempotency_key": "1712345679000"}
+      ]
+    }
+
+Each operation is dispatched in-process to the view that owns ``path``
+(relative to ``/api`` — the same paths the Flutter client queues) with the
+already-authenticated user, so the JWT is decoded and the user loaded once
+per batch. Per-entry ``idempotency_key`` values are passed to the view as an
+``Idempotency-Key`` header (see authapp.idempotency), so re-sending a batch
+after a lost response is safe.
+
+Only the offline-queue mutation endpoints (SYNC_BATCH_PATH_PREFIXES: POS,
+inventory, customers/wallet, prescriptions) can be replayed; /api/auth/,
+user and password management and everything else are rejected. Each entry goes through its view's own
+throttle classes, exactly as a direct request would. The batch itself uses
+the ``sync`` throttle scope and is capped at SYNC_BATCH_MAX_OPERATIONS.
+
+``atomic: true`` runs every operation in one transaction and stops at the
+first failure (status >= 400); everything already applied is rolled back and
+the remaining entries are reported as ``skipped``. Otherwise every entry runs
+independently in order.
+
+Response: {"atomic": bool, "results": [{"index", "status", "body",
+"replayed"}, ...]} — always HTTP 200 once the envelope is valid.
+"""
+import io
+import json
+import logging
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.utils.encoders import JSONEncoder
+
+from .idempotency import IDEMPOTENCY_HEADER
+
+logger = logging.getLogger(__name__)
+
+_ALLOWED_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+_API_PREFIX = '/api'
+# Endpoints the Flutter offline queue replays.
+_DEFAULT_PATH_PREFIXES = (
+    '/api/pos/',
+    '/api/inventory/',
+    '/api/customers/',
+    '/api/prescriptions/',
+)
+# Account management under those prefixes is never queued offline.
+_EXCLUDED_PATH_PREFIXES = ('/api/pos/users/',)
+
+# Request headers that describe the outer batch body, not the entry.
+_DROP_META = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_CONTENT_TYPE',
+              'HTTP_CONTENT_LENGTH', IDEMPOTENCY_HEADER)
+
+
+def _max_operations():
+    return getattr(settings, 'SYNC_BATCH_MAX_OPERATIONS', 200)
+
+
+def _path_prefixes():
+    return tuple(getattr(settings, 'SYNC_BATCH_PATH_PREFIXES', _DEFAULT_PATH_PREFIXES))
+
+
+def _normalize_path(raw):
+    """'/pos/checkout/' or '/api/pos/checkout/?x=1' → ('/api/pos/checkout/', 'x=1')."""
+    path, _, query = (raw or '').partition('?')
+    if not path.startswith('/'):
+        path = '/' + path
+    if path != _API_PREFIX and not path.startswith(_API_PREFIX + '/'):
+        path = _API_PREFIX + path
+    return path, query
+
+
+def _validate(op):
+    """Return (method, path, query, body, key) or raise ValueError."""
+    if not isinstance(op, dict):
+        raise ValueError('Each operation must be an object.')
+    method = str(op.get('method') or '').upper()
+    if method not in _ALLOWED_METHODS:
+        raise ValueError(f'Unsupported method {method or "(none)"}; '
+                         f'use one of {", ".join(_ALLOWED_METHODS)}.')
+    path, query = _normalize_path(op.get('path'))
+    if not path.startswith(_path_prefixes()) or path.startswith(_EXCLUDED_PATH_PREFIXES):
+        raise ValueError(f'{path} cannot be replayed in a batch.')
+    body = op.get('body')
+    if body is not None and not isinstance(body, (dict, list)):
+        raise ValueError('"body" must be an object, a list or null.')
+    key = op.get('idempotency_key')
+    key = str(key).strip() if key not in (None, '') else ''
+    return method, path, query, body, key
+
+
+def _build_request(outer, method, path, query, body, key):
+    """A fresh WSGIRequest for one entry, authenticated as the batch caller."""
+    raw = json.dumps(body, cls=JSONEncoder).encode('utf-8') if body is not None else b''
+    environ = {k: v for k, v in outer.META.items() if k not in _DROP_META}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(raw)),
+        'wsgi.input': io.BytesIO(raw),
+    })
+    if key:
+        environ[IDEMPOTENCY_HEADER] = key
+    inner = WSGIRequest(environ)
+    # Picked up by rest_framework.request.Request — skips re-authentication.
+    inner._force_auth_user = outer.user
+    inner._force_auth_token = outer.auth
+    return inner
+
+
+def _dispatch(outer, op):
+    """Run one operation; returns a result dict."""
+    try:
+        method, path, query, body, key = _validate(op)
+    except ValueError as exc:
+        return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'detail': str(exc)},
+                'replayed': False}
+
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {'status': status.HTTP_404_NOT_FOUND,
+                'body': {'detail': f'No endpoint at {path}.'}, 'replayed': False}
+
+    view_cls = getattr(match.func, 'cls', None)
+    if view_cls is None:
+        return {'status': status.HTTP_400_BAD_REQUEST,
+                'body': {'detail': f'{path} cannot be replayed in a batch.'},
+                'replayed': False}
+
+    inner = _build_request(outer, method, path, query, body, key)
+    try:
+        response = match.func(inner, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception('sync batch: %s %s failed', method, path)
+        return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+                'body': {'detail': 'Internal server error.'}, 'replayed': False}
+
+    return {
+        'status': response.status_code,
+        'body': getattr(response, 'data', None),
+        'replayed': response.get('Idempotent-Replayed') == 'true',
+    }
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([ScopedRateThrottle])
+def sync_batch(request):
+    request.throttle_scope = 'sync'
+    operations = request.data.get('operations') if isinstance(request.data, dict) else None
+    if not isinstance(operations, list):
+        return Response({'detail': '"operations" must be a list.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    limit = _max_operations()
+    if len(operations) > limit:
+        return Response({'detail': f'At most {limit} operations per batch.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    atomic = bool(request.data.get('atomic', False))
+    results = []
+
+    if atomic:
+        with transaction.atomic():
+            for op in operations:
+                result = _dispatch(request, op)
+                results.append(result)
+                if result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    break
+        failed = bool(results) and results[-1]['status'] >= 400
+        if failed:
+            # Nothing before the failure survived the rollback.
+            for result in results[:-1]:
+                result.update(status=status.HTTP_424_FAILED_DEPENDENCY,
+                              body={'detail': 'Rolled back: a later operation failed.'},
+                              replayed=False)
+        for _ in operations[len(results):]:
+            results.append({'status': status.HTTP_424_FAILED_DEPENDENCY,
+                            'body': {'detail': 'Skipped: an earlier operation failed.'},
+                            'replayed': False, 'skipped': True})
+    else:
+        for op in operations:
+            results.append(_dispatch(request, op))
+
+    for index, result in enumerate(results):
+        result['index'] = index
+    return Response({'atomic': atomic, 'results': results})
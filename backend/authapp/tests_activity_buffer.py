@@ -0,0 +1,92 @@
+"""
+Buffered ActivityLog writer.
+
+Verifies:
+- log_activity() runs no INSERT on the request path; flush() writes the
+  queued entries (and their search tokens) in one bulk insert each and keeps
+  the time each was logged.
+- Entries logged inside a rolled-back transaction are never queued.
+- With the queue at ACTIVITY_LOG_MAX_PENDING, entries are written inline.
+- On a backend that cannot return ids from a bulk insert (MySQL) the batch is
+  still one insert, and each entry's tokens point at its own row.
+"""
+from unittest.mock import patch
+
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from authapp import activity_buffer
+from authapp.models import ActivityLog, ActivityLogToken, Organization, PharmUser
+from authapp.utils import log_activity
+
+
+@override_settings(ACTIVITY_LOG_BUFFERED=True, ACTIVITY_LOG_FLUSH_SECONDS=3600)
+class ActivityBufferTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Audit Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000023", password="pass1234", role="Cashier",
+            organization=self.org, full_name="Ngozi",
+        )
+        self.request = APIRequestFactory().post("/api/pos/checkout/")
+        self.addCleanup(activity_buffer.flush)
+
+    def _log(self, action):
+        log_activity(self.request, action, "sales", user=self.user)
+
+    def test_entries_are_queued_then_bulk_written(self):
+        before = timezone.now()
+        with CaptureQueriesContext(connection) as ctx:
+            with self.captureOnCommitCallbacks(execute=True):
+                for n in range(3):
+                    self._log(f"Sale {n}")
+        self.assertFalse([q for q in ctx.captured_queries if "INSERT" in q["sql"]])
+        self.assertEqual(ActivityLog.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(activity_buffer.flush(), 3)
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        self.assertIn("authapp_activitylogtoken", inserts[1])
+        rows = ActivityLog.objects.filter(organization=self.org, username="Ngozi")
+        self.assertEqual(rows.count(), 3)
+        self.assertTrue(all(before <= r.timestamp < timezone.now() for r in rows))
+
+    def test_rolled_back_entries_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self._log("Voided sale")
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(activity_buffer.flush(), 0)
+
+    @override_settings(ACTIVITY_LOG_MAX_PENDING=2)
+    def test_full_queue_writes_inline(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(3):
+                self._log(f"Sale {n}")
+        self.assertEqual(ActivityLog.objects.count(), 1)
+        self.assertEqual(activity_buffer.flush(), 2)
+        self.assertEqual(ActivityLog.objects.count(), 3)
+
+    def test_bulk_insert_without_returned_ids(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for action in ("Completed sale", "Updated stock", "Completed sale"):
+                self._log(action)
+        features = type(connection.features)
+        with patch.object(features, "can_return_rows_from_bulk_insert", False), \
+                CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(activity_buffer.flush(), 3)
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        for log in ActivityLog.objects.all():
+            self.assertEqual(
+                set(ActivityLogToken.objects.filter(log=log).values_list("token", flat=True)),
+                {*log.action.lower().split(), "ngozi"},
+            )
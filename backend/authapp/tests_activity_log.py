@@ -0,0 +1,101 @@
+"""
+Activity log search, paging and archival.
+
+Verifies:
+- Search matches word prefixes of the action, username and description
+  through the token index, requiring every query word.
+- ?cursor= pages cover every entry exactly once without a count query.
+- archive_activity_log moves entries past the plan / org retention period into
+  per-day gzip NDJSON files and deletes them (and their tokens) from the table.
+"""
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.activity_archive import day_path
+from authapp.models import ActivityLog, ActivityLogToken, Organization, PharmUser
+from authapp.utils import log_activity
+from authapp.views import activity_log_view
+from subscription.models import Subscription
+
+
+class ActivityLogTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Log Pharmacy")
+        self.admin = PharmUser.objects.create_user(
+            phone_number="08000000024", password="pass1234", role="Admin",
+            organization=self.org, full_name="Ngozi Okafor",
+        )
+        self.cashier = PharmUser.objects.create_user(
+            phone_number="08000000025", password="pass1234", role="Cashier",
+            organization=self.org, full_name="Bayo Ade",
+        )
+        request = self.factory.post("/api/pos/checkout/")
+        for user, action in [(self.admin, "Completed sale"), (self.cashier, "Completed sale"),
+                             (self.cashier, "Updated stock"), (self.admin, "Logged in")]:
+            log_activity(request, action, "sales", description="RCP-0001", user=user)
+
+    def _get(self, **params):
+        req = self.factory.get("/api/auth/activity-log/", params)
+        force_authenticate(req, user=self.admin)
+        return activity_log_view(req).data
+
+    def test_search_uses_word_prefixes(self):
+        self.assertEqual(ActivityLogToken.objects.filter(token="okafor").count(), 2)
+        actions = lambda data: sorted(r["action"] for r in data["results"])
+        self.assertEqual(actions(self._get(search="sale")), ["Completed sale"] * 2)
+        self.assertEqual(actions(self._get(search="bay COMP")), ["Completed sale"])
+        self.assertEqual(actions(self._get(search="okafor")), ["Completed sale", "Logged in"])
+        self.assertEqual(self._get(search="rcp")["count"], 4)   # description words
+        self.assertEqual(actions(self._get(search="0001 stock")), ["Updated stock"])
+
+    def test_cursor_pages(self):
+        seen, cursor = [], ""
+        with CaptureQueriesContext(connection) as ctx:
+            while cursor is not None:
+                data = self._get(cursor=cursor, page_size=3)
+                seen += [r["id"] for r in data["results"]]
+                cursor = data["next"]
+        self.assertFalse([q for q in ctx.captured_queries if "COUNT(" in q["sql"]])
+        self.assertEqual(seen, list(ActivityLog.objects.order_by("-timestamp", "-id")
+                                    .values_list("id", flat=True)))
+        self.assertEqual(self._get(page=1)["count"], 4)
+
+    def test_archive_moves_expired_entries(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        Subscription.objects.create(organization=self.org, plan="starter", status="active")
+        old = timezone.now() - timedelta(days=200)
+        expired = list(ActivityLog.objects.filter(user=self.cashier).order_by("id"))
+        ActivityLog.objects.filter(user=self.cashier).update(timestamp=old)
+
+        with override_settings(ACTIVITY_LOG_ARCHIVE_DIR=root):
+            call_command("archive_activity_log", "--dry-run", stdout=StringIO())
+            self.assertEqual(ActivityLog.objects.count(), 4)
+            call_command("archive_activity_log", stdout=StringIO())
+            path = day_path(self.org.pk, timezone.localdate(old))
+
+        with gzip.open(path, "rt") as fh:
+            archived = [json.loads(line) for line in fh]
+        self.assertEqual([r["id"] for r in archived], [log.pk for log in expired])
+        self.assertEqual(archived[1]["action"], "Updated stock")
+        self.assertEqual(ActivityLog.objects.count(), 2)
+        self.assertFalse(ActivityLogToken.objects.filter(log_id__in=[log.pk for log in expired]))
+
+        # A per-org override shorter than the plan's 180 days archives the rest.
+        self.org.activity_log_retention_days = 0
+        self.org.save()
+        with override_settings(ACTIVITY_LOG_ARCHIVE_DIR=root):
+            call_command("archive_activity_log", "--org", str(self.org.pk), stdout=StringIO())
+        self.assertFalse(ActivityLog.objects.filter(organization=self.org).exists())
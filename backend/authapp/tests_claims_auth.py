@@ -0,0 +1,83 @@
+"""
+Claims-based JWT authentication.
+
+Verifies:
+- A token issued at login authenticates without loading the user, and the
+  resulting user still works for views (org scoping, FK assignment) and
+  loads its remaining columns in one query when needed.
+- After a role change (permission version bump) the same token falls back to
+  a database load and sees the new role; a deactivated user is rejected,
+  also once the cached version copy is gone.
+- Tokens without the claims keep working through the database path.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authapp.authentication import ClaimsJWTAuthentication, access_token_for
+from authapp.models import Organization, PharmUser
+from authapp.permissions import bump_permissions
+from pos.models import Notification
+
+
+class ClaimsAuthTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Claims Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000022", password="pass1234", role="Cashier",
+            organization=self.org, full_name="Tola",
+        )
+
+    def _authenticate(self, token):
+        req = self.factory.get("/api/pos/notifications/count/",
+                               HTTP_AUTHORIZATION=f"Bearer {token}")
+        return ClaimsJWTAuthentication().authenticate(req)[0]
+
+    def test_claims_user_needs_no_query(self):
+        token = access_token_for(self.user)
+        self._authenticate(token)   # caches the permission version
+        with CaptureQueriesContext(connection) as ctx:
+            user = self._authenticate(token)
+            self.assertEqual((user.pk, user.organization_id, user.role),
+                             (self.user.pk, self.org.pk, "Cashier"))
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual((user.full_name, user.phone_number), ("Tola", "08000000022"))
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        Notification.objects.create(user=user, title="Low stock", message="Zinc")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        client.get("/api/pos/notifications/count/")   # warm the subscription cache
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get("/api/pos/notifications/count/")
+        self.assertEqual(resp.json(), {"count": 1})
+        self.assertFalse([q for q in ctx.captured_queries if "authapp_pharmuser" in q["sql"]])
+
+    def test_stale_and_legacy_tokens_use_the_database(self):
+        token = access_token_for(self.user)
+        PharmUser.objects.filter(pk=self.user.pk).update(role="Manager")
+        bump_permissions(self.user.pk)
+        self.assertEqual(self._authenticate(token).role, "Manager")
+
+        PharmUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_permissions(self.user.pk)
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(token)
+        cache.clear()   # evicted, or another worker's cache
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(token)
+
+        PharmUser.objects.filter(pk=self.user.pk).update(is_active=True)
+        legacy = str(RefreshToken.for_user(self.user).access_token)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._authenticate(legacy).full_name, "Tola")
+        self.assertEqual(len(ctx.captured_queries), 1)
@@ -0,0 +1,84 @@
+"""
+Effective-permission cache.
+
+Verifies:
+- Repeated resolutions for the same user run the override query once.
+- Saving overrides through user_permissions_view bumps the user's version,
+  so the next resolution sees the change.
+- A role change through user_detail takes effect immediately.
+- The version is stored on PharmUser, so it survives losing the cache, and a
+  save of an instance loaded before a bump does not write the old one back.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from authapp.permissions import bump_permissions, get_effective_permissions, permissions_version
+from authapp.views import user_permissions_view
+from pos.views import user_detail
+
+
+class PermissionCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Perm Pharmacy")
+        self.admin = PharmUser.objects.create_user(
+            phone_number="08000000019", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.cashier = PharmUser.objects.create_user(
+            phone_number="08000000020", password="pass1234", role="Cashier",
+            organization=self.org,
+        )
+
+    def _fresh(self):
+        # A new instance, as each request's authentication would load.
+        return PharmUser.objects.get(pk=self.cashier.pk)
+
+    def test_resolved_once_then_served_from_cache(self):
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(3):
+                self.assertTrue(get_effective_permissions(self.cashier)["retailPOS"])
+            get_effective_permissions(self._fresh())
+        overrides = [q for q in ctx.captured_queries if "userpermissionoverride" in q["sql"]]
+        self.assertEqual(len(overrides), 1)
+
+    def test_override_and_role_changes_invalidate(self):
+        self.assertFalse(get_effective_permissions(self.cashier)["viewReports"])
+
+        req = self.factory.post(
+            f"/api/auth/users/{self.cashier.pk}/permissions/",
+            {"overrides": {"viewReports": "grant"}}, format="json",
+        )
+        force_authenticate(req, user=self.admin)
+        self.assertEqual(user_permissions_view(req, user_id=self.cashier.pk).status_code, 200)
+        self.assertTrue(get_effective_permissions(self.cashier)["viewReports"])
+
+        req = self.factory.patch(f"/api/pos/users/{self.cashier.pk}/",
+                                 {"role": "Wholesale Operator"}, format="json")
+        force_authenticate(req, user=self.admin)
+        self.assertEqual(user_detail(req, pk=self.cashier.pk).status_code, 200)
+        perms = get_effective_permissions(self._fresh())
+        self.assertFalse(perms["retailPOS"])
+        self.assertTrue(perms["wholesalePOS"])
+        self.assertTrue(perms["viewReports"])   # override survives the role change
+
+    def test_version_is_stored_on_the_user(self):
+        before = permissions_version(self.cashier.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_permissions(self.cashier.pk)
+        self.assertEqual(permissions_version(self.cashier.pk), before + 1)
+        cache.clear()   # evicted, or another worker's cache
+        self.assertEqual(permissions_version(self.cashier.pk), before + 1)
+        self.assertEqual(self._fresh().perm_version, before + 1)
+
+        stale = self._fresh()
+        bump_permissions(self.cashier.pk)
+        stale.full_name = "Renamed"
+        stale.save()
+        self.assertEqual(self._fresh().perm_version, before + 2)
+        self.assertEqual(self._fresh().full_name, "Renamed")
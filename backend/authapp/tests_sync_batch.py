@@ -0,0 +1,101 @@
+"""
+POST /api/sync/batch/ — offline queue replay in one request.
+
+Verifies:
+- Operations are dispatched in order to the owning views and report their
+  own status and body.
+- Per-entry idempotency keys make a re-sent batch a no-op.
+- atomic=true rolls back earlier operations when a later one fails and marks
+  the rest as skipped.
+- Only offline-queue endpoints can be replayed: /auth/ (login attempts), user
+  management and other paths are rejected.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from authapp.sync_views import sync_batch
+from inventory.models import Item
+from pos.models import Sale
+
+
+class SyncBatchTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Test Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000004", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.item = Item.objects.create(
+            organization=self.org, name="Paracetamol", price=Decimal("100"),
+            cost=Decimal("50"), stock=Decimal("10"), store="retail",
+        )
+
+    def _sale(self, key, qty=1):
+        return {
+            "method": "POST",
+            "path": "/pos/checkout/",
+            "idempotency_key": key,
+            "body": {
+                "items": [{"itemId": self.item.id, "quantity": qty, "price": 100}],
+                "payment": {"cash": 100 * qty},
+                "paymentMethod": "cash",
+            },
+        }
+
+    def _batch(self, operations, atomic=False):
+        req = self.factory.post("/api/sync/batch/", {
+            "atomic": atomic, "operations": operations,
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        return sync_batch(req)
+
+    def test_operations_dispatched_in_order(self):
+        resp = self._batch([
+            self._sale("s-1"),
+            {"method": "PATCH", "path": f"/inventory/items/{self.item.id}/",
+             "body": {"price": 120}, "idempotency_key": "m-1"},
+            {"method": "POST", "path": "/pos/no-such-endpoint/"},
+        ])
+        self.assertEqual(resp.status_code, 200)
+        statuses = [r["status"] for r in resp.data["results"]]
+        self.assertEqual(statuses, [201, 200, 404])
+        self.assertEqual(Sale.objects.count(), 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, Decimal("9"))
+        self.assertEqual(self.item.price, Decimal("120"))
+
+    def test_resent_batch_is_replayed(self):
+        ops = [self._sale("s-2"), self._sale("s-3")]
+        self._batch(ops)
+        resp = self._batch(ops)
+        self.assertTrue(all(r["replayed"] for r in resp.data["results"]))
+        self.assertEqual(Sale.objects.count(), 2)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, Decimal("8"))
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        resp = self._batch([
+            self._sale("s-4", qty=2),
+            self._sale("s-5", qty=50),   # oversell → 400
+            self._sale("s-6", qty=1),
+        ], atomic=True)
+        statuses = [r["status"] for r in resp.data["results"]]
+        self.assertEqual(statuses, [424, 400, 424])
+        self.assertTrue(resp.data["results"][2]["skipped"])
+        self.assertEqual(Sale.objects.count(), 0)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, Decimal("10"))
+
+    def test_only_offline_queue_paths_replay(self):
+        login = {"method": "POST", "path": "/auth/login/",
+                 "body": {"phone_number": "08000000004", "password": "wrong"}}
+        resp = self._batch([login, {**login, "path": "/api/auth/login/"},
+                            {"method": "POST", "path": "/subscription/upgrade/"},
+                            {"method": "POST", "path": f"/pos/users/{self.user.pk}/change-password/"}])
+        self.assertEqual([r["status"] for r in resp.data["results"]], [400] * 4)
+        self.assertIn("cannot be replayed", resp.data["results"][0]["body"]["detail"])
+
@@ -1,5 +1,7 @@
 import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 
+from django.utils import timezone
 from rest_framework.response import Response
 from rest_framework import status
 
@@ -37,6 +39,37 @@ def require_org(request):
     return org, None
 
 
+def local_day_bounds(start, end):
+    """
+    Inclusive local days [start, end] → aware datetimes [lower, upper) at
+    local midnight (Africa/Lagos). Filter with ``created__gte=lower,
+    created__lt=upper`` rather than ``created__date__*``: comparing the raw
+    column lets the database range-scan an index on it instead of wrapping
+    every row in DATE().
+    """
+    tz = timezone.get_current_timezone()
+    lower = timezone.make_aware(datetime.combine(start, time.min), tz)
+    upper = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+    return lower, upper
+
+
+# Keyset cursors shared by the receipt lists, the inventory delta feed and
+# the activity log: '<microseconds since epoch>-<id>' of the last row seen.
+CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(ts, pk):
+    return f"{(ts - CURSOR_EPOCH) // timedelta(microseconds=1)}-{pk}"
+
+
+def decode_cursor(raw):
+    """'<microseconds since epoch>-<id>' → (aware datetime, id), or None if malformed."""
+    micros, sep, pk = raw.partition('-')
+    if not sep or not micros.isdigit() or not pk.isdigit():
+        return None
+    return CURSOR_EPOCH + timedelta(microseconds=int(micros)), int(pk)
+
+
 def _get_client_ip(request):
     x_forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded:
@@ -48,14 +81,16 @@ def log_activity(request, action, category, description='', user=None):
     """
     Fire-and-forget activity log entry. Never raises — logging must not break views.
     Pass `user` explicitly when request.user is not yet authenticated (e.g. login view).
+    The row is written by authapp.activity_buffer after the request's transaction
+    commits, batched with other entries.
     """
     try:
+        from authapp import activity_buffer
         from authapp.models import ActivityLog
         if user is None:
             user = request.user if request.user.is_authenticated else None
-        org  = getattr(user, 'organization', None)
-        ActivityLog.objects.create(
-            organization=org,
+        activity_buffer.submit(ActivityLog(
+            organization_id=getattr(user, 'organization_id', None),
             user=user,
             username=getattr(user, 'full_name', '') or getattr(user, 'phone_number', '') if user else '',
             role=getattr(user, 'role', '') if user else '',
@@ -63,6 +98,6 @@ def log_activity(request, action, category, description='', user=None):
             category=category,
             description=description,
             ip_address=_get_client_ip(request),
-        )
+        ))
     except Exception:
         pass
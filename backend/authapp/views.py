@@ -1,22 +1,20 @@
 import re
 from django.contrib.auth import authenticate
+from django.db.models import Q
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.throttling import ScopedRateThrottle
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
+from .activity_search import search_logs
+from .authentication import access_token_for
 from .models import Organization, PharmUser, ActivityLog, PharmacyNetwork, PharmacyNetworkMembership
 from .permissions import (
-    IsAdminOrManager, PERMISSION_LABELS, _PERMISSION_ROLE_MAP, get_effective_permissions
+    IsAdminOrManager, PERMISSION_LABELS, _PERMISSION_ROLE_MAP, bump_permissions,
+    get_effective_permissions,
 )
-from .utils import log_activity, normalize_ng_phone
-
-
-def _token_for(user):
-    refresh = RefreshToken.for_user(user)
-    return str(refresh.access_token)
+from .utils import decode_cursor, encode_cursor, log_activity, normalize_ng_phone
 
 
 @api_view(['POST'])
@@ -50,7 +48,7 @@ def login_view(request):
         log_activity(request, action='Login', category='auth',
                      description=f'Successful login ({user.role})', user=user)
         return Response({
-            'access':    _token_for(user),
+            'access':    access_token_for(user),
             'user_type': 'org',
             'user':      user.to_api_dict(),
         })
@@ -169,7 +167,7 @@ def register_org_view(request):
         pass
 
     return Response({
-        'access': _token_for(user),
+        'access': access_token_for(user),
         'user':   user.to_api_dict(),
     }, status=status.HTTP_201_CREATED)
 
@@ -287,6 +285,7 @@ def user_permissions_view(request, user_id):
                 changed.append(f"{perm_key}={state}")
 
         if changed:
+            bump_permissions(target.pk)
             target_name = target.full_name or target.phone_number
             log_activity(
                 request,
@@ -333,29 +332,44 @@ def user_permissions_view(request, user_id):
 def activity_log_view(request):
     """
     GET /auth/activity-log/
-    Query params: page (int), page_size (int, max 100), category (str), search (str)
-    Returns: { count, results: [...] }
+    Query params: page_size (int, max 100), category (str), search (str), and
+      cursor (str, '' for the first page) → { results: [...], next: <cursor or null> }
+      page (int)                           → { count, results: [...] }  (older clients)
+    Search matches the start of words in the action, username and description
+    (authapp.activity_search). Entries past the org's retention period are
+    archived (authapp.activity_archive) and no longer listed.
     """
-    org = getattr(request.user, 'organization', None)
-    if org is None:
+    org_id = getattr(request.user, 'organization_id', None)
+    if org_id is None:
         return Response({'detail': 'No organisation linked.'}, status=status.HTTP_403_FORBIDDEN)
 
-    page      = max(1, int(request.query_params.get('page', 1)))
     page_size = min(100, max(1, int(request.query_params.get('page_size', 30))))
     category  = request.query_params.get('category', '').strip()
     search    = request.query_params.get('search', '').strip()
 
-    qs = ActivityLog.objects.filter(organization=org)
+    qs = ActivityLog.objects.filter(organization_id=org_id).order_by('-timestamp', '-id')
     if category:
         qs = qs.filter(category=category)
     if search:
-        from django.db.models import Q
-        qs = qs.filter(
-            Q(username__icontains=search) |
-            Q(action__icontains=search)   |
-            Q(description__icontains=search)
-        )
+        qs = search_logs(org_id, qs, search)
+
+    if 'cursor' in request.query_params:
+        cursor = request.query_params['cursor'].strip()
+        if cursor:
+            after = decode_cursor(cursor)
+            if after is None:
+                return Response({'detail': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+            ts, pk = after
+            qs = qs.filter(Q(timestamp__lt=ts) | Q(timestamp=ts, id__lt=pk))
+        logs = list(qs[:page_size + 1])
+        has_more = len(logs) > page_size
+        logs = logs[:page_size]
+        return Response({
+            'results': [log.to_api_dict() for log in logs],
+            'next': encode_cursor(logs[-1].timestamp, logs[-1].pk) if has_more else None,
+        })
 
+    page   = max(1, int(request.query_params.get('page', 1)))
     total  = qs.count()
     offset = (page - 1) * page_size
     logs   = qs[offset: offset + page_size]
@@ -42,6 +42,18 @@ class Customer(models.Model):
     )
     hmo_expiry_date     = models.DateField(null=True, blank=True)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from reports.cache import bump
+        bump(self.organization_id)
+
+    def delete(self, *args, **kwargs):
+        org_id = self.organization_id
+        result = super().delete(*args, **kwargs)
+        from reports.cache import bump
+        bump(org_id)
+        return result
+
     def total_purchases(self):
         return float(self.sales.aggregate(
             total=models.Sum('total_amount'))['total'] or 0)
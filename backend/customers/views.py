@@ -7,8 +7,10 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.throttling import ScopedRateThrottle
 from .models import Customer, WalletTransaction
+from authapp.idempotency import idempotent
 from authapp.utils import require_org, log_activity
 from authapp.permissions import IsCustomerEditor
+from pos.models import Sale
 
 
 @api_view(["GET", "POST"])
@@ -160,6 +162,7 @@ def wallet_transactions(request, pk):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsCustomerEditor])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def wallet_topup(request, pk):
     request.throttle_scope = 'wallet'
     org, err = require_org(request)
@@ -205,6 +208,7 @@ def wallet_topup(request, pk):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsCustomerEditor])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def wallet_deduct(request, pk):
     request.throttle_scope = 'wallet'
     org, err = require_org(request)
@@ -248,13 +252,14 @@ def customer_sales(request, pk):
     if err:
         return err
     customer = get_object_or_404(Customer, pk=pk, organization=org)
-    sales = customer.sales.order_by("-created")
+    sales = Sale.for_api(customer.sales.order_by("-created"))
     return Response([s.to_api_dict() for s in sales])
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsCustomerEditor])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def wallet_reset(request, pk):
     request.throttle_scope = 'wallet'
     org, err = require_org(request)
@@ -328,6 +333,7 @@ def search_customers_global(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsCustomerEditor])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def record_payment(request, pk):
     request.throttle_scope = 'wallet'
     org, err = require_org(request)
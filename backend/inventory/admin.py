@@ -2,10 +2,11 @@ from django.contrib import admin
 from django.db.models import Count, F, FloatField, Q, Sum
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.utils.timezone import localdate
+from django.utils.timezone import localdate, now
 
 from authapp.admin_mixins import OrgScopedAdminMixin
-from .models import Item, RetailItem, WholesaleItem
+from . import availability
+from .models import Item, ItemTombstone, RetailItem, WholesaleItem
 
 
 # ── Custom list filters ───────────────────────────────────────────────────────
@@ -80,44 +81,49 @@ def _expiry_display(obj):
 
 @admin.action(description="Mark selected items as Active")
 def mark_active(modeladmin, request, queryset):
-    updated = queryset.update(status="active")
+    updated = queryset.update(status="active", updated_at=now())
+    availability.refresh(queryset)
     modeladmin.message_user(request, f"{updated} item(s) marked as active.")
 
 
 @admin.action(description="Mark selected items as Inactive")
 def mark_inactive(modeladmin, request, queryset):
-    updated = queryset.update(status="inactive")
+    updated = queryset.update(status="inactive", updated_at=now())
+    availability.refresh(queryset)
     modeladmin.message_user(request, f"{updated} item(s) marked as inactive.")
 
 
 @admin.action(description="Move selected items → Retail store")
 def move_to_retail(modeladmin, request, queryset):
-    updated = queryset.update(store="retail")
+    updated = queryset.update(store="retail", updated_at=now())
     modeladmin.message_user(request, f"{updated} item(s) moved to Retail store.")
 
 
 @admin.action(description="Move selected items → Wholesale store")
 def move_to_wholesale(modeladmin, request, queryset):
-    updated = queryset.update(store="wholesale")
+    updated = queryset.update(store="wholesale", updated_at=now())
     modeladmin.message_user(request, f"{updated} item(s) moved to Wholesale store.")
 
 
 @admin.action(description="Top up stock by +10 units")
 def topup_stock_10(modeladmin, request, queryset):
     # F() update: atomic against concurrent POS stock decrements.
-    updated = queryset.update(stock=F("stock") + 10)
+    updated = queryset.update(stock=F("stock") + 10, updated_at=now())
+    availability.refresh(queryset)
     modeladmin.message_user(request, f"{updated} item(s) topped up by 10 units.")
 
 
 @admin.action(description="Top up stock by +50 units")
 def topup_stock_50(modeladmin, request, queryset):
-    updated = queryset.update(stock=F("stock") + 50)
+    updated = queryset.update(stock=F("stock") + 50, updated_at=now())
+    availability.refresh(queryset)
     modeladmin.message_user(request, f"{updated} item(s) topped up by 50 units.")
 
 
 @admin.action(description="Reset out-of-stock items to 1 unit")
 def reset_to_one(modeladmin, request, queryset):
-    updated = queryset.filter(stock__lte=0).update(stock=1)
+    updated = queryset.filter(stock__lte=0).update(stock=1, updated_at=now())
+    availability.refresh(queryset)
     modeladmin.message_user(request, f"{updated} out-of-stock item(s) reset to 1 unit.")
 
 
@@ -170,6 +176,19 @@ class BaseItemAdmin(OrgScopedAdminMixin, admin.ModelAdmin):
         topup_stock_10, topup_stock_50, reset_to_one,
     ]
 
+    # ── Deletes leave tombstones for delta-sync clients ──────────────────────
+
+    def delete_model(self, request, obj):
+        ItemTombstone.record([obj])
+        super().delete_model(request, obj)
+        availability.refresh([obj])
+
+    def delete_queryset(self, request, queryset):
+        items = list(queryset)
+        ItemTombstone.record(items)
+        super().delete_queryset(request, queryset)
+        availability.refresh(items)
+
     # ── Column helpers ────────────────────────────────────────────────────────
 
     @admin.display(description="Markup", ordering="markup")
@@ -0,0 +1,139 @@
+"""
+Cross-pharmacy availability index.
+
+GET /inventory/availability/ used to scan every organization's Item rows
+with ``name__icontains``. Instead, MedicationAvailability keeps one row per
+(organization, normalized name, normalized brand) holding the best-stocked
+active item's stock and price, and the endpoint reads it with an indexed
+prefix match.
+
+Rows are recomputed for the affected names whenever stock, price, name,
+brand or status changes: by the stock service (inventory.stock), by
+Item.save() and by item deletes. Those callers only record the names
+(``refresh`` / ``refresh_names_on_commit``); the recompute runs once per
+transaction after it commits (``flush``), so a checkout never holds locks on
+shared availability rows. A recompute is three queries however many items it
+covers (read the items, upsert the rows, drop rows that no longer have
+items). Under concurrent sales of one medication a row can lag by one
+transaction until that name's next change — it is a lookup hint, not the
+stock ledger.
+
+Rebuild everything with `manage.py rebuild_availability`.
+"""
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+def normalize_name(text):
+    """Lower-cased, whitespace-collapsed key for a medication name or brand."""
+    return " ".join((text or "").lower().split())
+
+
+def best_rows(rows):
+    """
+    ``rows`` are (org_id, name, brand, stock, price, updated_at) tuples for
+    active items. Returns {(org_id, name_key, brand_key): row} keeping the
+    highest-stock row of each group.
+    """
+    best = {}
+    for row in rows:
+        org_id, name, brand, stock = row[:4]
+        key = (org_id, normalize_name(name), normalize_name(brand))
+        if key not in best or stock > best[key][3]:
+            best[key] = row
+    return best
+
+
+def refresh_names(pairs):
+    """Recompute availability rows for ``(org_id, name)`` pairs."""
+    from .models import Item, MedicationAvailability, STATUS_ACTIVE
+
+    pairs = {(org_id, name) for org_id, name in pairs if org_id and name}
+    if not pairs:
+        return
+
+    item_filter = Q()
+    for org_id, name in pairs:
+        item_filter |= Q(organization_id=org_id, name__iexact=name)
+    rows = (
+        Item.objects.filter(item_filter, status=STATUS_ACTIVE)
+        .values_list("organization_id", "name", "brand", "stock", "price", "updated_at")
+    )
+    best = best_rows(rows)
+
+    now = timezone.now()
+    MedicationAvailability.objects.bulk_create(
+        [
+            MedicationAvailability(
+                organization_id=org_id, name_key=name_key, brand_key=brand_key,
+                name=name, brand=brand, max_stock=stock, price=price,
+                updated_at=updated_at or now,
+            )
+            for (org_id, name_key, brand_key), (_, name, brand, stock, price, updated_at)
+            in best.items()
+        ],
+        update_conflicts=True,
+        update_fields=["name", "brand", "max_stock", "price", "updated_at"],
+        **({"unique_fields": ["organization", "name_key", "brand_key"]}
+           if connection.features.supports_update_conflicts_with_target else {}),
+    )
+
+    # Brands (or whole names) whose last active item went away.
+    present = {}
+    for org_id, name_key, brand_key in best:
+        present.setdefault((org_id, name_key), set()).add(brand_key)
+    stale = Q()
+    for org_id, name in pairs:
+        name_key = normalize_name(name)
+        stale |= Q(organization_id=org_id, name_key=name_key) & ~Q(
+            brand_key__in=present.get((org_id, name_key), ()))
+    MedicationAvailability.objects.filter(stale).delete()
+
+
+_pending = threading.local()
+
+
+def _pending_sets():
+    if not hasattr(_pending, "pairs"):
+        _pending.pairs, _pending.pks = set(), set()
+    return _pending
+
+
+def refresh(items):
+    """Schedule a recompute for the names of ``items`` (instances or pks) on commit."""
+    from .models import Item
+
+    pending = _pending_sets()
+    for item in items:
+        if isinstance(item, Item):
+            pending.pairs.add((item.organization_id, item.name))
+        else:
+            pending.pks.add(item)
+    transaction.on_commit(flush, robust=True)
+
+
+def refresh_names_on_commit(pairs):
+    """Schedule a recompute for ``(org_id, name)`` pairs on commit."""
+    _pending_sets().pairs.update(pairs)
+    transaction.on_commit(flush, robust=True)
+
+
+def flush():
+    """Recompute every name scheduled on this thread. Runs after commit."""
+    from .models import Item
+
+    pending = _pending_sets()
+    pairs, pks = pending.pairs, pending.pks
+    if not pairs and not pks:
+        return
+    pending.pairs, pending.pks = set(), set()
+    if pks:
+        pairs |= set(Item.objects.filter(pk__in=pks).values_list("organization_id", "name"))
+    refresh_names(pairs)
+    # Stock changes, deletes and admin bulk edits all end here, so this is
+    # also where their cached inventory reports are invalidated.
+    from reports.cache import bump_many
+    bump_many(org_id for org_id, _ in pairs)
@@ -0,0 +1,140 @@
+"""
+Barcode / GTIN resolution.
+
+Scanners hand us the same product code in several shapes: a UPC-A
+"012345678905", the EAN-13 "0012345678905" or the GTIN-14
+"00012345678905". ``normalize_code`` strips leading zeros from numeric
+codes (and upper-cases anything else), so all of them map to one key.
+Item.save() stores the key of its barcode and GTIN in ``barcode_key`` /
+``gtin_key``, which are indexed per organization, and a lookup becomes one
+indexed equality query instead of a chain of exact / ``endswith`` scans.
+
+Resolved ``(org_id, key) → item id`` pairs are kept in a small in-process
+LRU cache. A cache hit is confirmed against the item's current keys when
+the row is loaded, so an entry made stale by a save in another worker
+process is dropped instead of served. Misses are never cached.
+
+Usage:
+    from inventory.barcodes import resolve_code, resolve_codes
+    item = resolve_code(org, "0012345678905")          # Item or None
+    found = resolve_codes(org, ["501...", "036..."])   # {code: Item}
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def normalize_code(code):
+    """Canonical lookup key for a scanned barcode / GTIN ('' for blank input)."""
+    code = "".join(str(code or "").split())
+    if code.isdigit():
+        return code.lstrip("0") or "0"
+    return code.upper()
+
+
+class _LRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = _LRU(getattr(settings, "BARCODE_CACHE_SIZE", 4096))
+
+
+def forget(item):
+    """Drop cached lookups for ``item``'s current codes (called from Item.save)."""
+    for key in (item.barcode_key, item.gtin_key):
+        if key:
+            _cache.discard((item.organization_id, key))
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def _matches(item, key):
+    return key in (item.barcode_key, item.gtin_key)
+
+
+def _pick(candidates, key):
+    # A barcode match wins over a GTIN match; ties go to the lowest id.
+    candidates = sorted(candidates, key=lambda i: (i.barcode_key != key, i.pk))
+    return candidates[0] if candidates else None
+
+
+def resolve_codes(org, codes):
+    """
+    Resolve many scanned codes in at most two queries (cached ids, then the
+    rest). Returns ``{original code: Item}``; codes with no match are absent.
+    """
+    from .models import Item
+
+    keys = {}
+    for code in codes:
+        key = normalize_code(code)
+        if key:
+            keys.setdefault(key, []).append(code)
+    if not keys:
+        return {}
+
+    found = {}
+    cached = {}
+    for key in keys:
+        pk = _cache.get((org.pk, key))
+        if pk is not None:
+            cached[pk] = key
+    if cached:
+        for item in Item.objects.filter(pk__in=cached.keys(), organization=org):
+            key = cached[item.pk]
+            if _matches(item, key):
+                found[key] = item
+            else:
+                _cache.discard((org.pk, key))
+
+    missing = [k for k in keys if k not in found]
+    if missing:
+        by_key = {}
+        rows = Item.objects.filter(
+            Q(barcode_key__in=missing) | Q(gtin_key__in=missing), organization=org,
+        )
+        for item in rows:
+            for key in {item.barcode_key, item.gtin_key}:
+                if key in keys:
+                    by_key.setdefault(key, []).append(item)
+        for key, candidates in by_key.items():
+            item = _pick(candidates, key)
+            found[key] = item
+            _cache.set((org.pk, key), item.pk)
+
+    return {code: found[key] for key, originals in keys.items() if key in found
+            for code in originals}
+
+
+def resolve_code(org, code):
+    """The Item a single scanned code refers to, or None."""
+    return resolve_codes(org, [code]).get(code)
@@ -0,0 +1,32 @@
+"""
+Management command: purge_item_tombstones
+
+Deletes item tombstones older than INVENTORY_TOMBSTONE_RETENTION_DAYS.
+Delta-sync clients whose cursor predates the window are told to reset their
+cache, so older tombstones are never read again.
+
+Usage:
+    python manage.py purge_item_tombstones
+
+Cron example (daily at 03:30):
+    30 3 * * * /path/to/venv/bin/python /path/to/manage.py purge_item_tombstones \
+               --settings pharmapi.settings.prod >> /var/log/purge_item_tombstones.log 2>&1
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.models import ItemTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete item tombstones older than the delta-sync retention window.'
+
+    def handle(self, *args, **options):
+        days = getattr(settings, 'INVENTORY_TOMBSTONE_RETENTION_DAYS', 30)
+        deleted, _ = ItemTombstone.objects.filter(
+            deleted_at__lt=timezone.now() - timedelta(days=days)
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} item tombstone(s).'))
@@ -0,0 +1,36 @@
+"""
+Management command: rebuild_availability
+
+Recomputes the cross-pharmacy availability index (MedicationAvailability)
+from Item rows. Stock and item writes keep it current, so this is only
+needed after bulk imports or raw SQL edits.
+
+Usage:
+    python manage.py rebuild_availability
+    python manage.py rebuild_availability --org 12
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.availability import refresh_names
+from inventory.models import Item, MedicationAvailability
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the cross-pharmacy medication availability index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Only rebuild rows of this organization id.')
+
+    def handle(self, *args, **options):
+        items = Item.objects.filter(organization__isnull=False)
+        rows = MedicationAvailability.objects.all()
+        if options.get('org'):
+            items = items.filter(organization_id=options['org'])
+            rows = rows.filter(organization_id=options['org'])
+        pairs = sorted(set(items.values_list('organization_id', 'name')))
+        with transaction.atomic():
+            rows.delete()
+            for start in range(0, len(pairs), 200):
+                refresh_names(pairs[start:start + 200])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows.count()} availability row(s).'))
@@ -0,0 +1,32 @@
+"""
+Management command: rebuild_item_search_index
+
+Recomputes the trigram search index (ItemTrigram) for every item. Item.save()
+keeps the index current, so this is only needed after bulk imports or raw
+SQL edits that bypass save().
+
+Usage:
+    python manage.py rebuild_item_search_index
+    python manage.py rebuild_item_search_index --org 12
+"""
+from django.core.management.base import BaseCommand
+
+from inventory.models import Item
+from inventory.search import index_item
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram search index for inventory items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Only rebuild items of this organization id.')
+
+    def handle(self, *args, **options):
+        items = Item.objects.filter(organization__isnull=False)
+        if options.get('org'):
+            items = items.filter(organization_id=options['org'])
+        count = 0
+        for item in items.only('id', 'organization_id', 'name', 'brand', 'barcode').iterator(chunk_size=500):
+            index_item(item)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} item(s).'))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('branches', '0001_initial'),
+        ('inventory', '0007_item_reorder_level'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.IntegerField()),
+                ('store', models.CharField(blank=True, default='', max_length=20)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['organization', 'updated_at', 'id'], name='item_org_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='itemtombstone',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_tombstones', to='authapp.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='itemtombstone',
+            index=models.Index(fields=['organization', 'deleted_at', 'item_id'], name='tombstone_org_deleted_idx'),
+        ),
+    ]
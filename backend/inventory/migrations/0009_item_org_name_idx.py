@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('branches', '0001_initial'),
+        ('inventory', '0008_item_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['organization', 'name', 'id'], name='item_org_name_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:40
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(*texts):
+    # Frozen copy of inventory.search.trigrams as of this migration.
+    grams = set()
+    for text in texts:
+        for word in _WORD_RE.findall((text or "").lower()):
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def build_index(apps, schema_editor):
+    Item = apps.get_model("inventory", "Item")
+    ItemTrigram = apps.get_model("inventory", "ItemTrigram")
+    batch = []
+    items = Item.objects.filter(organization__isnull=False).only(
+        "id", "organization_id", "name", "brand", "barcode")
+    for item in items.iterator(chunk_size=500):
+        batch.extend(
+            ItemTrigram(organization_id=item.organization_id, item_id=item.id, gram=gram)
+            for gram in trigrams(item.name, item.brand, item.barcode)
+        )
+        if len(batch) >= 5000:
+            ItemTrigram.objects.bulk_create(batch)
+            batch = []
+    ItemTrigram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('inventory', '0009_item_org_name_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='inventory.item')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_trigrams', to='authapp.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'gram'], name='trigram_org_gram_idx')],
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:41
+
+from django.db import migrations, models
+
+
+def normalize_code(code):
+    # Frozen copy of inventory.barcodes.normalize_code as of this migration.
+    code = "".join(str(code or "").split())
+    if code.isdigit():
+        return code.lstrip("0") or "0"
+    return code.upper()
+
+
+def fill_keys(apps, schema_editor):
+    Item = apps.get_model("inventory", "Item")
+    batch = []
+    for item in Item.objects.only("id", "barcode", "gtin").iterator(chunk_size=500):
+        item.barcode_key = normalize_code(item.barcode)
+        item.gtin_key = normalize_code(item.gtin)
+        batch.append(item)
+        if len(batch) >= 500:
+            Item.objects.bulk_update(batch, ["barcode_key", "gtin_key"])
+            batch = []
+    Item.objects.bulk_update(batch, ["barcode_key", "gtin_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('branches', '0001_initial'),
+        ('inventory', '0010_itemtrigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='barcode_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='gtin_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['organization', 'barcode_key'], name='item_org_barcode_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['organization', 'gtin_key'], name='item_org_gtin_key_idx'),
+        ),
+        migrations.RunPython(fill_keys, migrations.RunPython.noop),
+    ]
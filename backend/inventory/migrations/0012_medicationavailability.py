@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def normalize_name(text):
+    # Frozen copies of inventory.availability helpers as of this migration.
+    return " ".join((text or "").lower().split())
+
+
+def best_rows(rows):
+    best = {}
+    for row in rows:
+        org_id, name, brand, stock = row[:4]
+        key = (org_id, normalize_name(name), normalize_name(brand))
+        if key not in best or stock > best[key][3]:
+            best[key] = row
+    return best
+
+
+def build_availability(apps, schema_editor):
+    Item = apps.get_model("inventory", "Item")
+    MedicationAvailability = apps.get_model("inventory", "MedicationAvailability")
+    rows = (
+        Item.objects.filter(organization__isnull=False, status="active")
+        .values_list("organization_id", "name", "brand", "stock", "price", "updated_at")
+        .iterator(chunk_size=2000)
+    )
+    MedicationAvailability.objects.bulk_create(
+        [
+            MedicationAvailability(
+                organization_id=org_id, name_key=name_key, brand_key=brand_key,
+                name=name, brand=brand, max_stock=stock, price=price,
+                updated_at=updated_at or timezone.now(),
+            )
+            for (org_id, name_key, brand_key), (_, name, brand, stock, price, updated_at)
+            in best_rows(rows).items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('inventory', '0011_item_code_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MedicationAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name_key', models.CharField(max_length=200)),
+                ('brand_key', models.CharField(blank=True, default='', max_length=200)),
+                ('name', models.CharField(max_length=200)),
+                ('brand', models.CharField(blank=True, default='', max_length=200)),
+                ('max_stock', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='medication_availability', to='authapp.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name_key'], name='availability_name_idx')],
+                'constraints': [models.UniqueConstraint(fields=('organization', 'name_key', 'brand_key'), name='availability_org_name_brand_uniq')],
+            },
+        ),
+        migrations.RunPython(build_availability, migrations.RunPython.noop),
+    ]
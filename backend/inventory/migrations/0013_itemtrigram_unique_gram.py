@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:34
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicate_grams(apps, schema_editor):
+    ItemTrigram = apps.get_model("inventory", "ItemTrigram")
+    dupes = (
+        ItemTrigram.objects.values("item_id", "gram")
+        .annotate(keep=Min("id"), n=Count("id"))
+        .filter(n__gt=1)
+    )
+    for row in list(dupes):
+        ItemTrigram.objects.filter(item_id=row["item_id"], gram=row["gram"]).exclude(
+            id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_medicationavailability'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_grams, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='itemtrigram',
+            constraint=models.UniqueConstraint(fields=('item', 'gram'), name='trigram_item_gram_uniq'),
+        ),
+    ]
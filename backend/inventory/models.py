@@ -99,6 +99,9 @@ class Item(models.Model):
         max_length=20, choices=BARCODE_TYPE_CHOICES, blank=True, default=""
     )
     gtin = models.CharField(max_length=50, blank=True, default="")
+    # Normalized copies of barcode / gtin for lookups — see inventory.barcodes.
+    barcode_key = models.CharField(max_length=100, blank=True, default="", editable=False)
+    gtin_key = models.CharField(max_length=50, blank=True, default="", editable=False)
     batch_number = models.CharField(max_length=50, blank=True, default="")
     serial_number = models.CharField(max_length=50, blank=True, default="")
     expiry_date = models.DateField(null=True, blank=True)
@@ -112,6 +115,26 @@ class Item(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Delta sync: WHERE organization_id = ? AND (updated_at, id) > cursor
+            models.Index(fields=["organization", "updated_at", "id"],
+                         name="item_org_updated_idx"),
+            # Keyset pagination: ORDER BY name, id after a (name, id) cursor
+            models.Index(fields=["organization", "name", "id"],
+                         name="item_org_name_idx"),
+            models.Index(fields=["organization", "barcode_key"],
+                         name="item_org_barcode_key_idx"),
+            models.Index(fields=["organization", "gtin_key"],
+                         name="item_org_gtin_key_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored name so a rename can refresh the old
+        # availability row as well as the new one.
+        instance._loaded_name = instance.__dict__.get("name")
+        return instance
 
     def save(self, *args, **kwargs):
         if self.markup and not self.pk:
@@ -120,7 +143,28 @@ class Item(models.Model):
             cost = Decimal(str(self.cost))
             markup = Decimal(str(self.markup))
             self.price = cost + (cost * markup / Decimal("100"))
+        from .barcodes import forget, normalize_code
+        self.barcode_key = normalize_code(self.barcode)
+        self.gtin_key = normalize_code(self.gtin)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            if "barcode" in update_fields:
+                update_fields = [*update_fields, "barcode_key"]
+            if "gtin" in update_fields:
+                update_fields = [*update_fields, "gtin_key"]
+            kwargs["update_fields"] = update_fields
         super().save(*args, **kwargs)
+        forget(self)
+        if update_fields is None or {"name", "brand", "barcode"} & set(update_fields):
+            from .search import index_item
+            index_item(self)
+        if update_fields is None or {"name", "brand", "stock", "price", "status"} & set(update_fields):
+            from .availability import refresh_names_on_commit
+            refresh_names_on_commit({(self.organization_id, self.name),
+                                     (self.organization_id, getattr(self, "_loaded_name", None))})
+            self._loaded_name = self.name
+        from reports.cache import bump
+        bump(self.organization_id)
 
     def to_api_dict(self):
         return {
@@ -150,6 +194,126 @@ class Item(models.Model):
         return f"{self.name} ({self.brand})" if self.brand else self.name
 
 
+def _iso_or_none(value):
+    return value.isoformat() if value else None
+
+
+# API key → (model field, converter) for serializing straight from
+# .values_list() rows. Must stay in step with Item.to_api_dict().
+ITEM_API_FIELDS = {
+    "id": ("id", None),
+    "branch_id": ("branch_id", lambda v: v or 0),
+    "name": ("name", None),
+    "brand": ("brand", None),
+    "dosageForm": ("dosage_form", None),
+    "unitOfDispensing": ("unit", None),
+    "cost": ("cost", float),
+    "price": ("price", float),
+    "markup": ("markup", float),
+    "stock": ("stock", float),
+    "lowStockThreshold": ("low_stock_threshold", None),
+    "reorderLevel": ("reorder_level", None),
+    "barcode": ("barcode", None),
+    "barcodeType": ("barcode_type", None),
+    "gtin": ("gtin", None),
+    "batchNumber": ("batch_number", None),
+    "serialNumber": ("serial_number", None),
+    "expiryDate": ("expiry_date", _iso_or_none),
+    "status": ("status", None),
+    "store": ("store", None),
+}
+
+
+class ItemTombstone(models.Model):
+    """
+    Marker left behind when an Item is deleted, so delta-sync clients
+    (GET /inventory/items/changes/) can drop it from their local cache.
+    ``item_id`` is a plain integer — the row it pointed to is gone.
+    """
+    organization = models.ForeignKey(
+        'authapp.Organization', on_delete=models.CASCADE,
+        related_name='item_tombstones'
+    )
+    item_id = models.IntegerField()
+    store = models.CharField(max_length=20, blank=True, default="")
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "deleted_at", "item_id"],
+                         name="tombstone_org_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"Deleted item #{self.item_id}"
+
+    @classmethod
+    def record(cls, items):
+        """Create tombstones for ``items`` (instances or a queryset) before they are deleted."""
+        now = timezone.now()
+        cls.objects.bulk_create([
+            cls(organization_id=item.organization_id, item_id=item.pk,
+                store=item.store, deleted_at=now)
+            for item in items if item.organization_id
+        ])
+
+    def to_api_dict(self):
+        return {"id": self.item_id, "store": self.store}
+
+
+class ItemTrigram(models.Model):
+    """One 3-gram of an Item's name/brand/barcode — see inventory.search."""
+    organization = models.ForeignKey(
+        'authapp.Organization', on_delete=models.CASCADE,
+        related_name='item_trigrams'
+    )
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='trigrams')
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "gram"], name="trigram_org_gram_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["item", "gram"], name="trigram_item_gram_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.gram!r} → item #{self.item_id}"
+
+
+class MedicationAvailability(models.Model):
+    """
+    Best-stocked active item per (organization, medication name, brand),
+    read by the cross-pharmacy availability lookup. Derived data — kept
+    current by inventory.availability.
+    """
+    organization = models.ForeignKey(
+        'authapp.Organization', on_delete=models.CASCADE,
+        related_name='medication_availability'
+    )
+    name_key = models.CharField(max_length=200)
+    brand_key = models.CharField(max_length=200, blank=True, default="")
+    name = models.CharField(max_length=200)
+    brand = models.CharField(max_length=200, blank=True, default="")
+    max_stock = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["organization", "name_key", "brand_key"],
+                                    name="availability_org_name_brand_uniq"),
+        ]
+        indexes = [
+            # Prefix lookups: WHERE name_key LIKE 'amox%'
+            models.Index(fields=["name_key"], name="availability_name_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} @ org #{self.organization_id}: {self.max_stock}"
+
+
 class RetailItem(Item):
     """Proxy of Item scoped to the retail store — for admin organisation."""
     class Meta:
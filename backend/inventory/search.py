@@ -0,0 +1,103 @@
+"""
+Trigram search index for inventory.
+
+Each Item's name, brand and barcode are split into 3-character grams
+(pg_trgm style: every word padded with two leading spaces and one trailing
+space) and stored in ItemTrigram. A fuzzy query is split the same way and
+matched with one indexed ``gram IN (...)`` lookup grouped by item, so a
+misspelling like "amoxcilin" still shares most of its grams with
+"Amoxicillin", and the cost follows the number of matching grams rather
+than the size of the catalogue.
+
+Usage:
+    from inventory.search import ranked_search
+    items = ranked_search(org, Item.objects.filter(organization=org), "amoxcilin")
+
+The index is kept current by Item.save(); rows disappear with their item
+(FK cascade). Each (item, gram) pair is stored once. Rebuild it with `manage.py rebuild_item_search_index`.
+"""
+import math
+import re
+
+from django.db.models import Count
+
+# Fraction of the query's grams an item must contain to be returned.
+MIN_SCORE = 0.5
+# Upper bound on items scored per query.
+MAX_CANDIDATES = 200
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(*texts):
+    """Set of padded, lower-cased 3-grams over all words in ``texts``."""
+    grams = set()
+    for text in texts:
+        for word in _WORD_RE.findall((text or "").lower()):
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def item_trigrams(item):
+    return trigrams(item.name, item.brand, item.barcode)
+
+
+def index_item(item):
+    """Bring ``item``'s grams in line with its current name/brand/barcode."""
+    from .models import ItemTrigram
+
+    if not item.pk or not item.organization_id:
+        return
+    wanted = item_trigrams(item)
+    existing = set(ItemTrigram.objects.filter(item=item).values_list("gram", flat=True))
+    stale = existing - wanted
+    if stale:
+        ItemTrigram.objects.filter(item=item, gram__in=stale).delete()
+    fresh = wanted - existing
+    if fresh:
+        # A concurrent save of the same item may insert the same grams; the
+        # (item, gram) unique constraint keeps one of each.
+        ItemTrigram.objects.bulk_create([
+            ItemTrigram(organization_id=item.organization_id, item_id=item.pk, gram=gram)
+            for gram in fresh
+        ], ignore_conflicts=True)
+
+
+def ranked_search(org, items, query, limit=50):
+    """
+    Up to ``limit`` Items from ``items`` ranked by similarity to ``query``,
+    best first. Each returned item carries ``match_score`` — the fraction
+    of the query's grams it contains (1.0 = every gram matched).
+    """
+    from .models import ItemTrigram
+
+    query_grams = trigrams(query)
+    if not query_grams:
+        return []
+    min_hits = max(1, math.ceil(len(query_grams) * MIN_SCORE))
+    # Scope to ``items`` (branch, store, stock filters) before capping, so the
+    # candidates are never used up by items the caller would discard.
+    hits = dict(
+        ItemTrigram.objects
+        .filter(organization=org, gram__in=query_grams,
+                item__in=items.order_by().values("pk"))
+        .values("item_id")
+        .annotate(hits=Count("id"))
+        .filter(hits__gte=min_hits)
+        .order_by("-hits")
+        .values_list("item_id", "hits")[:MAX_CANDIDATES]
+    )
+    if not hits:
+        return []
+
+    ranked = []
+    for item in items.filter(pk__in=hits.keys()):
+        matched = hits[item.pk]
+        coverage = matched / len(query_grams)
+        # Tie-break: prefer items with fewer unmatched grams of their own.
+        jaccard = matched / len(query_grams | item_trigrams(item))
+        item.match_score = round(coverage, 3)
+        ranked.append((-coverage, -jaccard, item.name, item.pk, item))
+    ranked.sort(key=lambda row: row[:4])
+    return [row[-1] for row in ranked[:limit]]
@@ -0,0 +1,151 @@
+"""
+Stock mutation service.
+
+Every stock change is a single conditional ``UPDATE`` evaluated by the
+database, e.g.::
+
+    UPDATE inventory_item SET stock = stock - 3 WHERE id = 42 AND stock >= 3
+
+so concurrent sales of the same item never need a locking read and never
+rewrite the rest of the row. An affected-row count of zero on a decrement
+means the item no longer has enough stock.
+
+Usage:
+    from inventory.stock import decrement_stock, InsufficientStock
+    try:
+        decrement_stock(item, qty)
+    except InsufficientStock as e:
+        return Response({"detail": str(e)}, status=400)
+
+Callers that need all-or-nothing semantics across several items must run
+these inside ``transaction.atomic()``.
+
+Every mutation also schedules a refresh of the cross-pharmacy availability
+rows of the items it touched, run once the transaction commits (see
+inventory.availability).
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import availability
+from .models import Item
+
+
+def _name(item):
+    name = getattr(item, "name", None)
+    if name is None:
+        # Error path only — worth one query for a readable message.
+        name = Item.objects.filter(pk=item).values_list("name", flat=True).first()
+    return name or f"item #{_pk(item)}"
+
+
+class InsufficientStock(ValueError):
+    """Raised when a conditional decrement matched no row."""
+
+    def __init__(self, item, requested):
+        self.item = item
+        self.requested = requested
+        super().__init__(f"Insufficient stock for {_name(item)}")
+
+
+class StockGuardMismatch(ValueError):
+    """Raised when the item has the stock but no longer matches a guard (e.g. ``store``)."""
+
+    def __init__(self, item, guard):
+        self.item = item
+        self.guard = guard
+        if "store" in guard:
+            detail = f"is no longer in the {guard['store']} store"
+        else:
+            detail = "no longer matches " + ", ".join(f"{k}={v}" for k, v in guard.items())
+        super().__init__(f"Item '{_name(item)}' {detail}")
+
+
+def _pk(item):
+    return item.pk if isinstance(item, Item) else item
+
+
+def _qty(qty):
+    return qty if isinstance(qty, Decimal) else Decimal(str(qty))
+
+
+def _sync(item, qty_delta, now):
+    # Keep an in-memory instance roughly in step for callers that go on to
+    # serialize it; refresh_from_db() is the authoritative value.
+    if isinstance(item, Item):
+        item.stock = item.stock + qty_delta
+        item.updated_at = now
+
+
+def _decrement(item, qty, guard):
+    qty = _qty(qty)
+    now = timezone.now()
+    updated = Item.objects.filter(pk=_pk(item), stock__gte=qty, **guard).update(
+        stock=F("stock") - qty, updated_at=now,
+    )
+    if not updated:
+        if guard and Item.objects.filter(pk=_pk(item), stock__gte=qty).exists():
+            raise StockGuardMismatch(item, guard)
+        raise InsufficientStock(item, qty)
+    _sync(item, -qty, now)
+
+
+def decrement_stock(item, qty, **guard):
+    """
+    Subtract ``qty`` from ``item`` only if at least ``qty`` is in stock.
+
+    ``item`` may be an Item instance or a primary key. Extra keyword
+    arguments are added to the WHERE clause (e.g. ``store="retail"``).
+    Raises InsufficientStock when no row was updated, or StockGuardMismatch
+    when the stock is there but the guard no longer matches.
+    """
+    _decrement(item, qty, guard)
+    availability.refresh([item])
+
+
+def decrement_many(quantities, **guard):
+    """
+    Apply ``decrement_stock`` for each ``{item: qty}`` pair, in primary-key
+    order so concurrent multi-item transactions acquire row locks in the same
+    sequence. Quantities for the same item must already be summed.
+    """
+    for item, qty in sorted(quantities.items(), key=lambda kv: _pk(kv[0])):
+        _decrement(item, qty, guard)
+    availability.refresh(quantities)
+
+
+def increment_stock(item, qty):
+    """Add ``qty`` to ``item`` (returns, transfers in)."""
+    qty = _qty(qty)
+    now = timezone.now()
+    Item.objects.filter(pk=_pk(item)).update(stock=F("stock") + qty, updated_at=now)
+    _sync(item, qty, now)
+    availability.refresh([item])
+
+
+def adjust_stock(item, delta):
+    """
+    Apply a signed manual adjustment, flooring the result at zero.
+    Returns the new stock level read back from the database.
+    """
+    delta = _qty(delta)
+    now = timezone.now()
+    field = Item._meta.get_field("stock")
+    Item.objects.filter(pk=_pk(item)).update(
+        stock=Greatest(
+            F("stock") + Value(delta, output_field=field),
+            Value(Decimal("0"), output_field=field),
+            output_field=DecimalField(max_digits=field.max_digits,
+                                      decimal_places=field.decimal_places),
+        ),
+        updated_at=now,
+    )
+    stock = Item.objects.filter(pk=_pk(item)).values_list("stock", flat=True).first()
+    if isinstance(item, Item) and stock is not None:
+        item.stock = stock
+        item.updated_at = now
+    availability.refresh([item])
+    return stock
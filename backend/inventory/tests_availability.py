@@ -0,0 +1,105 @@
+"""
+Cross-pharmacy availability index.
+
+Verifies:
+- The lookup returns one entry per pharmacy with its best-stocked match,
+  matched by name prefix.
+- Sales through the stock service, renames and deletes keep the index current.
+- The recompute runs after commit, once per transaction: a sale's own
+  transaction never touches the availability table.
+- network_id restricts results to active members and requires membership.
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import (
+    Organization, PharmacyNetwork, PharmacyNetworkMembership, PharmUser,
+)
+from inventory.models import Item, MedicationAvailability
+from inventory.stock import decrement_many, decrement_stock
+from inventory.views import item_detail, medication_availability
+
+
+class MedicationAvailabilityTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org_a = Organization.objects.create(name="Pharmacy A")
+        self.org_b = Organization.objects.create(name="Pharmacy B")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000009", password="pass1234", role="Admin",
+            organization=self.org_a,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_items()
+
+    def _create_items(self):
+        self.a_small = Item.objects.create(organization=self.org_a, name="Amoxicillin 500mg",
+                                           brand="Amoxil", stock=Decimal("5"), price=Decimal("300"))
+        self.a_big = Item.objects.create(organization=self.org_a, name="Amoxicillin 250mg",
+                                         stock=Decimal("40"), price=Decimal("200"))
+        self.b_item = Item.objects.create(organization=self.org_b, name="amoxicillin  500MG",
+                                          stock=Decimal("12"), price=Decimal("350"))
+
+    def _lookup(self, **params):
+        req = self.factory.get("/api/inventory/availability/", params)
+        force_authenticate(req, user=self.user)
+        return medication_availability(req)
+
+    def test_one_entry_per_pharmacy_best_stock_first(self):
+        resp = self._lookup(name="Amoxi")
+        self.assertEqual([(r["pharmacy_id"], r["stock_quantity"]) for r in resp.data],
+                         [(self.org_a.id, 40), (self.org_b.id, 12)])
+        self.assertEqual(resp.data[0]["price"], 200.0)
+
+    def test_stock_mutations_update_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            decrement_stock(self.b_item, 12)
+        resp = self._lookup(name="amoxicillin 500")
+        self.assertEqual([r["pharmacy_id"] for r in resp.data], [self.org_a.id])
+
+        self.a_big.name = "Ampiclox"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.a_big.save()
+        self.assertEqual(self._lookup(name="amoxi").data[0]["stock_quantity"], 5)
+        self.assertEqual(self._lookup(name="ampi").data[0]["stock_quantity"], 40)
+
+        req = self.factory.delete(f"/api/inventory/items/{self.a_small.id}/")
+        force_authenticate(req, user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            item_detail(req, pk=self.a_small.id)
+        self.assertEqual(self._lookup(name="amoxi").data, [])
+
+    def test_refresh_deferred_to_commit(self):
+        with CaptureQueriesContext(connection) as ctx:
+            with self.captureOnCommitCallbacks() as callbacks:
+                decrement_many({self.a_big: Decimal("40"), self.a_small: Decimal("1")})
+        self.assertFalse([q for q in ctx.captured_queries
+                          if "inventory_medicationavailability" in q["sql"]])
+        org_a_stock = lambda: {r["pharmacy_id"]: r["stock_quantity"]
+                               for r in self._lookup(name="amoxi").data}[self.org_a.id]
+        self.assertEqual(org_a_stock(), 40)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(org_a_stock(), 4)
+
+    def test_network_filter(self):
+        network = PharmacyNetwork.objects.create(name="Net", created_by=self.org_a)
+        PharmacyNetworkMembership.objects.create(network=network, organization=self.org_a,
+                                                 status="active")
+        resp = self._lookup(name="amoxi", network_id=network.id)
+        self.assertEqual([r["pharmacy_id"] for r in resp.data], [self.org_a.id])
+
+        other = PharmacyNetwork.objects.create(name="Other", created_by=self.org_b)
+        self.assertEqual(self._lookup(name="amoxi", network_id=other.id).status_code, 403)
+
+    def test_rebuild_command(self):
+        MedicationAvailability.objects.all().delete()
+        call_command("rebuild_availability", stdout=StringIO())
+        self.assertEqual(MedicationAvailability.objects.count(), 3)
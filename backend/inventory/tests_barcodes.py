@@ -0,0 +1,84 @@
+"""
+Normalized barcode / GTIN resolution.
+
+Verifies:
+- UPC-A, EAN-13 and GTIN-14 forms of one code resolve to the same item,
+  through either the barcode or the GTIN column.
+- A repeat scan is served from the LRU cache with a single primary-key query.
+- Changing an item's barcode invalidates the cached mapping.
+- POST /pos/barcode/batch/ resolves a scan session in one item query and
+  reports misses; a body that is not a JSON object is a 400.
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from inventory.barcodes import clear_cache, normalize_code, resolve_code
+from inventory.models import Item
+from pos.views import barcode_batch_lookup, barcode_lookup
+
+
+class BarcodeResolutionTest(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Test Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000008", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.by_barcode = Item.objects.create(
+            organization=self.org, name="Panadol", barcode="012345678905")
+        self.by_gtin = Item.objects.create(
+            organization=self.org, name="Amoxil", gtin="05012345678900")
+
+    def test_code_forms_are_equivalent(self):
+        self.assertEqual(normalize_code("00012345678905"), normalize_code("012345678905"))
+        for code in ("012345678905", "0012345678905", "00012345678905"):
+            self.assertEqual(resolve_code(self.org, code), self.by_barcode)
+        self.assertEqual(resolve_code(self.org, "5012345678900"), self.by_gtin)
+        self.assertIsNone(resolve_code(self.org, "999"))
+
+    def test_repeat_scan_uses_cache(self):
+        resolve_code(self.org, "012345678905")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(resolve_code(self.org, "12345678905"), self.by_barcode)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('"inventory_item"."id" IN', ctx.captured_queries[0]["sql"])
+
+    def test_barcode_change_invalidates_cache(self):
+        resolve_code(self.org, "012345678905")
+        self.by_barcode.barcode = "111"
+        self.by_barcode.save()
+        self.by_gtin.barcode = "012345678905"
+        self.by_gtin.save()
+        self.assertEqual(resolve_code(self.org, "012345678905"), self.by_gtin)
+
+    def test_lookup_endpoint(self):
+        req = self.factory.get("/api/pos/barcode/lookup/", {"code": "0012345678905"})
+        force_authenticate(req, user=self.user)
+        resp = barcode_lookup(req)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["id"], self.by_barcode.id)
+
+    def test_batch_endpoint_one_query(self):
+        req = self.factory.post("/api/pos/barcode/batch/", {
+            "codes": ["012345678905", "05012345678900", "404"],
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = barcode_batch_lookup(req)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["matches"]["012345678905"]["id"], self.by_barcode.id)
+        self.assertEqual(resp.data["matches"]["05012345678900"]["id"], self.by_gtin.id)
+        self.assertEqual(resp.data["misses"], ["404"])
+        item_queries = [q for q in ctx.captured_queries if 'FROM "inventory_item"' in q["sql"]]
+        self.assertEqual(len(item_queries), 1)
+
+    def test_batch_endpoint_rejects_non_object_body(self):
+        for body in (["012345678905"], "012345678905"):
+            req = self.factory.post("/api/pos/barcode/batch/", body, format="json")
+            force_authenticate(req, user=self.user)
+            self.assertEqual(barcode_batch_lookup(req).status_code, 400)
@@ -0,0 +1,87 @@
+"""
+GET /api/inventory/items/changes/ — delta sync.
+
+Verifies:
+- Without a cursor every item is returned; with one only later changes are.
+- Pages are cut on (updated_at, id) and chained through the cursor.
+- Deleting through item_detail leaves a tombstone that shows up in "deleted".
+- A cursor older than the tombstone retention window asks for a reset.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from inventory.models import Item
+from authapp.utils import encode_cursor
+from inventory.views import item_changes, item_detail
+
+
+class ItemChangesTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Test Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000005", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.items = [
+            Item.objects.create(organization=self.org, name=f"Item {n}",
+                                price=Decimal("10"), stock=Decimal("5"))
+            for n in range(5)
+        ]
+        # Age the catalogue past the settle window so cursors can move past it.
+        self.old = timezone.now() - timedelta(hours=1)
+        Item.objects.update(updated_at=self.old)
+
+    def _changes(self, **params):
+        req = self.factory.get("/api/inventory/items/changes/", params)
+        force_authenticate(req, user=self.user)
+        return item_changes(req)
+
+    def test_full_snapshot_then_incremental(self):
+        first = self._changes()
+        self.assertEqual(len(first.data["items"]), 5)
+        self.assertFalse(first.data["hasMore"])
+
+        second = self._changes(since=first.data["cursor"])
+        self.assertEqual(second.data["items"], [])
+
+        item = self.items[2]
+        item.price = Decimal("12")
+        item.save()
+        third = self._changes(since=first.data["cursor"])
+        self.assertEqual([i["id"] for i in third.data["items"]], [item.id])
+
+    def test_pages_chain_through_cursor(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["since"] = cursor
+            resp = self._changes(**params)
+            seen += [i["id"] for i in resp.data["items"]]
+            cursor = resp.data["cursor"]
+            if not resp.data["hasMore"]:
+                break
+        self.assertEqual(sorted(seen), sorted(i.id for i in self.items))
+        self.assertEqual(len(seen), 5)
+
+    def test_delete_returns_tombstone(self):
+        cursor = self._changes().data["cursor"]
+        victim = self.items[0]
+        req = self.factory.delete(f"/api/inventory/items/{victim.id}/")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(item_detail(req, pk=victim.id).status_code, 204)
+
+        resp = self._changes(since=cursor)
+        self.assertEqual(resp.data["deleted"], [{"id": victim.id, "store": "retail"}])
+        self.assertEqual(resp.data["items"], [])
+
+    def test_stale_cursor_requests_reset(self):
+        stale = encode_cursor(timezone.now() - timedelta(days=365), 0)
+        resp = self._changes(since=stale)
+        self.assertTrue(resp.data["reset"])
@@ -0,0 +1,124 @@
+"""
+item_list paginated mode and field projection.
+
+Verifies:
+- page_size/cursor walk the catalogue in (name, id) order with no gaps or
+  repeats, including items that share a name.
+- fields= returns only the requested keys, with values matching to_api_dict.
+- Without page_size/cursor the response is still the flat list.
+- mode=fuzzy ranks misspelled and brand-name queries to the intended item and
+  follows renames through the trigram index.
+- Fuzzy search applies the store/branch filters before capping candidates,
+  and re-indexing an item never duplicates its grams.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from inventory.models import Item, ItemTrigram
+from inventory.search import index_item
+from inventory.views import item_list
+
+
+class ItemListPaginationTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Test Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000006", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        names = ["Amoxil", "Panadol", "Panadol", "Panadol", "Vitamin C", "Zinc"]
+        for n, name in enumerate(names):
+            Item.objects.create(organization=self.org, name=name,
+                                price=Decimal(10 + n), stock=Decimal("3"))
+
+    def _list(self, **params):
+        req = self.factory.get("/api/inventory/items/", params)
+        force_authenticate(req, user=self.user)
+        return item_list(req)
+
+    def test_keyset_pages_cover_catalogue(self):
+        seen, cursor = [], None
+        while True:
+            params = {"page_size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            resp = self._list(**params)
+            self.assertEqual(resp.status_code, 200)
+            seen += [(r["name"], r["id"]) for r in resp.data["results"]]
+            cursor = resp.data["next"]
+            if cursor is None:
+                break
+        expected = list(Item.objects.order_by("name", "id").values_list("name", "id"))
+        self.assertEqual(seen, expected)
+
+    def test_fields_projection(self):
+        resp = self._list(fields="id,price,expiryDate", page_size=50)
+        row = resp.data["results"][0]
+        self.assertEqual(set(row), {"id", "price", "expiryDate"})
+        item = Item.objects.get(pk=row["id"])
+        full = item.to_api_dict()
+        self.assertEqual(row["price"], full["price"])
+        self.assertIsNone(row["expiryDate"])
+
+    def test_unknown_field_rejected(self):
+        self.assertEqual(self._list(fields="id,secret").status_code, 400)
+
+    def test_flat_list_by_default(self):
+        resp = self._list()
+        self.assertIsInstance(resp.data, list)
+        self.assertEqual(len(resp.data), 6)
+
+
+class ItemFuzzySearchTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Test Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000007", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        for name, brand in [("Amoxicillin 500mg", "Amoxil"), ("Paracetamol", "Panadol"),
+                            ("Ampicillin", ""), ("Vitamin C", "")]:
+            Item.objects.create(organization=self.org, name=name, brand=brand)
+
+    def _search(self, q):
+        req = self.factory.get("/api/inventory/items/", {"search": q, "mode": "fuzzy"})
+        force_authenticate(req, user=self.user)
+        return item_list(req)
+
+    def test_misspelling_ranks_intended_item_first(self):
+        self.assertEqual(self._search("amoxcilin").data[0]["name"], "Amoxicillin 500mg")
+        self.assertEqual(self._search("paracetamole").data[0]["name"], "Paracetamol")
+
+    def test_brand_matches(self):
+        self.assertEqual(self._search("panadol").data[0]["name"], "Paracetamol")
+
+    def test_index_follows_renames(self):
+        item = Item.objects.get(name="Vitamin C")
+        item.name = "Ascorbic Acid"
+        item.save()
+        self.assertEqual(self._search("ascorbic").data[0]["id"], item.id)
+        self.assertEqual(self._search("vitamin").data, [])
+
+    def test_scope_filters_apply_before_candidate_cap(self):
+        for n in range(3):
+            Item.objects.create(organization=self.org, name=f"Ampiclox {n}", store="wholesale")
+        req = self.factory.get("/api/inventory/items/",
+                               {"search": "ampiclox", "mode": "fuzzy", "store": "retail"})
+        force_authenticate(req, user=self.user)
+        with patch("inventory.search.MAX_CANDIDATES", 2):
+            names = [r["name"] for r in item_list(req).data]
+        self.assertEqual(names, ["Ampicillin"])
+
+    def test_reindex_keeps_one_row_per_gram(self):
+        item = Item.objects.get(name="Ampicillin")
+        grams = ItemTrigram.objects.filter(item=item).count()
+        ItemTrigram.objects.filter(item=item).first().delete()
+        index_item(item)
+        index_item(item)
+        self.assertEqual(ItemTrigram.objects.filter(item=item).count(), grams)
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('items/',                        views.item_list,              name='item-list'),
+    path('items/changes/',                views.item_changes,           name='item-changes'),
     path('items/<int:pk>/',               views.item_detail,            name='item-detail'),
     path('items/<int:pk>/adjust-stock/',  views.adjust_stock,           name='item-adjust-stock'),
     path('availability/',                 views.medication_availability, name='medication-availability'),
@@ -1,4 +1,14 @@
+import base64
+import heapq
+import itertools
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 _SENTINEL = object()  # distinguishes "field absent" from "field explicitly null"
 from django.utils.dateparse import parse_date
@@ -6,8 +16,13 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Item, STATUS_ACTIVE
-from authapp.utils import require_org, log_activity
+from rest_framework.settings import api_settings
+from .models import ITEM_API_FIELDS, Item, ItemTombstone, MedicationAvailability
+from . import availability
+from . import stock as stock_service
+from .barcodes import normalize_code
+from .search import ranked_search
+from authapp.utils import CURSOR_EPOCH, decode_cursor, encode_cursor, require_org, log_activity
 from authapp.permissions import IsInventoryEditor, require_permission
 
 
@@ -31,13 +46,16 @@ def item_list(request):
             items = items.filter(branch_id=int(branch_id_str))
         barcode = request.query_params.get("barcode", "").strip()
         if barcode:
-            items = items.filter(barcode__iexact=barcode)
+            key = normalize_code(barcode)
+            items = items.filter(Q(barcode_key=key) | Q(gtin_key=key))
             try:
                 return Response([i.to_api_dict() for i in items])
             except Exception as e:
                 return Response({"detail": f"Failed to serialize inventory: {e}"},
                                 status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        if search:
+        # mode=fuzzy: trigram-ranked matches on name/brand/barcode, best first.
+        fuzzy = request.query_params.get("mode", "").strip().lower() == "fuzzy"
+        if search and not fuzzy:
             items = items.filter(name__icontains=search)
         if store in ("retail", "wholesale"):
             items = items.filter(store=store)
@@ -54,7 +72,34 @@ def item_list(request):
             items = items.filter(
                 expiry_date__isnull=False, expiry_date__lte=soon, stock__gt=0
             )
+        if search and fuzzy:
+            try:
+                limit = int(request.query_params.get("limit") or api_settings.PAGE_SIZE or 50)
+            except (TypeError, ValueError):
+                limit = api_settings.PAGE_SIZE or 50
+            limit = max(1, min(limit, _MAX_PAGE_SIZE))
+            try:
+                return Response([
+                    dict(i.to_api_dict(), matchScore=i.match_score)
+                    for i in ranked_search(org, items, search, limit=limit)
+                ])
+            except Exception as e:
+                return Response({"detail": f"Failed to serialize inventory: {e}"},
+                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        columns = None
+        fields_raw = request.query_params.get("fields", "").strip()
+        if fields_raw:
+            columns = [f.strip() for f in fields_raw.split(",") if f.strip()]
+            unknown = [f for f in columns if f not in ITEM_API_FIELDS]
+            if unknown:
+                return Response({"detail": f"Unknown field(s): {', '.join(unknown)}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        # Paginated mode is opt-in so existing clients keep the flat list.
+        if "cursor" in request.query_params or "page_size" in request.query_params:
+            return _item_page(request, items, columns)
         try:
+            if columns:
+                return Response(_project_items(items, columns))
             return Response([i.to_api_dict() for i in items])
         except Exception as e:
             return Response({"detail": f"Failed to serialize inventory: {e}"},
@@ -132,6 +177,83 @@ def item_list(request):
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+_MAX_PAGE_SIZE = 500
+
+
+def _project_items(items, columns):
+    """Serialize only ``columns`` straight from .values_list() rows — no Item instances."""
+    specs = [ITEM_API_FIELDS[c] for c in columns]
+    rows = items.values_list(*[field for field, _ in specs])
+    return [
+        {col: (conv(val) if conv else val)
+         for col, (_, conv), val in zip(columns, specs, row)}
+        for row in rows
+    ]
+
+
+def _encode_name_cursor(name, pk):
+    raw = json.dumps([name, pk], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_name_cursor(raw):
+    """Opaque cursor → (name, id), or None if malformed."""
+    try:
+        name, pk = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    if not isinstance(name, str) or not isinstance(pk, int):
+        return None
+    return name, pk
+
+
+def _item_page(request, items, columns):
+    """
+    One keyset page of ``items`` ordered by (name, id).
+
+    GET /inventory/items/?page_size=50[&cursor=<next>][&fields=id,name,price]
+
+    Returns {"results": [...], "next": <cursor or null>}. Each page is a
+    single indexed range scan, however deep into the catalogue it is.
+    """
+    try:
+        page_size = int(request.query_params.get("page_size") or api_settings.PAGE_SIZE or 50)
+    except (TypeError, ValueError):
+        page_size = api_settings.PAGE_SIZE or 50
+    page_size = max(1, min(page_size, _MAX_PAGE_SIZE))
+
+    items = items.order_by("name", "id")
+    cursor_raw = request.query_params.get("cursor", "").strip()
+    if cursor_raw:
+        after = _decode_name_cursor(cursor_raw)
+        if after is None:
+            return Response({"detail": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+        name, pk = after
+        items = items.filter(Q(name__gt=name) | Q(name=name, id__gt=pk))
+
+    try:
+        if columns:
+            # Carry name/id along for the cursor without exposing them
+            # unless they were asked for.
+            page = _project_items(items[:page_size + 1], columns + ["name", "id"])
+            keys = [(row["name"], row["id"]) for row in page]
+            extra = {"name", "id"} - set(columns)
+            for row in page:
+                for key in extra:
+                    row.pop(key)
+        else:
+            page = [i.to_api_dict() for i in items[:page_size + 1]]
+            keys = [(row["name"], row["id"]) for row in page]
+    except Exception as e:
+        return Response({"detail": f"Failed to serialize inventory: {e}"},
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    next_cursor = _encode_name_cursor(*keys[page_size - 1]) if has_more else None
+    return Response({"results": page, "next": next_cursor})
+
+
 @api_view(["GET", "PUT", "PATCH", "DELETE"])
 @permission_classes([IsAuthenticated, IsInventoryEditor])
 def item_detail(request, pk):
@@ -230,25 +352,116 @@ def item_detail(request, pk):
 
     # DELETE
     item_name = item.name
-    item.delete()
+    with transaction.atomic():
+        ItemTombstone.record([item])
+        item.delete()
+        availability.refresh([item])
     log_activity(request, action='Delete Item', category='inventory',
                  description=f'Deleted "{item_name}"')
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# Delta sync
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_CHANGES_PAGE_SIZE = 500
+_CHANGES_MAX_PAGE_SIZE = 2000
+# Rows stamped this recently may belong to transactions that have not
+# committed yet — the final cursor is held back so the next call re-reads them.
+_CHANGES_SETTLE = timedelta(seconds=5)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsInventoryEditor])
+def item_changes(request):
+    """Items changed or deleted since a cursor, for incremental cache refresh.
+
+    GET /inventory/items/changes/?since=<cursor>&limit=500
+
+    Changes are ordered by (updated_at, id). Omit ``since`` for a full
+    snapshot. Keep calling with the returned ``cursor`` while ``hasMore`` is
+    true; rows may be repeated across calls, so apply them as upserts.
+    ``reset: true`` means the cursor is older than the tombstone retention
+    window — drop the local cache and start again without ``since``.
+    """
+    org, err = require_org(request)
+    if err:
+        return err
+
+    since = None
+    since_raw = request.query_params.get("since", "").strip()
+    if since_raw:
+        since = decode_cursor(since_raw)
+        if since is None:
+            return Response({"detail": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = int(request.query_params.get("limit", _CHANGES_PAGE_SIZE))
+    except (TypeError, ValueError):
+        limit = _CHANGES_PAGE_SIZE
+    limit = max(1, min(limit, _CHANGES_MAX_PAGE_SIZE))
+
+    now = timezone.now()
+    retention = timedelta(days=getattr(settings, "INVENTORY_TOMBSTONE_RETENTION_DAYS", 30))
+    if since and since[0] < now - retention:
+        return Response({"items": [], "deleted": [], "cursor": None,
+                         "hasMore": False, "reset": True})
+
+    items = Item.objects.filter(organization=org)
+    tombstones = ItemTombstone.objects.filter(organization=org)
+    if since:
+        ts, pk = since
+        items = items.filter(Q(updated_at__gt=ts) | Q(updated_at=ts, id__gt=pk))
+        tombstones = tombstones.filter(Q(deleted_at__gt=ts) | Q(deleted_at=ts, item_id__gt=pk))
+    else:
+        # A full snapshot has nothing to delete client-side.
+        tombstones = tombstones.none()
+
+    # Both streams share the (timestamp, item id) key space; merge and cut
+    # one page across them.
+    merged = heapq.merge(
+        ((i.updated_at, i.id, i) for i in items.order_by("updated_at", "id")[:limit + 1]),
+        ((t.deleted_at, t.item_id, t) for t in tombstones.order_by("deleted_at", "item_id")[:limit + 1]),
+        key=lambda row: row[:2],
+    )
+    page = list(itertools.islice(merged, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    cursor = page[-1][:2] if page else (since or (CURSOR_EPOCH, 0))
+    horizon = now - _CHANGES_SETTLE
+    if not has_more and cursor[0] > horizon:
+        cursor = (horizon, 0)
+
+    try:
+        return Response({
+            "items": [obj.to_api_dict() for _, _, obj in page if isinstance(obj, Item)],
+            "deleted": [obj.to_api_dict() for _, _, obj in page if isinstance(obj, ItemTombstone)],
+            "cursor": encode_cursor(*cursor),
+            "hasMore": has_more,
+            "reset": False,
+        })
+    except Exception as e:
+        return Response({"detail": f"Failed to serialize inventory: {e}"},
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def medication_availability(request):
     """Cross-pharmacy stock lookup for a given medication name.
 
-    GET /inventory/availability/?name=Amoxicillin&brand=Amoxil
+    GET /inventory/availability/?name=Amoxicillin&brand=Amoxil[&network_id=3]
 
     Returns one entry per pharmacy that carries the item with stock > 0,
     showing the highest-stocked matching item's quantity and price.
+    ``name`` and ``brand`` are matched as prefixes against the
+    MedicationAvailability index. ``network_id`` limits results to active
+    members of a network the caller's organization belongs to.
     Any authenticated user can call this (read-only, cross-org).
     """
-    name = request.query_params.get("name", "").strip()
-    brand = request.query_params.get("brand", "").strip()
+    name = availability.normalize_name(request.query_params.get("name", ""))
+    brand = availability.normalize_name(request.query_params.get("brand", ""))
 
     if not name:
         return Response(
@@ -257,32 +470,46 @@ def medication_availability(request):
         )
 
     qs = (
-        Item.objects
-        .filter(name__icontains=name, stock__gt=0, status=STATUS_ACTIVE)
+        MedicationAvailability.objects
+        .filter(name_key__startswith=name, max_stock__gt=0)
         .select_related("organization")
-        .order_by("organization_id", "-stock")
+        .order_by("-max_stock")
     )
     if brand:
-        qs = qs.filter(brand__icontains=brand)
+        qs = qs.filter(brand_key__startswith=brand)
 
-    # One entry per pharmacy — pick the item with the highest stock.
+    network_id = request.query_params.get("network_id", "").strip()
+    if network_id:
+        from authapp.models import PharmacyNetworkMembership
+
+        if not network_id.isdigit():
+            return Response({"detail": "Invalid network_id"}, status=status.HTTP_400_BAD_REQUEST)
+        members = PharmacyNetworkMembership.objects.filter(
+            network_id=int(network_id), network__is_active=True, status="active",
+        ).values_list("organization_id", flat=True)
+        caller_org = getattr(request.user, "organization_id", None)
+        if caller_org is None or not members.filter(organization_id=caller_org).exists():
+            return Response({"detail": "You are not a member of this network."},
+                            status=status.HTTP_403_FORBIDDEN)
+        qs = qs.filter(organization_id__in=members)
+
+    # One entry per pharmacy — rows arrive best-stocked first.
     seen_orgs = set()
     results = []
-    for item in qs:
-        if item.organization_id is None or item.organization_id in seen_orgs:
+    for row in qs:
+        if row.organization_id in seen_orgs:
             continue
-        seen_orgs.add(item.organization_id)
-        org = item.organization
+        seen_orgs.add(row.organization_id)
+        org = row.organization
         results.append({
             "pharmacy_name": org.name,
             "pharmacy_id": org.id,
-            "stock_quantity": int(item.stock),
+            "stock_quantity": int(row.max_stock),
+            "price": float(row.price),
+            "last_updated": row.updated_at.isoformat(),
             "address": org.address or "",
             "phone": org.phone or "",
         })
-
-    # Sort by most stock first so the most-stocked pharmacy appears at the top.
-    results.sort(key=lambda x: -x["stock_quantity"])
     return Response(results)
 
 
@@ -301,9 +528,8 @@ def adjust_stock(request, pk):
             {"detail": "Invalid adjustment value"}, status=status.HTTP_400_BAD_REQUEST
         )
     old_stock = float(item.stock)
-    item.stock = max(0, item.stock + adjustment)
     try:
-        item.save()
+        stock_service.adjust_stock(item, adjustment)
     except Exception as e:
         return Response({"detail": f"Failed to adjust stock: {e}"},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -248,7 +248,10 @@ WSGI_APPLICATION = "pharmapi.wsgi.application"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # SimpleJWT + identity claims (org, branch, role, permission version):
+        # skips the per-request user lookup while the claims are current.
+        # Needs a cache shared by all workers (see prod.py CACHES).
+        "authapp.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -272,6 +275,8 @@ REST_FRAMEWORK = {
         "wallet": "20/minute",           # Wallet top-up / deduct / reset / record payment
         "payment_request": "30/minute",  # Accept / reject / complete payment requests
         "procurement": "20/minute",      # Create / complete procurement orders
+        "sync": "30/minute",             # Offline queue batch replay
+        "export": "10/minute",           # Streaming CSV / NDJSON exports
     },
 }
 
@@ -284,6 +289,62 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# ── Permissions ───────────────────────────────────────────────────────────────
+# Cached effective permissions (authapp.permissions) are invalidated by
+# bump_permissions() on override / role changes; the timeout is a backstop.
+PERMISSION_CACHE_TIMEOUT = 300
+# Subscription status read by OrgSubscriptionPermission on every request
+# (subscription.cache); Subscription.save() invalidates it.
+SUBSCRIPTION_STATUS_CACHE_TIMEOUT = 60
+
+# ── Activity log ──────────────────────────────────────────────────────────────
+# log_activity() entries are queued and written in batches by a background
+# thread (authapp.activity_buffer): after BATCH_SIZE entries or FLUSH_SECONDS,
+# and at shutdown. Past MAX_PENDING queued entries writes fall back to inline.
+ACTIVITY_LOG_BUFFERED = True
+ACTIVITY_LOG_BATCH_SIZE = 50
+ACTIVITY_LOG_FLUSH_SECONDS = 2
+ACTIVITY_LOG_MAX_PENDING = 1000
+# Days entries stay in the live table, per subscription plan ('default' for
+# orgs without one); Organization.activity_log_retention_days overrides it.
+# `manage.py archive_activity_log` moves older entries to gzip NDJSON files
+# under ACTIVITY_LOG_ARCHIVE_DIR (authapp.activity_archive).
+ACTIVITY_LOG_RETENTION_DAYS = {
+    "trial": 90,
+    "starter": 180,
+    "professional": 365,
+    "enterprise": 730,
+    "default": 365,
+}
+ACTIVITY_LOG_ARCHIVE_DIR = BASE_DIR / "archive" / "activity_log"
+
+# ── Idempotency ───────────────────────────────────────────────────────────────
+# Replay window for responses stored against an Idempotency-Key header
+# (see authapp.idempotency). Purge older rows with `manage.py purge_idempotency_keys`.
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+# ── Offline sync ──────────────────────────────────────────────────────────────
+# Upper bound on queued mutations replayed by one POST /api/sync/batch/.
+SYNC_BATCH_MAX_OPERATIONS = 200
+# The only endpoints a batch may replay (the offline-queue mutations).
+SYNC_BATCH_PATH_PREFIXES = ("/api/pos/", "/api/inventory/", "/api/customers/", "/api/prescriptions/")
+# Deleted-item tombstones served by GET /api/inventory/items/changes/. Cursors
+# older than this get `reset: true`. Purge with `manage.py purge_item_tombstones`.
+INVENTORY_TOMBSTONE_RETENTION_DAYS = 30
+
+# ── Reports ───────────────────────────────────────────────────────────────────
+# Cached report payloads (reports.cache) are invalidated by writes; the timeout
+# only bounds how long an entry can outlive an unhooked write path.
+REPORT_CACHE_TIMEOUT = 300
+# How long a worker waits for another worker computing the same report.
+REPORT_CACHE_WAIT_SECONDS = 10
+# Background report jobs (reports.jobs): worker threads per process, how
+# long results stay downloadable, and after how long a job still pending or
+# running is marked failed. Purge with `manage.py purge_report_jobs`.
+REPORT_JOB_WORKERS = 2
+REPORT_JOB_TTL_HOURS = 24
+REPORT_JOB_TIMEOUT_MINUTES = 30
+
 # ── CORS ──────────────────────────────────────────────────────────────────────
 
 CORS_ALLOW_ALL_ORIGINS = False
@@ -19,6 +19,11 @@ DATABASES = {
     }
 }
 
+# ── Activity log: write inline ───────────────────────────────────────────────
+# The test runner and runserver reloader expect entries in the table right away.
+
+ACTIVITY_LOG_BUFFERED = False
+
 # ── CORS: allow all origins in dev ───────────────────────────────────────────
 # Flutter web uses a dynamic port (flutter run -d chrome picks any free port),
 # so we can't enumerate every origin. Allow all in dev — safe since DEBUG=True.
@@ -35,4 +40,5 @@ CORS_ALLOW_HEADERS = [
     "skip_auth",
     "skip-auth",
     "x-prescriber-token",
+    "idempotency-key",
 ]
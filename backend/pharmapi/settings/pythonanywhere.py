@@ -90,6 +90,7 @@ CORS_ALLOW_HEADERS = [
     "skip_auth",
     "skip-auth",
     "x-prescriber-token",
+    "idempotency-key",
 ]
 
 # ── Security ──────────────────────────────────────────────────────────────────
@@ -5,6 +5,7 @@ from django.http import HttpResponse
 from django.http import JsonResponse
 from django.urls import path, include
 from authapp.admin_views import global_overview_view
+from authapp.sync_views import sync_batch
 from subscription.admin_views import saas_dashboard_view
 from reports import views as reports_views
 
@@ -32,6 +33,7 @@ urlpatterns = [
     path('api/subscription/', include('subscription.urls')),
     path('api/branches/',       include('branches.urls')),
     path('api/prescriptions/', include('prescriptions.urls')),
+    path('api/sync/batch/',    sync_batch, name='sync-batch'),
     path('api/', lambda request: JsonResponse({
         "message": "PharmApp API is working",
         "endpoints": [
@@ -43,6 +45,7 @@ urlpatterns = [
             "/api/subscription/",
             "/api/branches/",
             "/api/prescriptions/",
+            "/api/sync/batch/",
         ]
     })),
 ]
@@ -7,6 +7,10 @@ from django.utils.html import format_html
 from django.utils.timezone import now
 
 from authapp.admin_mixins import OrgScopedAdminMixin
+from inventory.stock import increment_stock
+from reports import rollups
+from . import shifts
+from .exports import export_action
 from .models import (
     Cashier,
     Sale,
@@ -192,7 +196,7 @@ class SaleAdmin(OrgScopedAdminMixin, admin.ModelAdmin):
             return _badge("Wholesale", "#6f42c1")
         return _badge("Retail", "#0d6efd")
 
-    actions = ["mark_completed", "mark_returned"]
+    actions = ["mark_completed", "mark_returned", export_action("sales")]
 
     @admin.action(description="Mark selected sales as Completed")
     def mark_completed(self, request, queryset):
@@ -200,7 +204,14 @@ class SaleAdmin(OrgScopedAdminMixin, admin.ModelAdmin):
         # stock was already restocked on return, so flipping back would desync
         # inventory. Only pending sales advance to completed.
         skipped = queryset.filter(status__in=["returned", "partial_return"]).count()
-        updated = queryset.filter(status="pending").update(status="completed")
+        updated = 0
+        for sale in queryset.filter(status="pending"):
+            with transaction.atomic():
+                if Sale.objects.filter(pk=sale.pk, status="pending").update(status="completed"):
+                    sale.status = "completed"
+                    rollups.move_sale(sale, "pending")
+                    shifts.move_sale(sale, "pending")
+                    updated += 1
         msg = f"{updated} sale(s) marked as completed."
         if skipped:
             msg += f" Skipped {skipped} already-returned sale(s) to protect stock."
@@ -222,9 +233,8 @@ class SaleAdmin(OrgScopedAdminMixin, admin.ModelAdmin):
                     remaining = si.quantity - si.return_qty
                     if remaining <= 0:
                         continue
-                    if si.item:
-                        si.item.stock += remaining
-                        si.item.save(update_fields=["stock"])
+                    if si.item_id:
+                        increment_stock(si.item_id, remaining)
                     line_total = (si.price * si.quantity) - si.discount
                     unit_refund = (
                         line_total / si.quantity if si.quantity > 0 else Decimal("0")
@@ -241,13 +251,17 @@ class SaleAdmin(OrgScopedAdminMixin, admin.ModelAdmin):
                     si.return_qty += remaining
                     si.returned = True
                     si.save(update_fields=["return_qty", "returned"])
+                    rollups.record_return(locked, si, remaining)
                     DispensingLog.objects.filter(
                         sale=locked, item=si.item, name=si.name
                     ).update(status="Returned")
                     touched = True
                 if touched:
+                    old_status = locked.status
                     locked.status = "returned"
                     locked.save(update_fields=["status"])
+                    rollups.move_sale(locked, old_status)
+                    shifts.move_sale(locked, old_status)
                     returned += 1
                 else:
                     skipped += 1
@@ -269,6 +283,7 @@ class SaleItemAdmin(admin.ModelAdmin):
     ordering      = ["-sale__created"]
     readonly_fields = ["subtotal", "sale"]
     list_select_related = ["sale"]
+    actions = [export_action("sale-items")]
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -299,6 +314,7 @@ class DispensingLogAdmin(admin.ModelAdmin):
         "dosage_form", "unit", "quantity", "amount",
         "discount_amount", "status", "created_at",
     ]
+    actions = [export_action("dispensing-logs")]
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -458,6 +474,7 @@ class ExpenseAdmin(OrgScopedAdminMixin, admin.ModelAdmin):
     date_hierarchy = "date"
     list_select_related = ["category", "created_by"]
     readonly_fields = ["created_at", "created_by"]
+    actions = [export_action("expenses")]
 
     fieldsets = (
         (None,  {"fields": ("category", "description", "amount", "date")}),
@@ -747,17 +764,25 @@ class ShiftAdmin(OrgScopedAdminMixin, admin.ModelAdmin):
     list_display  = [
         "id", "staff", "branch", "status_display",
         "opened_at", "closed_at", "opening_cash", "closing_cash",
+        "sales_count", "total_sales",
     ]
     list_filter   = ["status", "opened_at"]
     search_fields = ["staff__phone_number", "staff__full_name", "branch__name"]
     ordering      = ["-opened_at"]
-    readonly_fields = ["opened_at"]
+    readonly_fields = [
+        "opened_at", "sales_count", "total_sales", "total_cash",
+        "total_pos", "total_transfer", "total_wallet",
+    ]
     date_hierarchy  = "opened_at"
     list_select_related = ["staff", "branch"]
 
     fieldsets = (
         (None,   {"fields": ("staff", "branch", "status")}),
         ("Cash", {"fields": ("opening_cash", "closing_cash")}),
+        ("Totals", {"fields": (
+            "sales_count", "total_sales", "total_cash",
+            "total_pos", "total_transfer", "total_wallet",
+        )}),
         ("Timestamps", {
             "fields": ("opened_at", "closed_at"),
             "classes": ("collapse",),
@@ -0,0 +1,48 @@
+from datetime import date
+
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+
+from authapp.permissions import IsReportsUser
+from authapp.utils import require_org
+from . import exports
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsReportsUser])
+@throttle_classes([ScopedRateThrottle])
+def export_dataset(request, dataset):
+    """
+    GET /api/pos/export/<dataset>/?from=yyyy-mm-dd&to=yyyy-mm-dd&output=csv|ndjson&gzip=1
+
+    Streams sales, sale-items, dispensing-logs or expenses for the org as a
+    file download. ``output`` (not ``format`` — DRF reserves that for renderer
+    negotiation) defaults to csv; ``gzip=1`` compresses the stream.
+    """
+    request.throttle_scope = 'export'
+    org, err = require_org(request)
+    if err:
+        return err
+
+    if dataset not in exports.DATASETS:
+        return Response({'detail': f'Unknown dataset. Use one of: {", ".join(exports.DATASETS)}.'},
+                        status=404)
+    fmt = request.query_params.get('output', 'csv')
+    if fmt not in exports.FORMATS:
+        return Response({'detail': 'output must be csv or ndjson.'}, status=400)
+    try:
+        start = date.fromisoformat(request.query_params['from']) if request.query_params.get('from') else None
+        end = date.fromisoformat(request.query_params['to']) if request.query_params.get('to') else None
+    except ValueError:
+        return Response({'detail': 'from and to must be yyyy-mm-dd.'}, status=400)
+    if start and end and start > end:
+        start, end = end, start
+
+    return exports.streaming_response(
+        dataset,
+        exports.export_queryset(dataset, org, start, end),
+        fmt=fmt,
+        compress=request.query_params.get('gzip') in ('1', 'true'),
+    )
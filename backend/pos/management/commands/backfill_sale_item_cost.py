@@ -0,0 +1,53 @@
+"""
+Management command: backfill_sale_item_cost
+
+Fills SaleItem.unit_cost for lines sold before costs were recorded at
+checkout, using the item's current cost (the best figure still available),
+then rebuilds the per-item rollups so profit reports pick the costs up.
+Works in primary-key chunks so each UPDATE stays short on a large table.
+
+Usage:
+    python manage.py backfill_sale_item_cost
+    python manage.py backfill_sale_item_cost --org 12 --chunk-size 1000
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from inventory.models import Item
+from pos.models import SaleItem
+from reports.rollups import rebuild_items
+
+
+class Command(BaseCommand):
+    help = 'Backfill SaleItem.unit_cost from the current item cost.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Only backfill sales of this organization id.')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Rows updated per statement (default 5000).')
+        parser.add_argument('--skip-rollups', action='store_true',
+                            help='Do not rebuild the per-item rollups afterwards.')
+
+    def handle(self, *args, **options):
+        chunk = max(1, options['chunk_size'])
+        lines = SaleItem.objects.filter(unit_cost__isnull=True, item__isnull=False)
+        if options.get('org'):
+            lines = lines.filter(sale__organization_id=options['org'])
+        item_cost = Subquery(Item.objects.filter(pk=OuterRef('item_id')).values('cost')[:1])
+
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                lines.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk]
+            )
+            if not pks:
+                break
+            updated += SaleItem.objects.filter(pk__in=pks).update(unit_cost=item_cost)
+            last_pk = pks[-1]
+            self.stdout.write(f'  … {updated} line(s) up to id {last_pk}')
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled unit cost on {updated} sale line(s).'))
+        if updated and not options['skip_rollups']:
+            rows = rebuild_items(organization_id=options.get('org'))
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} item rollup row(s).'))
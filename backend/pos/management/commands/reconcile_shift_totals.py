@@ -0,0 +1,26 @@
+"""
+Management command: reconcile_shift_totals
+
+Recomputes the running sales totals stored on Shift from the sales
+themselves. Run it once after deploying the Shift total columns so shifts
+opened before then show their takings, and again after admin edits or
+imports that change sales without going through checkout / returns.
+
+Usage:
+    python manage.py reconcile_shift_totals
+    python manage.py reconcile_shift_totals --org 12
+"""
+from django.core.management.base import BaseCommand
+
+from pos.shifts import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored sales totals of every shift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Only reconcile shifts of this organization id.')
+
+    def handle(self, *args, **options):
+        changed = reconcile(organization_id=options.get('org'))
+        self.stdout.write(self.style.SUCCESS(f'Reconciled totals on {changed} shift(s).'))
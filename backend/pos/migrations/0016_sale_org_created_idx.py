@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('branches', '0001_initial'),
+        ('customers', '0007_wallettransaction_method'),
+        ('pos', '0015_saleitem_unit_cost'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['organization', 'created'], name='sale_org_created_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0016_sale_org_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shift',
+            name='sales_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='total_cash',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='total_pos',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='total_sales',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='total_transfer',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='shift',
+            name='total_wallet',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+    ]
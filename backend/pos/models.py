@@ -124,12 +124,34 @@ class Sale(models.Model):
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            # Date-range report filters (see authapp.utils.local_day_bounds).
+            models.Index(fields=["organization", "created"], name="sale_org_created_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.receipt_id:
             self.receipt_id = f"RCP-{uuid.uuid4().hex[:10].upper()}"
         super().save(*args, **kwargs)
 
+    # Relations read by to_api_dict(); keep in step with it.
+    API_SELECT_RELATED = ("organization", "customer", "cashier", "dispenser")
+
+    @classmethod
+    def for_api(cls, queryset=None):
+        """
+        ``queryset`` (default: all sales) with the joins and prefetch that
+        to_api_dict() needs, so serializing any number of receipts costs two
+        queries: the sales, then their items (each joined to its Item).
+        """
+        qs = cls.objects.all() if queryset is None else queryset
+        return qs.select_related(*cls.API_SELECT_RELATED).prefetch_related(
+            models.Prefetch(
+                "items",
+                queryset=SaleItem.objects.select_related(*SaleItem.API_SELECT_RELATED),
+            )
+        )
+
     def to_api_dict(self):
         org = self.organization
         return {
@@ -189,6 +211,9 @@ class SaleItem(models.Model):
     unit = models.CharField(max_length=20, blank=True, default="")
     quantity = models.DecimalField(max_digits=10, decimal_places=2, default=1)
     price = models.DecimalField(max_digits=12, decimal_places=2)
+    # Item.cost when sold, so COGS never joins the live Item row. NULL = sold
+    # before costs were recorded (manage.py backfill_sale_item_cost).
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     discount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     subtotal = models.DecimalField(max_digits=12, decimal_places=2)
     barcode = models.CharField(max_length=100, blank=True, default="")
@@ -202,6 +227,9 @@ class SaleItem(models.Model):
         self.subtotal = (self.price * self.quantity) - self.discount
         super().save(*args, **kwargs)
 
+    # Relations read by to_api_dict() (name/brand fallback for legacy lines).
+    API_SELECT_RELATED = ("item",)
+
     def to_api_dict(self):
         return {
             "id": self.id,
@@ -856,6 +884,14 @@ class Shift(models.Model):
     closed_at    = models.DateTimeField(null=True, blank=True)
     opening_cash = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     closing_cash = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Running totals of the shift's non-credit sales, maintained by pos.shifts
+    # at checkout / returns / payment-request completion.
+    total_sales    = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_cash     = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_pos      = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_transfer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_wallet   = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    sales_count    = models.IntegerField(default=0)
 
     class Meta:
         ordering = ['-opened_at']
@@ -873,32 +909,7 @@ class Shift(models.Model):
             qs = qs.filter(created__lte=self.closed_at)
         return qs
 
-    def compute_totals(self):
-        from django.db.models import Sum
-        # Prefer direct FK linkage; fall back to time-range for legacy data
-        sales = self.shift_sales.all()
-        if not sales.exists():
-            sales = self.sales_in_shift
-        sales = sales.exclude(status='credit')  # unfunded wallet credit not counted
-        agg = sales.aggregate(
-            total_sales=Sum('total_amount'),
-            total_cash=Sum('payment_cash'),
-            total_pos=Sum('payment_pos'),
-            total_transfer=Sum('payment_transfer'),
-            total_wallet=Sum('payment_wallet'),
-            sales_count=models.Count('id'),
-        )
-        return {
-            'total_sales':    float(agg['total_sales'] or 0),
-            'total_cash':     float(agg['total_cash'] or 0),
-            'total_pos':      float(agg['total_pos'] or 0),
-            'total_transfer': float(agg['total_transfer'] or 0),
-            'total_wallet':   float(agg['total_wallet'] or 0),
-            'sales_count':    agg['sales_count'] or 0,
-        }
-
     def to_api_dict(self):
-        totals = self.compute_totals()
         return {
             'id':          self.id,
             'staff_id':    self.staff_id,
@@ -909,7 +920,12 @@ class Shift(models.Model):
             'closed_at':   self.closed_at.isoformat() if self.closed_at else None,
             'opening_cash': float(self.opening_cash),
             'closing_cash': float(self.closing_cash),
-            **totals,
+            'total_sales':    float(self.total_sales),
+            'total_cash':     float(self.total_cash),
+            'total_pos':      float(self.total_pos),
+            'total_transfer': float(self.total_transfer),
+            'total_wallet':   float(self.total_wallet),
+            'sales_count':    self.sales_count,
         }
 
     def __str__(self):
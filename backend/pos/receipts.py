@@ -0,0 +1,99 @@
+"""
+Receipt list filtering and keyset pagination (sale_list, wholesale_sale_list).
+
+Every filter is index-friendly:
+
+- ?from= / ?to= become half-open local-day bounds on ``created`` (the
+  (organization, created) index — sale_org_created_idx);
+- ?search= first tries an exact / prefix match on the unique ``receipt_id``
+  (also with the ``RCP-`` prefix added, for cashiers typing just the code)
+  and only falls back to the customer / buyer name scan when nothing matches;
+- pages are ordered by (created, id) descending and resume after an opaque
+  ``<microseconds since epoch>-<id>`` cursor, so page N costs the same as
+  page 1.
+
+Paginated mode is opt-in (?cursor= or ?page_size=) so existing clients keep
+the flat list of the latest 100 receipts.
+"""
+from datetime import date
+
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.response import Response
+
+from authapp.utils import decode_cursor, encode_cursor, local_day_bounds
+
+from .models import Sale
+
+RECEIPT_PREFIX = 'RCP-'
+LEGACY_LIMIT = 100
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+def _parse_day(raw):
+    try:
+        return date.fromisoformat(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def filter_sales(sales, params):
+    """Apply ?from=&to=&search= to a Sale queryset."""
+    start = _parse_day(params.get('from'))
+    end = _parse_day(params.get('to'))
+    if start:
+        sales = sales.filter(created__gte=local_day_bounds(start, start)[0])
+    if end:
+        sales = sales.filter(created__lt=local_day_bounds(end, end)[1])
+    search = params.get('search', '').strip()
+    if search:
+        sales = search_sales(sales, search)
+    return sales
+
+
+def search_sales(sales, search):
+    """Receipt-id prefix match when one exists, else customer / buyer name."""
+    code = search.upper()
+    prefixes = {search, code}
+    if not code.startswith(RECEIPT_PREFIX):
+        prefixes.add(RECEIPT_PREFIX + code)
+    by_receipt = Q()
+    for prefix in prefixes:
+        by_receipt |= Q(receipt_id__startswith=prefix)
+    matches = sales.filter(by_receipt)
+    if matches.exists():
+        return matches
+    return sales.filter(Q(customer__name__icontains=search) | Q(buyer_name__icontains=search))
+
+
+def sales_response(request, sales):
+    """
+    Serialize ``sales`` (already scoped and filtered) for a receipt list.
+
+    GET ...?page_size=50[&cursor=<next>] → {"results": [...], "next": <cursor or null>}
+    Without either parameter: the latest LEGACY_LIMIT receipts as a list.
+    """
+    sales = Sale.for_api(sales).order_by('-created', '-id')
+    params = request.query_params
+    if 'cursor' not in params and 'page_size' not in params:
+        return Response([s.to_api_dict() for s in sales[:LEGACY_LIMIT]])
+
+    try:
+        page_size = int(params.get('page_size') or PAGE_SIZE)
+    except (TypeError, ValueError):
+        page_size = PAGE_SIZE
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    cursor_raw = params.get('cursor', '').strip()
+    if cursor_raw:
+        after = decode_cursor(cursor_raw)
+        if after is None:
+            return Response({'detail': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        created, pk = after
+        sales = sales.filter(Q(created__lt=created) | Q(created=created, id__lt=pk))
+
+    page = list(sales[:page_size + 1])
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    next_cursor = encode_cursor(page[-1].created, page[-1].pk) if has_more else None
+    return Response({'results': [s.to_api_dict() for s in page], 'next': next_cursor})
@@ -0,0 +1,123 @@
+"""
+Running sales totals on Shift.
+
+Shift.total_sales / total_cash / total_pos / total_transfer / total_wallet /
+sales_count are kept current by the same call sites that maintain the daily
+rollups, inside their ``transaction.atomic()`` block:
+
+    sale = Sale.objects.create(..., shift=open_shift)
+    shifts.record_sale(sale)             # add to the sale's shift
+
+    old_status = sale.status
+    sale.status = 'returned'; sale.save()
+    shifts.move_sale(sale, old_status)   # status change → add / remove
+
+Totals cover non-credit sales (unfunded wallet credit is not takings), so
+only a change into or out of ``credit`` moves a sale's amounts. Updates are
+``UPDATE ... SET x = x + delta`` so concurrent checkouts never lose one.
+
+``reconcile()`` recomputes stored totals from Sale — run it once for shifts
+that predate the columns (manage.py reconcile_shift_totals), and after admin
+edits that bypass these hooks.
+"""
+from django.db.models import Count, F, Sum
+
+# Shift total field → Sale field it sums.
+TOTAL_FIELDS = {
+    'total_sales': 'total_amount',
+    'total_cash': 'payment_cash',
+    'total_pos': 'payment_pos',
+    'total_transfer': 'payment_transfer',
+    'total_wallet': 'payment_wallet',
+}
+
+
+def _counted(status):
+    return status != 'credit'
+
+
+def _apply(sale, sign):
+    from .models import Shift
+
+    if not sale.shift_id:
+        return
+    changes = {
+        field: F(field) + sign * getattr(sale, source)
+        for field, source in TOTAL_FIELDS.items()
+    }
+    Shift.objects.filter(pk=sale.shift_id).update(
+        sales_count=F('sales_count') + sign, **changes,
+    )
+
+
+def record_sale(sale):
+    """Add a newly created sale to its shift's totals."""
+    if _counted(sale.status):
+        _apply(sale, 1)
+
+
+def move_sale(sale, old_status):
+    """Adjust the shift after ``sale.status`` changed from ``old_status``."""
+    was, now = _counted(old_status), _counted(sale.status)
+    if was != now:
+        _apply(sale, 1 if now else -1)
+
+
+def _aggregate(sales):
+    agg = sales.exclude(status='credit').aggregate(
+        sales_count=Count('id'),
+        **{field: Sum(source) for field, source in TOTAL_FIELDS.items()},
+    )
+    return {key: value or 0 for key, value in agg.items()}
+
+
+def reconcile(organization_id=None, *, shift_model=None, sale_model=None):
+    """
+    Recompute the stored totals of every shift (of one organization when
+    ``organization_id`` is given). Shifts with linked sales sum those; legacy
+    shifts without any fall back to the staff member's sales between
+    opened_at and closed_at. Returns the number of shifts whose totals changed.
+    """
+    if shift_model is None or sale_model is None:
+        from .models import Sale, Shift
+        shift_model = shift_model or Shift
+        sale_model = sale_model or Sale
+
+    shifts = shift_model.objects.all()
+    if organization_id:
+        shifts = shifts.filter(organization_id=organization_id)
+
+    # One grouped query for every shift with linked sales.
+    linked = {
+        row.pop('shift_id'): {key: value or 0 for key, value in row.items()}
+        for row in sale_model.objects.filter(shift__in=shifts).exclude(status='credit')
+        .order_by().values('shift_id').annotate(
+            sales_count=Count('id'),
+            **{field: Sum(source) for field, source in TOTAL_FIELDS.items()},
+        )
+    }
+    has_linked = set(
+        sale_model.objects.filter(shift__in=shifts).order_by()
+        .values_list('shift_id', flat=True).distinct()
+    )
+
+    fields = ['sales_count', *TOTAL_FIELDS]
+    changed = []
+    for shift in shifts.iterator(chunk_size=500):
+        if shift.pk in has_linked:
+            totals = linked.get(shift.pk) or dict.fromkeys(fields, 0)
+        else:
+            legacy = sale_model.objects.filter(
+                organization_id=shift.organization_id,
+                dispenser_id=shift.staff_id,
+                created__gte=shift.opened_at,
+            )
+            if shift.closed_at:
+                legacy = legacy.filter(created__lte=shift.closed_at)
+            totals = _aggregate(legacy)
+        if any(getattr(shift, f) != totals[f] for f in fields):
+            for f in fields:
+                setattr(shift, f, totals[f])
+            changed.append(shift)
+    shift_model.objects.bulk_update(changed, fields, batch_size=500)
+    return len(changed)
@@ -0,0 +1,135 @@
+"""
+Checkout stock reservation.
+
+Verifies:
+- Every cart line is resolved with one query, stock is taken with one
+  conditional UPDATE per item (no locking read), and sale lines are written
+  with bulk inserts.
+- Duplicate lines for the same item are decremented cumulatively, and the
+  whole sale is rejected if the combined quantity exceeds stock.
+- Completing a payment request cannot oversell.
+- Barcode-only cart lines resolve through the normalized code keys, like
+  the scanner lookups.
+- A decrement whose store guard no longer matches is reported as a store
+  mismatch, not as insufficient stock.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from inventory.models import Item
+from inventory.stock import InsufficientStock, StockGuardMismatch, decrement_many
+from pos.models import DispensingLog, Sale, SaleItem
+from pos.views import checkout
+
+
+class CheckoutStockTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Test Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000001", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.items = [
+            Item.objects.create(
+                organization=self.org, name=f"Drug {n}", price=Decimal("100"),
+                cost=Decimal("50"), stock=Decimal("10"), store="retail",
+            )
+            for n in range(8)
+        ]
+
+    def _checkout(self, lines):
+        total = sum(100 * qty for _, qty in lines)
+        req = self.factory.post("/api/pos/checkout/", {
+            "items": [{"itemId": item.id, "quantity": qty, "price": 100} for item, qty in lines],
+            "payment": {"cash": total},
+            "paymentMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        return checkout(req)
+
+    def test_batched_reservation(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(
+                self._checkout([(i, 1) for i in self.items]).status_code, 201
+            )
+        sqls = [q["sql"] for q in ctx.captured_queries]
+        item_selects = [q for q in sqls if q.startswith("SELECT") and 'FROM "inventory_item"' in q
+                        and '"inventory_item"."id" IN' in q]
+        item_updates = [q for q in sqls if q.startswith('UPDATE "inventory_item"')]
+        # One resolving read for the whole cart, one conditional UPDATE per item.
+        self.assertEqual(len(item_selects), 1)
+        self.assertEqual(len(item_updates), len(self.items))
+        self.assertTrue(all('"stock" >=' in q for q in item_updates))
+        self.assertEqual(len([q for q in sqls if q.startswith('INSERT INTO "pos_saleitem"')]), 1)
+        self.assertEqual(len([q for q in sqls if q.startswith('INSERT INTO "pos_dispensinglog"')]), 1)
+        self.assertEqual(SaleItem.objects.count(), len(self.items))
+        self.assertEqual(DispensingLog.objects.count(), len(self.items))
+
+    def test_duplicate_lines_decrement_cumulatively(self):
+        item = self.items[0]
+        resp = self._checkout([(item, 4), (item, 3)])
+        self.assertEqual(resp.status_code, 201)
+        item.refresh_from_db()
+        self.assertEqual(item.stock, Decimal("3"))
+
+    def test_duplicate_lines_over_stock_rejected(self):
+        item = self.items[0]
+        resp = self._checkout([(item, 6), (item, 6)])
+        self.assertEqual(resp.status_code, 400)
+        item.refresh_from_db()
+        self.assertEqual(item.stock, Decimal("10"))
+        self.assertFalse(Sale.objects.exists())
+
+    def test_payment_request_completion_rejects_oversell(self):
+        from pos.models import PaymentRequest, PaymentRequestItem
+        from pos.views import complete_payment_request
+
+        item = self.items[0]
+        pr = PaymentRequest.objects.create(
+            organization=self.org, dispenser=self.user, total_amount=Decimal("1200"),
+        )
+        PaymentRequestItem.objects.create(
+            payment_request=pr, item=item, item_name=item.name,
+            quantity=12, unit_price=Decimal("100"),
+        )
+        req = self.factory.post(
+            f"/api/pos/payment-requests/{pr.id}/complete/",
+            {"payment": {"cash": 1200}}, format="json",
+        )
+        force_authenticate(req, user=self.user)
+        resp = complete_payment_request(req, pk=pr.id)
+        self.assertEqual(resp.status_code, 400)
+        item.refresh_from_db()
+        pr.refresh_from_db()
+        self.assertEqual(item.stock, Decimal("10"))
+        self.assertEqual(pr.status, "pending")
+        self.assertFalse(Sale.objects.exists())
+
+    def test_store_guard_mismatch_is_not_insufficient_stock(self):
+        item = self.items[0]
+        with self.assertRaisesMessage(StockGuardMismatch, "no longer in the wholesale store"):
+            decrement_many({item: Decimal("1")}, store="wholesale")
+        with self.assertRaises(InsufficientStock):
+            decrement_many({item: Decimal("11")}, store="retail")
+        item.refresh_from_db()
+        self.assertEqual(item.stock, Decimal("10"))
+
+    def test_barcode_lines_use_normalized_codes(self):
+        item = self.items[0]
+        item.barcode = "012345678905"
+        item.save()
+        req = self.factory.post("/api/pos/checkout/", {
+            "items": [{"barcode": "0012345678905", "quantity": 2, "price": 100}],
+            "payment": {"cash": 200},
+            "paymentMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(checkout(req).status_code, 201)
+        item.refresh_from_db()
+        self.assertEqual(item.stock, Decimal("8"))
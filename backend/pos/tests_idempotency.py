@@ -0,0 +1,76 @@
+"""
+Idempotency-Key handling on POS and wallet mutations.
+
+Verifies:
+- Replaying a checkout with the same key returns the stored receipt and does
+  not book a second sale or take stock twice.
+- Reusing a key for a different request body is rejected with 422.
+- A replayed wallet top-up credits the wallet only once.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from customers.models import Customer
+from customers.views import wallet_topup
+from inventory.models import Item
+from pos.models import Sale
+from pos.views import checkout
+
+
+class IdempotencyKeyTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Test Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000002", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.item = Item.objects.create(
+            organization=self.org, name="Paracetamol", price=Decimal("100"),
+            cost=Decimal("50"), stock=Decimal("10"), store="retail",
+        )
+
+    def _checkout(self, key, qty=1):
+        req = self.factory.post("/api/pos/checkout/", {
+            "items": [{"itemId": self.item.id, "quantity": qty, "price": 100}],
+            "payment": {"cash": 100 * qty},
+            "paymentMethod": "cash",
+        }, format="json", HTTP_IDEMPOTENCY_KEY=key)
+        force_authenticate(req, user=self.user)
+        return checkout(req)
+
+    def test_checkout_replay_returns_stored_sale(self):
+        first = self._checkout("sale-1")
+        second = self._checkout("sale-1")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(Sale.objects.count(), 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock, Decimal("9"))
+
+    def test_key_reuse_with_different_body_rejected(self):
+        self._checkout("sale-2", qty=1)
+        resp = self._checkout("sale-2", qty=2)
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(Sale.objects.count(), 1)
+
+    def test_wallet_topup_replay_credits_once(self):
+        customer = Customer.objects.create(
+            organization=self.org, name="Jane", phone="0811", wallet_balance=Decimal("0"),
+        )
+        for _ in range(2):
+            req = self.factory.post(
+                f"/api/customers/{customer.id}/wallet/topup/", {"amount": 500},
+                format="json", HTTP_IDEMPOTENCY_KEY="topup-1",
+            )
+            force_authenticate(req, user=self.user)
+            resp = wallet_topup(req, pk=customer.id)
+            self.assertEqual(resp.status_code, 200)
+        customer.refresh_from_db()
+        self.assertEqual(customer.wallet_balance, Decimal("500"))
+        self.assertEqual(customer.wallet_transactions.count(), 1)
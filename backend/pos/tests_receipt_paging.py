@@ -0,0 +1,73 @@
+"""
+Receipt list paging and search.
+
+Verifies:
+- page_size / cursor walk every receipt newest-first on (created, id) with
+  no duplicates or gaps, including receipts sharing a timestamp; without
+  them the legacy flat list is returned.
+- A malformed cursor is rejected.
+- Search matches a receipt-id prefix (with or without "RCP-") before falling
+  back to customer / buyer name.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from pos.models import Sale
+from pos.views import sale_list
+from pos.wholesale_views import wholesale_sale_list
+
+
+class ReceiptPagingTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Paging Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000018", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        same_moment = timezone.now()
+        self.sales = []
+        for n in range(7):
+            sale = Sale.objects.create(
+                organization=self.org, total_amount=Decimal(n), is_wholesale=n % 2 == 0,
+                buyer_name=f"Buyer {n}", receipt_id=f"RCP-00{n}ABC",
+            )
+            if n >= 4:   # three receipts at the exact same instant
+                Sale.objects.filter(pk=sale.pk).update(created=same_moment)
+            self.sales.append(sale)
+
+    def _get(self, view, query):
+        req = self.factory.get(f"/api/pos/sales/{query}")
+        force_authenticate(req, user=self.user)
+        return view(req)
+
+    def test_cursor_walks_all_receipts(self):
+        seen, cursor = [], None
+        while True:
+            query = "?page_size=2" + (f"&cursor={cursor}" if cursor else "")
+            data = self._get(sale_list, query).data
+            seen += [r["id"] for r in data["results"]]
+            cursor = data["next"]
+            if not cursor:
+                break
+        expected = list(Sale.objects.order_by("-created", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+        wholesale = self._get(wholesale_sale_list, "?page_size=10").data
+        self.assertEqual(len(wholesale["results"]), 4)
+        self.assertIsNone(wholesale["next"])
+
+        self.assertEqual(len(self._get(sale_list, "").data), 7)
+        self.assertEqual(self._get(sale_list, "?cursor=nope").status_code, 400)
+
+    def test_receipt_search_before_name_search(self):
+        data = self._get(sale_list, "?search=RCP-003").data
+        self.assertEqual([r["receiptId"] for r in data], ["RCP-003ABC"])
+        data = self._get(sale_list, "?search=005abc").data
+        self.assertEqual([r["receiptId"] for r in data], ["RCP-005ABC"])
+        data = self._get(sale_list, "?search=buyer 6").data
+        self.assertEqual([r["buyerName"] for r in data], ["Buyer 6"])
@@ -0,0 +1,77 @@
+"""
+Receipt serialization query counts.
+
+Verifies:
+- sale_list, wholesale_sale_list and customer_sales serialize receipts in a
+  fixed number of queries whatever the page size (Sale.for_api applies the
+  joins/prefetch to_api_dict needs).
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from customers.models import Customer
+from customers.views import customer_sales
+from inventory.models import Item
+from pos.models import Cashier, Sale, SaleItem
+from pos.views import sale_list
+from pos.wholesale_views import wholesale_sale_list
+
+
+class ReceiptQueryCountTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Receipts Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000017", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.cashier = Cashier.objects.create(user=self.user, name="Till 1")
+        self.customer = Customer.objects.create(organization=self.org, name="Kemi", phone="0802")
+        self.item = Item.objects.create(
+            organization=self.org, name="Cough Syrup", price=Decimal("80"),
+            stock=Decimal("100"), store="retail",
+        )
+
+    def _add_sales(self, n):
+        for _ in range(n):
+            sale = Sale.objects.create(
+                organization=self.org, customer=self.customer, cashier=self.cashier,
+                dispenser=self.user, total_amount=Decimal("160"), is_wholesale=True,
+            )
+            # Legacy line without a name snapshot: falls back to item.name.
+            SaleItem.objects.create(sale=sale, item=self.item, quantity=2, price=Decimal("80"))
+            SaleItem.objects.create(sale=sale, item=self.item, name="Syrup", quantity=1,
+                                    price=Decimal("80"))
+
+    def _count(self, view, path, **kwargs):
+        req = self.factory.get(path)
+        force_authenticate(req, user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = view(req, **kwargs)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp.data
+
+    def test_query_count_independent_of_page_size(self):
+        views = [
+            (sale_list, "/api/pos/sales/", {}),
+            (wholesale_sale_list, "/api/pos/wholesale/sales/", {}),
+            (customer_sales, f"/api/customers/{self.customer.pk}/sales/", {"pk": self.customer.pk}),
+        ]
+        self._add_sales(1)
+        for view, path, kw in views:   # warm per-process caches (subscription lookup)
+            self._count(view, path, **kw)
+        small = [self._count(view, path, **kw)[0] for view, path, kw in views]
+        self._add_sales(9)
+        large = []
+        for view, path, kw in views:
+            count, data = self._count(view, path, **kw)
+            large.append(count)
+            self.assertEqual(len(data), 10)
+            self.assertEqual(data[0]["items"][0]["name"], "Cough Syrup")
+            self.assertEqual(data[0]["dispenserName"], "08000000017")
+        self.assertEqual(small, large)
@@ -0,0 +1,106 @@
+"""
+Running shift totals.
+
+Verifies:
+- Checkout adds non-credit sales to the open shift's stored totals; a credit
+  sale is left out until its status leaves 'credit' (e.g. on return).
+- shift_list reads the stored totals in a fixed number of queries, however
+  many shifts are listed.
+- reconcile_shift_totals fixes legacy shifts, including ones whose sales were
+  never linked and are matched by time range.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from customers.models import Customer
+from inventory.models import Item
+from pos.models import Sale, Shift
+from pos.views import checkout, return_item, shift_list
+
+TOTALS = ("sales_count", "total_sales", "total_cash", "total_pos", "total_wallet")
+
+
+class ShiftTotalsTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Shift Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000016", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.item = Item.objects.create(
+            organization=self.org, name="Paracetamol", price=Decimal("100"),
+            stock=Decimal("50"), store="retail",
+        )
+        self.shift = Shift.objects.create(organization=self.org, staff=self.user)
+
+    def _checkout(self, payment, **extra):
+        req = self.factory.post("/api/pos/checkout/", {
+            "items": [{"itemId": self.item.id, "quantity": 1, "price": 100}],
+            "payment": payment, "paymentMethod": "cash", **extra,
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        resp = checkout(req)
+        self.assertEqual(resp.status_code, 201)
+        return Sale.objects.get(pk=resp.data["id"])
+
+    def _totals(self, shift=None):
+        shift = shift or self.shift
+        shift.refresh_from_db()
+        return tuple(getattr(shift, f) for f in TOTALS)
+
+    def test_checkout_and_return_update_totals(self):
+        self._checkout({"cash": 100})
+        self._checkout({"pos": 100})
+        customer = Customer.objects.create(organization=self.org, name="Bola", phone="0801")
+        credit = self._checkout({"wallet": 100}, customerId=customer.pk)
+        self.assertEqual(credit.status, "credit")
+        self.assertEqual(self._totals(), (2, Decimal("200"), Decimal("100"), Decimal("100"), 0))
+
+        req = self.factory.post(f"/api/pos/sales/{credit.pk}/return/", {
+            "saleItemId": credit.items.get().pk, "quantity": 1, "refundMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(return_item(req, pk=credit.pk).status_code, 200)
+        self.assertEqual(self._totals(),
+                         (3, Decimal("300"), Decimal("100"), Decimal("100"), Decimal("100")))
+
+    def test_shift_list_query_count_is_flat(self):
+        for _ in range(5):
+            Shift.objects.create(organization=self.org, staff=self.user)
+        req = self.factory.get("/api/pos/shifts/")
+        force_authenticate(req, user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = shift_list(req)
+        self.assertEqual(len(resp.data), 6)
+        self.assertLessEqual(len(ctx.captured_queries), 2)
+
+    def test_reconcile_legacy_shifts(self):
+        self._checkout({"cash": 100})
+        Shift.objects.filter(pk=self.shift.pk).update(sales_count=0, total_sales=0, total_cash=0)
+
+        # A closed legacy shift whose sale was never linked to it.
+        legacy = Shift.objects.create(
+            organization=self.org, staff=self.user, status=Shift.STATUS_CLOSED,
+            opened_at=timezone.now() - timedelta(days=2),
+            closed_at=timezone.now() - timedelta(days=1),
+        )
+        old = Sale.objects.create(organization=self.org, dispenser=self.user,
+                                  total_amount=Decimal("70"), payment_transfer=Decimal("70"))
+        Sale.objects.filter(pk=old.pk).update(created=legacy.opened_at + timedelta(hours=1))
+
+        out = StringIO()
+        call_command("reconcile_shift_totals", stdout=out)
+        self.assertIn("2 shift(s)", out.getvalue())
+        self.assertEqual(self._totals(), (1, Decimal("100"), Decimal("100"), 0, 0))
+        legacy.refresh_from_db()
+        self.assertEqual((legacy.sales_count, legacy.total_transfer), (1, Decimal("70")))
@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views
 from . import wholesale_views
+from . import export_views
 
 urlpatterns = [
     # Checkout & Sales
@@ -28,6 +29,8 @@ urlpatterns = [
     ),
     # Dispensing Log
     path("dispensing-log/", views.dispensing_log_list, name="dispensing-log"),
+    # Streaming exports (CSV / NDJSON)
+    path("export/<str:dataset>/", export_views.export_dataset, name="pos-export"),
     path("dispensing-log/stats/", views.dispensing_stats, name="dispensing-log-stats"),
     path("dispensing-stats/", views.dispensing_stats, name="dispensing-stats"),
     # Expenses
@@ -78,6 +81,7 @@ urlpatterns = [
     path("notifications/<int:pk>/read/", views.notification_read, name="notif-read"),
     # Barcode
     path("barcode/lookup/", views.barcode_lookup, name="barcode-lookup"),
+    path("barcode/batch/", views.barcode_batch_lookup, name="barcode-batch-lookup"),
     # User Management
     path("users/", views.user_list, name="user-list"),
     path("users/<int:pk>/", views.user_detail, name="user-detail"),
@@ -13,11 +13,16 @@ from rest_framework import status
 from rest_framework.throttling import ScopedRateThrottle
 
 from inventory.models import Item
+from inventory.barcodes import resolve_code, resolve_codes
+from inventory.stock import InsufficientStock, decrement_many, increment_stock
 from customers.models import Customer, WalletTransaction
 from authapp.models import PharmUser
 from branches.models import Branch
+from authapp.idempotency import idempotent
 from authapp.utils import require_org, log_activity, normalize_ng_phone
-from authapp.permissions import require_permission, REPORTS_ROLES
+from authapp.permissions import bump_permissions, require_permission, REPORTS_ROLES
+from reports import cache as report_cache, rollups
+from . import receipts, shifts
 from .models import (
     Cashier,
     Sale,
@@ -44,8 +49,28 @@ from .models import (
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
+def _resolve_cart_items(org, lines):
+    """
+    Resolve every cart line to its Item.
+
+    Returns ``(by_id, by_barcode)`` lookups. Lines carrying an ``itemId`` are
+    matched by primary key in one query; the rest go through the same
+    normalized barcode / GTIN resolution as the scanner lookups
+    (inventory.barcodes.resolve_codes).
+    """
+    ids = {str(l["itemId"]) for l in lines if l.get("itemId")}
+    barcodes = {l.get("barcode") for l in lines if not l.get("itemId") and l.get("barcode")}
+    by_id = {}
+    if ids:
+        for item in Item.objects.filter(pk__in=[i for i in ids if i.isdigit()], organization=org):
+            by_id[str(item.pk)] = item
+    by_barcode = resolve_codes(org, barcodes) if barcodes else {}
+    return by_id, by_barcode
+
+
 @api_view(["POST"])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def checkout(request):
     """
     Process a sale. Supports split payments, wallet, cashier assignment.
@@ -100,10 +125,8 @@ def checkout(request):
     expected_store = "wholesale" if is_wholesale else "retail"
     total = Decimal("0")
     discount_total = Decimal("0")
-    resolved = []
+    lines = []
     for i_data in items_data:
-        item_id = i_data.get("itemId")
-        barcode = i_data.get("barcode", "")
         try:
             qty = Decimal(str(i_data.get("quantity", 1)))
             price = Decimal(str(i_data.get("price", 0)))
@@ -119,12 +142,19 @@ def checkout(request):
                 {"detail": "Quantity must be positive"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        lines.append((i_data, qty, price, discount))
 
+    by_id, by_barcode = _resolve_cart_items(org, [l[0] for l in lines])
+
+    resolved = []
+    for i_data, qty, price, discount in lines:
+        item_id = i_data.get("itemId")
+        barcode = i_data.get("barcode", "")
         item = None
         if item_id:
-            item = Item.objects.filter(pk=item_id, organization=org).first()
+            item = by_id.get(str(item_id))
         elif barcode:
-            item = Item.objects.filter(barcode=barcode, organization=org).first()
+            item = by_barcode.get(barcode)
 
         if item and item.store != expected_store:
             return Response(
@@ -250,46 +280,51 @@ def checkout(request):
             hmo_coverage_percent=hmo_coverage_percent if hmo_coverage_percent is not None else None,
             hmo_amount=hmo_amount,
         )
+        rollups.record_sale(sale)
+        shifts.record_sale(sale)
 
+        # Conditional decrements (UPDATE ... WHERE stock >= qty), applied in
+        # primary-key order so terminals selling overlapping carts always
+        # queue on row locks in the same sequence instead of deadlocking.
+        quantities = {}
         for ri in resolved:
-            item = ri["item"]
-            qty = ri["qty"]
-            if item:
-                item = Item.objects.select_for_update().get(pk=item.pk)
-                if item.store != expected_store:
-                    raise ValueError(
-                        f"Store mismatch for {item.name}: expected {expected_store}"
-                    )
-                if item.stock < qty:
-                    raise ValueError(f"Insufficient stock for {item.name}")
-                item.stock -= qty
-                item.save()
+            if ri["item"]:
+                quantities[ri["item"]] = quantities.get(ri["item"], Decimal("0")) + ri["qty"]
+        decrement_many(quantities, store=expected_store)
 
-            SaleItem.objects.create(
+        sale_items = SaleItem.objects.bulk_create([
+            SaleItem(
                 sale=sale,
-                item=item,
+                item=ri["item"],
                 name=ri["name"],
                 brand=ri["brand"],
                 dosage_form=ri["dosage_form"],
                 unit=ri["unit"],
-                quantity=qty,
+                quantity=ri["qty"],
                 price=ri["price"],
+                unit_cost=ri["item"].cost if ri["item"] else None,
                 discount=ri["discount"],
+                subtotal=(ri["price"] * ri["qty"]) - ri["discount"],
                 barcode=ri["barcode"],
             )
-
-            DispensingLog.objects.create(
-                user=request.user if request.user.is_authenticated else None,
+            for ri in resolved
+        ])
+        rollups.record_items(sale, sale_items)
+        DispensingLog.objects.bulk_create([
+            DispensingLog(
+                user=dispenser,
                 sale=sale,
-                item=item,
+                item=ri["item"],
                 name=ri["name"],
                 brand=ri["brand"],
                 dosage_form=ri["dosage_form"],
                 unit=ri["unit"],
-                quantity=qty,
-                amount=ri["price"] * qty,
+                quantity=ri["qty"],
+                amount=ri["price"] * ri["qty"],
                 discount_amount=ri["discount"],
             )
+            for ri in resolved
+        ])
 
         if customer and wallet > 0:
             customer.wallet_balance = Decimal(str(customer.wallet_balance)) - wallet
@@ -336,29 +371,20 @@ def checkout(request):
 
 @api_view(["GET"])
 def sale_list(request):
+    """
+    GET /pos/sales/?from=&to=&customerId=&search=[&page_size=&cursor=]
+
+    Latest 100 receipts, or keyset pages when page_size / cursor is given
+    (see pos.receipts).
+    """
     org, err = require_org(request)
     if err:
         return err
-    sales = Sale.objects.filter(organization=org).select_related("customer", "cashier")
-    date_from = request.query_params.get("from")
-    date_to = request.query_params.get("to")
+    sales = Sale.objects.filter(organization=org)
     customer_id = request.query_params.get("customerId")
-    search = request.query_params.get("search", "").strip()
-
-    if date_from:
-        sales = sales.filter(created__date__gte=date_from)
-    if date_to:
-        sales = sales.filter(created__date__lte=date_to)
     if customer_id:
         sales = sales.filter(customer_id=customer_id)
-    if search:
-        sales = sales.filter(
-            Q(receipt_id__icontains=search)
-            | Q(customer__name__icontains=search)
-            | Q(buyer_name__icontains=search)
-        )
-
-    return Response([s.to_api_dict() for s in sales[:100]])
+    return receipts.sales_response(request, receipts.filter_sales(sales, request.query_params))
 
 
 @api_view(["GET"])
@@ -367,7 +393,7 @@ def sale_detail(request, pk):
     if err:
         return err
     sale = get_object_or_404(
-        Sale.objects.prefetch_related("items", "payments", "returns"), pk=pk, organization=org
+        Sale.for_api().prefetch_related("payments", "returns"), pk=pk, organization=org
     )
     data = sale.to_api_dict()
     data["payments"] = [p.to_api_dict() for p in sale.payments.all()]
@@ -382,6 +408,7 @@ def sale_detail(request, pk):
 
 @api_view(["POST"])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def return_item(request, pk):
     """Return items from a sale. Restores stock and optionally refunds wallet."""
     request.throttle_scope = 'checkout'
@@ -409,6 +436,18 @@ def return_item(request, pk):
         )
 
     with transaction.atomic():
+        # Lock the sale so concurrent returns against it run one after the
+        # other, each seeing the previous one's return_qty and status.
+        sale = Sale.objects.select_for_update().get(pk=sale.pk)
+        sale_item = SaleItem.objects.get(pk=sale_item.pk)
+        old_status = sale.status
+        remaining = sale_item.quantity - sale_item.return_qty
+        if qty > remaining:
+            return Response(
+                {"detail": f"Can only return {remaining} more units"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         # Calculate refund amount (proportional with discount)
         line_total = (sale_item.price * sale_item.quantity) - sale_item.discount
         unit_refund = (
@@ -417,15 +456,15 @@ def return_item(request, pk):
         refund_amount = unit_refund * qty
 
         # Restore stock
-        if sale_item.item:
-            sale_item.item.stock += qty
-            sale_item.item.save()
+        if sale_item.item_id:
+            increment_stock(sale_item.item_id, qty)
 
         # Update sale item
         sale_item.return_qty += qty
         if sale_item.return_qty >= sale_item.quantity:
             sale_item.returned = True
         sale_item.save()
+        rollups.record_return(sale, sale_item, qty)
 
         # Update dispensing log
         DispensingLog.objects.filter(
@@ -465,6 +504,8 @@ def return_item(request, pk):
             else ("partial_return" if any_returned else sale.status)
         )
         sale.save()
+        rollups.move_sale(sale, old_status)
+        shifts.move_sale(sale, old_status)
 
     return Response(
         {"detail": "Return processed", "refundAmount": float(refund_amount)},
@@ -547,6 +588,7 @@ def _create_payment_request(request, org):
 
 
 @api_view(["POST"])
+@idempotent
 def send_to_cashier(request):
     """Dispenser sends cart to cashier for payment."""
     org, err = require_org(request)
@@ -556,6 +598,7 @@ def send_to_cashier(request):
 
 
 @api_view(["GET", "POST"])
+@idempotent
 def payment_request_list(request):
     org, err = require_org(request)
     if err:
@@ -573,6 +616,7 @@ def payment_request_list(request):
 
 @api_view(["POST"])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def accept_payment_request(request, pk):
     request.throttle_scope = 'payment_request'
     org, err = require_org(request)
@@ -595,6 +639,7 @@ def accept_payment_request(request, pk):
 
 @api_view(["POST"])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def reject_payment_request(request, pk):
     request.throttle_scope = 'payment_request'
     org, err = require_org(request)
@@ -616,6 +661,7 @@ def reject_payment_request(request, pk):
 
 @api_view(["POST"])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def complete_payment_request(request, pk):
     """Cashier completes payment - creates a Sale from the payment request."""
     request.throttle_scope = 'payment_request'
@@ -659,6 +705,16 @@ def complete_payment_request(request, pk):
         if change > 0:
             cash_amt = max(cash_amt - change, Decimal("0"))
 
+        quantities = {}
+        for pri in pr.items.all():
+            if pri.item_id:
+                quantities[pri.item_id] = quantities.get(pri.item_id, Decimal("0")) + pri.quantity
+        try:
+            decrement_many(quantities)
+        except InsufficientStock as e:
+            transaction.set_rollback(True)
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         sale = Sale.objects.create(
             organization=org,
             customer=pr.customer,
@@ -674,14 +730,12 @@ def complete_payment_request(request, pk):
             payment_method=payment_method,
             buyer_name=pr.buyer_name,
         )
+        rollups.record_sale(sale)
+        shifts.record_sale(sale)
 
-        for pri in pr.items.all():
-            if pri.item:
-                locked_item = Item.objects.select_for_update().get(pk=pri.item.pk)
-                locked_item.stock = max(0, locked_item.stock - pri.quantity)
-                locked_item.save()
-
-            SaleItem.objects.create(
+        sale_items = []
+        for pri in pr.items.select_related("item"):
+            sale_items.append(SaleItem.objects.create(
                 sale=sale,
                 item=pri.item,
                 name=pri.item_name,
@@ -690,8 +744,9 @@ def complete_payment_request(request, pk):
                 unit=pri.unit,
                 quantity=pri.quantity,
                 price=pri.unit_price,
+                unit_cost=pri.item.cost if pri.item else None,
                 discount=pri.discount_amount,
-            )
+            ))
             DispensingLog.objects.create(
                 user=pr.dispenser,
                 sale=sale,
@@ -704,6 +759,7 @@ def complete_payment_request(request, pk):
                 amount=pri.unit_price * pri.quantity,
                 discount_amount=pri.discount_amount,
             )
+        rollups.record_items(sale, sale_items)
 
         if pr.customer and wallet_amt > 0:
             pr.customer.wallet_balance = (
@@ -803,6 +859,7 @@ def expense_category_list(request):
 
 
 @api_view(["GET", "POST"])
+@idempotent
 def expense_list(request):
     org, err = require_org(request)
     if err:
@@ -841,6 +898,7 @@ def expense_list(request):
         date=expense_date,
         created_by=request.user if request.user.is_authenticated else None,
     )
+    report_cache.bump(org.pk)
     return Response(expense.to_api_dict(), status=status.HTTP_201_CREATED)
 
 
@@ -852,11 +910,13 @@ def expense_detail(request, pk):
     expense = get_object_or_404(Expense, pk=pk, organization=org)
     if request.method == "DELETE":
         expense.delete()
+        report_cache.bump(org.pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
     data = request.data
     expense.amount = data.get("amount", expense.amount)
     expense.description = data.get("description", expense.description)
     expense.save()
+    report_cache.bump(org.pk)
     return Response(expense.to_api_dict())
 
 
@@ -880,17 +940,26 @@ def monthly_report(request):
         status__in=["completed", "partial_return"],
     )
 
-    sales_total = sales_qs.aggregate(t=Sum("total_amount"))["t"] or 0
+    # Revenue from the daily rollup; the Sale queryset is still needed for COGS.
+    from reports.models import SalesDailyRollup
+    sales_total = (
+        SalesDailyRollup.objects.filter(
+            organization=org,
+            day__year=year,
+            day__month=month,
+            status__in=["completed", "partial_return"],
+        ).aggregate(t=Sum("revenue"))["t"]
+        or 0
+    )
 
-    # Cost of goods sold — mirrors the profit_report logic in reports/views.py
+    # Cost of goods sold from the unit cost recorded on each sale line
     from django.db.models import FloatField
     cogs = (
         SaleItem.objects.filter(
             sale__in=sales_qs,
-            item__isnull=False,
-            item__cost__gt=0,
+            unit_cost__gt=0,
         ).aggregate(
-            t=Sum(F("quantity") * F("item__cost"), output_field=FloatField())
+            t=Sum(F("quantity") * F("unit_cost"), output_field=FloatField())
         )["t"]
         or 0
     )
@@ -963,6 +1032,7 @@ def supplier_detail(request, pk):
 
 
 @api_view(["GET", "POST"])
+@idempotent
 def procurement_list(request):
     org, err = require_org(request)
     if err:
@@ -1019,6 +1089,7 @@ def procurement_list(request):
 
 @api_view(["POST"])
 @throttle_classes([ScopedRateThrottle])
+@idempotent
 def complete_procurement(request, pk):
     """Mark procurement as completed and add items to inventory (retail or wholesale)."""
     request.throttle_scope = 'procurement'
@@ -1337,22 +1408,42 @@ def barcode_lookup(request):
             {"detail": "No barcode provided"}, status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Try exact barcode match
-    item = Item.objects.filter(barcode=code, organization=org).first()
+    item = resolve_code(org, code)
     if item:
         return Response(item.to_api_dict())
 
-    # Try GTIN match
-    item = Item.objects.filter(gtin=code, organization=org).first()
-    if item:
-        return Response(item.to_api_dict())
+    return Response({"detail": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Try partial GTIN (without leading zeros)
-    item = Item.objects.filter(gtin__endswith=code.lstrip("0"), organization=org).first()
-    if item:
-        return Response(item.to_api_dict())
 
-    return Response({"detail": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
+_BARCODE_BATCH_MAX = 200
+
+
+@api_view(["POST"])
+def barcode_batch_lookup(request):
+    """Resolve a whole scan session in one round trip.
+
+    POST /pos/barcode/batch/  {"codes": ["0012345678905", "5012345678900", ...]}
+
+    Returns {"matches": {code: item}, "misses": [code, ...]}, keyed by the
+    codes exactly as sent.
+    """
+    org, err = require_org(request)
+    if err:
+        return err
+    codes = request.data.get("codes") if isinstance(request.data, dict) else None
+    if not isinstance(codes, list) or not codes:
+        return Response({"detail": "codes must be a non-empty list"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if len(codes) > _BARCODE_BATCH_MAX:
+        return Response({"detail": f"At most {_BARCODE_BATCH_MAX} codes per request"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    codes = list(dict.fromkeys(str(c).strip() for c in codes if str(c).strip()))
+
+    found = resolve_codes(org, codes)
+    return Response({
+        "matches": {code: item.to_api_dict() for code, item in found.items()},
+        "misses": [code for code in codes if code not in found],
+    })
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1426,7 +1517,9 @@ def user_detail(request, pk):
     if request.method == "GET":
         return Response(user.to_api_dict())
     if request.method == "DELETE":
+        user_id = user.pk
         user.delete()
+        bump_permissions(user_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
     data = request.data
     if "phoneNumber" in data and data["phoneNumber"].strip():
@@ -1438,6 +1531,7 @@ def user_detail(request, pk):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         user.phone_number = new_phone
+    claims_before = (user.role, user.branch_id, user.is_active)
     user.role = data.get("role", user.role)
     user.is_active = data.get("isActive", user.is_active)
     if "username" in data:
@@ -1445,7 +1539,9 @@ def user_detail(request, pk):
     if "branch_id" in data:
         branch_id = data["branch_id"]
         user.branch_id = branch_id if branch_id else None
-    user.save()
+    user.save(update_fields=["phone_number", "role", "is_active", "full_name", "branch"])
+    if (user.role, user.branch_id, user.is_active) != claims_before:
+        bump_permissions(user.pk)
     return Response(user.to_api_dict())
 
 
@@ -1469,7 +1565,7 @@ def change_password(request, pk):
             status=status.HTTP_400_BAD_REQUEST,
         )
     user.set_password(new_password)
-    user.save()
+    user.save(update_fields=["password"])
     return Response({"detail": "Password changed"})
 
 
@@ -1530,6 +1626,7 @@ def shift_current(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def shift_open(request):
     """POST /pos/shifts/open/ — open a new shift (one open shift per user)."""
     org, err = require_org(request)
@@ -1564,6 +1661,7 @@ def shift_open(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def shift_close(request, pk):
     """POST /pos/shifts/<pk>/close/ — close a shift."""
     org, err = require_org(request)
@@ -1586,7 +1684,9 @@ def shift_close(request, pk):
     shift.status       = Shift.STATUS_CLOSED
     shift.closed_at    = tz.now()
     shift.closing_cash = closing_cash
-    shift.save()
+    # Only the close fields — a full save would overwrite running totals
+    # updated by a concurrent checkout since the row was read.
+    shift.save(update_fields=['status', 'closed_at', 'closing_cash'])
 
     log_activity(request, action='Close Shift', category='pos',
                  description=f'Shift #{shift.id} closed with ₦{closing_cash:,.0f} closing cash')
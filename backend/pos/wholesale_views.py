@@ -10,10 +10,14 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from inventory.models import Item
+from inventory.stock import InsufficientStock, decrement_stock, increment_stock
 from customers.models import Customer
 from .models import Sale, SaleItem, TransferRequest, ReturnRecord, DispensingLog
+from authapp.idempotency import idempotent
 from authapp.utils import require_org
 from authapp.permissions import require_role, require_permission, TRANSFERS_ROLES
+from reports import rollups
+from . import receipts, shifts
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -135,28 +139,12 @@ def wholesale_customer_negative(request):
 
 @api_view(["GET"])
 def wholesale_sale_list(request):
+    """Wholesale receipts; same filters and paging as sale_list (pos.receipts)."""
     org, err = require_org(request)
     if err:
         return err
-    sales = (
-        Sale.objects.filter(organization=org, is_wholesale=True)
-        .select_related("customer", "cashier")
-        .order_by("-created")
-    )
-    date_from = request.query_params.get("from")
-    date_to = request.query_params.get("to")
-    search = request.query_params.get("search", "").strip()
-    if date_from:
-        sales = sales.filter(created__date__gte=date_from)
-    if date_to:
-        sales = sales.filter(created__date__lte=date_to)
-    if search:
-        sales = sales.filter(
-            Q(receipt_id__icontains=search)
-            | Q(customer__name__icontains=search)
-            | Q(buyer_name__icontains=search)
-        )
-    return Response([s.to_api_dict() for s in sales[:100]])
+    sales = Sale.objects.filter(organization=org, is_wholesale=True)
+    return receipts.sales_response(request, receipts.filter_sales(sales, request.query_params))
 
 
 @api_view(["GET"])
@@ -204,6 +192,7 @@ def wholesale_sale_by_user(request):
 
 
 @api_view(["GET", "POST"])
+@idempotent
 def transfer_list(request):
     org, err = require_org(request)
     if err:
@@ -259,6 +248,7 @@ def transfer_detail(request, pk):
 
 
 @api_view(["POST"])
+@idempotent
 def transfer_approve(request, pk):
     org, err = require_org(request)
     if err:
@@ -322,6 +312,7 @@ def transfer_reject(request, pk):
 
 
 @api_view(["POST"])
+@idempotent
 def transfer_receive(request, pk):
     org, err = require_org(request)
     if err:
@@ -366,6 +357,16 @@ def transfer_receive(request, pk):
         )
 
     with transaction.atomic():
+        try:
+            decrement_stock(src_item, qty)
+        except InsufficientStock:
+            # Stock moved between the check above and now (concurrent sale).
+            transaction.set_rollback(True)
+            return Response(
+                {"detail": f"Insufficient stock: {src_item.name} sold out in {src_store} before transfer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         transfer.status = "received"
         transfer.save()
 
@@ -389,11 +390,7 @@ def transfer_receive(request, pk):
                 stock=0,
             )
 
-        src_item.stock -= qty
-        src_item.save()
-
-        dst_item.stock += qty
-        dst_item.save()
+        increment_stock(dst_item, qty)
 
     return Response(transfer.to_api_dict())
 
@@ -461,6 +458,7 @@ def wholesale_sale_detail(request, pk):
 
 
 @api_view(["POST"])
+@idempotent
 def wholesale_sale_return(request, pk):
     """Return items from a wholesale sale. Restores stock and optionally refunds wallet."""
     org, err = require_org(request)
@@ -487,20 +485,32 @@ def wholesale_sale_return(request, pk):
         )
 
     with transaction.atomic():
+        # Lock the sale so concurrent returns against it run one after the
+        # other, each seeing the previous one's return_qty and status.
+        sale = Sale.objects.select_for_update().get(pk=sale.pk)
+        sale_item = SaleItem.objects.get(pk=sale_item.pk)
+        old_status = sale.status
+        remaining = sale_item.quantity - sale_item.return_qty
+        if qty > remaining:
+            return Response(
+                {"detail": f"Can only return {remaining} more units"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         line_total = (sale_item.price * sale_item.quantity) - sale_item.discount
         unit_refund = (
             line_total / sale_item.quantity if sale_item.quantity > 0 else Decimal("0")
         )
         refund_amount = unit_refund * qty
 
-        if sale_item.item:
-            sale_item.item.stock += qty
-            sale_item.item.save()
+        if sale_item.item_id:
+            increment_stock(sale_item.item_id, qty)
 
         sale_item.return_qty += qty
         if sale_item.return_qty >= sale_item.quantity:
             sale_item.returned = True
         sale_item.save()
+        rollups.record_return(sale, sale_item, qty)
 
         DispensingLog.objects.filter(
             sale=sale, item=sale_item.item, name=sale_item.name
@@ -530,13 +540,14 @@ def wholesale_sale_return(request, pk):
                 note=f"Refund for wholesale return - Receipt {sale.receipt_id}",
             )
 
-        sale.refresh_from_db()
         all_returned = all(i.returned for i in sale.items.all())
         if all_returned:
             sale.status = "returned"
         elif sale.returns.count() > 0:
             sale.status = "partial_return"
         sale.save()
+        rollups.move_sale(sale, old_status)
+        shifts.move_sale(sale, old_status)
 
     sale.refresh_from_db()
     data = sale.to_api_dict()
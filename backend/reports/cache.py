@@ -0,0 +1,151 @@
+"""
+Versioned report cache.
+
+Report payloads are cached under the organization's current *data version*:
+
+    report:<org id>:<version>:<report>:<hash of normalized params>
+
+Every write that can change a report (checkout, returns, expenses, wallet
+top-ups, inventory writes) calls ``bump(org_id)``, which moves the
+organization to a new version — older entries are never read again and
+simply expire after REPORT_CACHE_TIMEOUT.
+
+Misses are single-flighted: within a process a per-key lock lets one thread
+compute while the others wait for its result; across processes a short
+``cache.add`` lock does the same, and waiters compute themselves if no result
+appears within REPORT_CACHE_WAIT_SECONDS.
+
+Versions and locks live in the default cache, so it must be shared by every
+worker process (prod.py: Redis or the database cache). With a per-process
+LocMemCache a bump would only reach the worker that made it.
+
+Usage:
+    data = report_cache.get_or_compute(
+        org.pk, 'sales', {'from': start, 'to': end},
+        lambda: _sales_report_data(org, period, start, end),
+    )
+"""
+import contextlib
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+_VERSION_KEY = 'report:version:{}'
+_POLL_SECONDS = 0.05
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _timeout():
+    return getattr(settings, 'REPORT_CACHE_TIMEOUT', 300)
+
+
+def _wait():
+    return getattr(settings, 'REPORT_CACHE_WAIT_SECONDS', 10)
+
+
+def _seed():
+    # Clock-based so a version key evicted from the cache never restarts at a
+    # number that entries were already stored under.
+    return time.time_ns() // 1000
+
+
+def data_version(org_id):
+    key = _VERSION_KEY.format(org_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), None)
+        version = cache.get(key)
+    return version
+
+
+def _incr(org_id):
+    key = _VERSION_KEY.format(org_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed(), None)
+
+
+def bump(org_id):
+    """
+    Invalidate every cached report of ``org_id``.
+
+    Bumped immediately and again on commit: a report computed from pre-commit
+    data while the writing transaction was still open lands under the
+    intermediate version and is dropped by the second bump.
+    """
+    if not org_id:
+        return
+    _incr(org_id)
+    transaction.on_commit(lambda: _incr(org_id))
+
+
+def bump_many(org_ids):
+    for org_id in set(org_ids):
+        bump(org_id)
+
+
+@contextlib.contextmanager
+def _key_lock(key):
+    with _locks_guard:
+        entry = _locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                _locks.pop(key, None)
+
+
+def _cache_key(org_id, report, params):
+    raw = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+    return f'report:{org_id}:{data_version(org_id)}:{report}:{digest}'
+
+
+def _await_other_process(key):
+    deadline = time.monotonic() + _wait()
+    while time.monotonic() < deadline:
+        time.sleep(_POLL_SECONDS)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        if cache.get(key + ':lock') is None:
+            break   # the other worker failed — compute here
+    return None
+
+
+def get_or_compute(org_id, report, params, compute):
+    """Return the cached payload for (org, report, params) or compute it once."""
+    key = _cache_key(org_id, report, params)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+
+    with _key_lock(key):
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        lock_key = key + ':lock'
+        owner = cache.add(lock_key, 1, _wait())
+        if not owner:
+            hit = _await_other_process(key)
+            if hit is not None:
+                return hit
+        try:
+            result = compute()
+            cache.set(key, result, _timeout())
+        finally:
+            if owner:
+                cache.delete(lock_key)
+        return result
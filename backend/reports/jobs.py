@@ -0,0 +1,139 @@
+"""
+Background report jobs (reports.models.ReportJob).
+
+Long custom ranges are computed off the request thread: the submit view
+creates a ReportJob and calls ``enqueue(job, compute)``; once the creating
+transaction commits, the job runs on a small in-process thread pool
+(REPORT_JOB_WORKERS) and the JSON result is stored on the row until
+``expires_at``. Clients poll the job and fetch the result when it is done.
+
+``compute(job)`` returns the report payload (a dict). Decimals and dates are
+converted to their JSON form before storing.
+
+REPORT_JOBS_EAGER = True runs jobs inline at enqueue time (tests, shells).
+Jobs still pending or running when a process stops are not resumed. Once a
+job has been pending or running for REPORT_JOB_TIMEOUT_MINUTES it is marked
+failed — when polled, or by purge_report_jobs — so the client resubmits.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _workers():
+    return getattr(settings, 'REPORT_JOB_WORKERS', 2)
+
+
+def _eager():
+    return getattr(settings, 'REPORT_JOBS_EAGER', False)
+
+
+def _timeout():
+    return timedelta(minutes=getattr(settings, 'REPORT_JOB_TIMEOUT_MINUTES', 30))
+
+
+def expiry():
+    """``expires_at`` for a job created now."""
+    return timezone.now() + timedelta(hours=getattr(settings, 'REPORT_JOB_TTL_HOURS', 24))
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_workers(),
+                                           thread_name_prefix='report-job')
+        return _executor
+
+
+def enqueue(job, compute):
+    """Run ``compute(job)`` in the background once the current transaction commits."""
+    if _eager():
+        run(job.pk, compute)
+        return
+    transaction.on_commit(lambda: _pool().submit(_run_in_worker, job.pk, compute))
+
+
+def _run_in_worker(pk, compute):
+    close_old_connections()
+    try:
+        run(pk, compute)
+    finally:
+        close_old_connections()
+
+
+def run(pk, compute):
+    """Claim a pending job, compute it and store the result or the failure."""
+    from .models import ReportJob
+
+    claimed = ReportJob.objects.filter(pk=pk, status=ReportJob.STATUS_PENDING).update(
+        status=ReportJob.STATUS_RUNNING, started_at=timezone.now(),
+    )
+    if not claimed:
+        return
+    job = ReportJob.objects.select_related('organization', 'requested_by').get(pk=pk)
+    try:
+        result = json.loads(json.dumps(compute(job), cls=JSONEncoder))
+    except Exception:
+        logger.exception('report job %s (%s) failed', pk, job.report)
+        ReportJob.objects.filter(pk=pk).update(
+            status=ReportJob.STATUS_FAILED, error='The report could not be computed.',
+            finished_at=timezone.now(),
+        )
+        return
+    ReportJob.objects.filter(pk=pk).update(
+        status=ReportJob.STATUS_DONE, result=result, finished_at=timezone.now(),
+    )
+
+
+def fail_stale_jobs(jobs=None):
+    """
+    Mark jobs (all, or those in the ``jobs`` queryset) that have been pending or
+    running longer than REPORT_JOB_TIMEOUT_MINUTES as failed: the process
+    running them has died. Returns the count.
+    """
+    from .models import ReportJob
+
+    if jobs is None:
+        jobs = ReportJob.objects.all()
+    now = timezone.now()
+    cutoff = now - _timeout()
+    return jobs.filter(
+        Q(status=ReportJob.STATUS_PENDING, created_at__lt=cutoff)
+        | Q(status=ReportJob.STATUS_RUNNING, started_at__lt=cutoff)
+    ).update(
+        status=ReportJob.STATUS_FAILED, finished_at=now,
+        error='The report did not finish. Please run it again.',
+    )
+
+
+def check_stale(job):
+    """``job``, failed first by fail_stale_jobs() if it has timed out."""
+    from .models import ReportJob
+
+    unfinished = (ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING)
+    if job.status in unfinished and fail_stale_jobs(ReportJob.objects.filter(pk=job.pk)):
+        job.refresh_from_db()
+    return job
+
+
+def purge_expired_jobs():
+    """Fail timed-out jobs, then delete jobs past their expiry. Returns the deleted count."""
+    from .models import ReportJob
+
+    fail_stale_jobs()
+    deleted, _ = ReportJob.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,26 @@
+"""
+Management command: purge_report_jobs
+
+Deletes background report jobs (ReportJob) past their expiry, results
+included. Expired results are already refused at download time; this just
+keeps the table small. Jobs left pending or running past
+REPORT_JOB_TIMEOUT_MINUTES by a dead worker are marked failed first.
+
+Usage:
+    python manage.py purge_report_jobs
+
+Cron example (hourly):
+    15 * * * * /path/to/venv/bin/python /path/to/manage.py purge_report_jobs \
+               --settings pharmapi.settings.prod >> /var/log/purge_report_jobs.log 2>&1
+"""
+from django.core.management.base import BaseCommand
+
+from reports.jobs import purge_expired_jobs
+
+
+class Command(BaseCommand):
+    help = 'Delete expired background report jobs.'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_jobs()
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired report job(s).'))
@@ -0,0 +1,46 @@
+"""
+Management command: rebuild_sales_rollups
+
+Recomputes the daily sales rollups (SalesDailyRollup from Sale rows,
+ItemDailyRollup from SaleItem rows).
+Checkout and returns keep them current, so this is only needed after bulk
+imports, raw SQL edits or a restore.
+
+Usage:
+    python manage.py rebuild_sales_rollups
+    python manage.py rebuild_sales_rollups --org 12
+    python manage.py rebuild_sales_rollups --from 2026-01-01 --to 2026-01-31
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.rollups import rebuild, rebuild_items
+
+
+def _parse_day(value, flag):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'{flag} must be a date (yyyy-mm-dd).')
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily sales and item rollups used by the sales reports.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Only rebuild rows of this organization id.')
+        parser.add_argument('--from', dest='start', help='First day to rebuild (yyyy-mm-dd).')
+        parser.add_argument('--to', dest='end', help='Last day to rebuild (yyyy-mm-dd).')
+
+    def handle(self, *args, **options):
+        start = _parse_day(options.get('start'), '--from')
+        end = _parse_day(options.get('end'), '--to')
+        scope = {'organization_id': options.get('org'), 'start': start, 'end': end}
+        sales = rebuild(**scope)
+        items = rebuild_items(**scope)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {sales} sales rollup row(s) and {items} item rollup row(s).'
+        ))
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:46
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncDate
+
+# Frozen copy of reports.rollups.rebuild() as of this migration.
+_AMOUNT_FIELDS = {
+    'revenue': 'total_amount',
+    'discount': 'discount_total',
+    'consultation_fee': 'consultation_fee',
+    'pos': 'payment_pos',
+    'transfer': 'payment_transfer',
+    'wallet': 'payment_wallet',
+}
+_METHODS = ('cash', 'pos', 'transfer', 'wallet')
+_SUM_FIELDS = ('sale_count', 'revenue', 'discount', 'consultation_fee',
+               *_METHODS, *(f'{m}_count' for m in _METHODS))
+
+
+def backfill(apps, schema_editor):
+    Sale = apps.get_model('pos', 'Sale')
+    SalesDailyRollup = apps.get_model('reports', 'SalesDailyRollup')
+
+    cash_applied = Greatest(
+        Least(
+            F('payment_cash'),
+            F('total_amount') - F('payment_pos') - F('payment_transfer') - F('payment_wallet'),
+        ),
+        Value(Decimal('0')),
+        output_field=models.DecimalField(),
+    )
+    agg = {f'r_{field}': Sum(src) for field, src in _AMOUNT_FIELDS.items()}
+    agg['r_cash'] = Sum(cash_applied)
+    agg['r_sale_count'] = Count('id')
+    for m in _METHODS:
+        agg[f'r_{m}_count'] = Count('id', filter=Q(**{f'payment_{m}__gt': 0}))
+    grouped = (
+        Sale.objects.filter(organization__isnull=False)
+        .annotate(day=TruncDate('created'))
+        .values('organization_id', 'branch_id', 'day', 'is_wholesale', 'status')
+        .annotate(**agg)
+        .order_by()
+    )
+    SalesDailyRollup.objects.bulk_create([
+        SalesDailyRollup(
+            organization_id=r['organization_id'],
+            branch_key=r['branch_id'] or 0,
+            day=r['day'],
+            is_wholesale=r['is_wholesale'],
+            status=r['status'],
+            **{field: r[f'r_{field}'] or 0 for field in _SUM_FIELDS},
+        )
+        for r in grouped
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('pos', '0014_alter_sale_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch_key', models.IntegerField(default=0)),
+                ('day', models.DateField()),
+                ('is_wholesale', models.BooleanField(default=False)),
+                ('status', models.CharField(max_length=20)),
+                ('sale_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('consultation_fee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cash', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transfer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('wallet', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cash_count', models.IntegerField(default=0)),
+                ('pos_count', models.IntegerField(default=0)),
+                ('transfer_count', models.IntegerField(default=0)),
+                ('wallet_count', models.IntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_daily_rollups', to='authapp.organization')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('organization', 'day', 'branch_key', 'is_wholesale', 'status'), name='sales_rollup_key_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:50
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill(apps, schema_editor):
+    # Frozen copy of reports.rollups.rebuild_items() as of this migration.
+    SaleItem = apps.get_model('pos', 'SaleItem')
+    ItemDailyRollup = apps.get_model('reports', 'ItemDailyRollup')
+
+    decimal = models.DecimalField(max_digits=14, decimal_places=2)
+    amount = ExpressionWrapper(F('quantity') * F('price'), output_field=decimal)
+    credit = Q(sale__status='credit')
+    grouped = (
+        SaleItem.objects.filter(sale__organization__isnull=False)
+        .annotate(day=TruncDate('sale__created'))
+        .values('sale__organization_id', 'day', 'item_id', 'name')
+        .annotate(
+            r_quantity=Sum('quantity'),
+            r_revenue=Sum(amount, filter=~credit),
+            r_credit_revenue=Sum(amount, filter=credit),
+            r_cost=Sum(ExpressionWrapper(
+                F('quantity') * Coalesce(F('item__cost'), Value(Decimal('0'))),
+                output_field=decimal,
+            )),
+            r_return_qty=Sum('return_qty'),
+        )
+        .order_by()
+    )
+    ItemDailyRollup.objects.bulk_create([
+        ItemDailyRollup(
+            organization_id=r['sale__organization_id'],
+            day=r['day'],
+            item_key=r['item_id'] or 0,
+            name=r['name'],
+            **{field: r[f'r_{field}'] or 0 for field in
+               ('quantity', 'revenue', 'credit_revenue', 'cost', 'return_qty')},
+        )
+        for r in grouped
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0018_idempotencykey'),
+        ('inventory', '0012_medicationavailability'),
+        ('pos', '0014_alter_sale_status'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('item_key', models.IntegerField(default=0)),
+                ('name', models.CharField(default='', max_length=200)),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('credit_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('return_qty', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_daily_rollups', to='authapp.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'item_key', 'day'], name='item_rollup_item_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('organization', 'day', 'item_key', 'name'), name='item_rollup_key_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:52
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_cost(apps, schema_editor):
+    # Rebook ItemDailyRollup.cost from the SaleItem.unit_cost snapshot, leaving
+    # credit sales out as rollups.record_items() does. Lines sold before the
+    # snapshot existed fall back to the item's current cost.
+    SaleItem = apps.get_model('pos', 'SaleItem')
+    ItemDailyRollup = apps.get_model('reports', 'ItemDailyRollup')
+
+    decimal = models.DecimalField(max_digits=14, decimal_places=2)
+    costs = (
+        SaleItem.objects.filter(sale__organization__isnull=False)
+        .exclude(sale__status='credit')
+        .annotate(day=TruncDate('sale__created'))
+        .values('sale__organization_id', 'day', 'item_id', 'name')
+        .annotate(r_cost=Sum(ExpressionWrapper(
+            F('quantity') * Coalesce(F('unit_cost'), F('item__cost'), Value(Decimal('0'))),
+            output_field=decimal,
+        )))
+        .order_by()
+    )
+    booked = {
+        (r['sale__organization_id'], r['day'], r['item_id'] or 0, r['name']): r['r_cost'] or 0
+        for r in costs
+    }
+    changed = []
+    for row in ItemDailyRollup.objects.iterator(chunk_size=2000):
+        cost = booked.get((row.organization_id, row.day, row.item_key, row.name), Decimal('0'))
+        if row.cost != cost:
+            row.cost = cost
+            changed.append(row)
+    ItemDailyRollup.objects.bulk_update(changed, ['cost'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0015_saleitem_unit_cost'),
+        ('reports', '0003_reportjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_cost, migrations.RunPython.noop),
+    ]
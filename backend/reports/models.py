@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.db import models
+
+
+class SalesDailyRollup(models.Model):
+    """
+    Per-day sales totals, one row per (organization, branch, local day,
+    retail/wholesale, sale status). Maintained in the checkout / return
+    transactions by reports.rollups, so reports sum a handful of rows per day
+    instead of scanning Sale. Rebuild with `manage.py rebuild_sales_rollups`.
+    """
+    organization = models.ForeignKey(
+        'authapp.Organization', on_delete=models.CASCADE,
+        related_name='sales_daily_rollups'
+    )
+    # Branch id, 0 = no branch. Not a nullable FK: NULLs never collide in a
+    # unique index, which would let concurrent first sales of a day race in
+    # duplicate rows.
+    branch_key = models.IntegerField(default=0)
+    day = models.DateField()   # Africa/Lagos calendar day of Sale.created
+    is_wholesale = models.BooleanField(default=False)
+    status = models.CharField(max_length=20)
+
+    sale_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    consultation_fee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Cash is the applied amount (change deducted), as in reports._cash_applied.
+    cash = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transfer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    wallet = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Number of sales with a non-zero amount in each method.
+    cash_count = models.IntegerField(default=0)
+    pos_count = models.IntegerField(default=0)
+    transfer_count = models.IntegerField(default=0)
+    wallet_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'day', 'branch_key', 'is_wholesale', 'status'],
+                name='sales_rollup_key_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        kind = 'wholesale' if self.is_wholesale else 'retail'
+        return f"{self.day} {kind} {self.status}: ₦{self.revenue} ({self.sale_count})"
+
+
+class ItemDailyRollup(models.Model):
+    """
+    Per-day sold quantity / revenue / cost / returns of one item, keyed like
+    the top-items report: (item, SaleItem.name) so deleted items still show.
+    Maintained alongside SalesDailyRollup by reports.rollups.
+    """
+    organization = models.ForeignKey(
+        'authapp.Organization', on_delete=models.CASCADE,
+        related_name='item_daily_rollups'
+    )
+    day = models.DateField()   # Africa/Lagos calendar day of Sale.created
+    # Item id at the time of sale, 0 = line without an inventory item.
+    item_key = models.IntegerField(default=0)
+    name = models.CharField(max_length=200, default='')
+
+    # Units dispensed, whatever the sale status (credit included).
+    quantity = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # quantity × price, split so credit sales stay out of revenue totals.
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    credit_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # quantity × SaleItem.unit_cost of non-credit sales, matching revenue.
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Units later returned, booked on the day of the original sale.
+    return_qty = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'day', 'item_key', 'name'],
+                name='item_rollup_key_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['organization', 'item_key', 'day'],
+                         name='item_rollup_item_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.name}: {self.quantity} (₦{self.revenue})"
+
+
+class ReportJob(models.Model):
+    """
+    A report computed in the background (see reports.jobs) for date ranges too
+    long to serve inside a request. The result is kept until ``expires_at``;
+    purge old rows with `manage.py purge_report_jobs`.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    organization = models.ForeignKey(
+        'authapp.Organization', on_delete=models.CASCADE, related_name='report_jobs'
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='report_jobs'
+    )
+    report = models.CharField(max_length=30)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization', 'created_at'], name='report_job_org_created_idx'),
+            models.Index(fields=['expires_at'], name='report_job_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.report} #{self.pk} ({self.status})"
+
+    def to_api_dict(self):
+        return {
+            'id':         self.id,
+            'report':     self.report,
+            'params':     self.params,
+            'status':     self.status,
+            'error':      self.error,
+            'createdAt':  self.created_at.isoformat() if self.created_at else None,
+            'startedAt':  self.started_at.isoformat() if self.started_at else None,
+            'finishedAt': self.finished_at.isoformat() if self.finished_at else None,
+            'expiresAt':  self.expires_at.isoformat() if self.expires_at else None,
+        }
@@ -0,0 +1,322 @@
+"""
+Daily sales rollups (reports.models.SalesDailyRollup, ItemDailyRollup).
+
+Checkout, payment-request completion and returns call into this module inside
+their own ``transaction.atomic()`` block, so a rollup row never disagrees with
+the sales it summarises:
+
+    sale = Sale.objects.create(...)
+    rollups.record_sale(sale)            # new sale → add to its bucket
+    rollups.record_items(sale, lines)    # its SaleItems → per-item rows
+
+    rollups.record_return(sale, sale_item, qty)
+
+    old_status = sale.status
+    sale.status = 'returned'; sale.save()
+    rollups.move_sale(sale, old_status)  # status change → move between buckets
+
+Rows are only ever adjusted with ``UPDATE ... SET x = x + delta`` so concurrent
+checkouts on the same day never lose an increment. ``rebuild()`` recomputes
+rows from Sale (manage.py rebuild_sales_rollups) after bulk imports, admin
+edits that bypass these hooks, or a schema change; ``rebuild_items()`` does
+the same for the per-item table.
+
+Recording or moving a sale also bumps the organization's report-cache
+version (reports.cache), so cached reports never outlive the sale.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db import models as db_models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Greatest, Least, TruncDate
+from django.utils import timezone
+
+from authapp.utils import local_day_bounds
+
+from . import cache as report_cache
+
+ZERO = Decimal('0')
+
+# Rollup amount field → Sale field it sums (cash is handled separately).
+_AMOUNT_FIELDS = {
+    'revenue': 'total_amount',
+    'discount': 'discount_total',
+    'consultation_fee': 'consultation_fee',
+    'pos': 'payment_pos',
+    'transfer': 'payment_transfer',
+    'wallet': 'payment_wallet',
+}
+_METHODS = ('cash', 'pos', 'transfer', 'wallet')
+
+# Every additive column on SalesDailyRollup; reports Sum() over these.
+SUM_FIELDS = ('sale_count', 'revenue', 'discount', 'consultation_fee',
+              *_METHODS, *(f'{m}_count' for m in _METHODS))
+
+
+def cash_applied():
+    """Cash actually applied to the sale, per row.
+
+    Legacy sales stored cash *tendered* (change not deducted), so summing
+    payment_cash raw overstates money kept. Change is given from cash, so cap
+    cash at total_amount minus the other payment methods, floored at 0.
+    New sales are already clamped at checkout; for them this is a no-op.
+    """
+    return Greatest(
+        Least(
+            F('payment_cash'),
+            F('total_amount') - F('payment_pos')
+            - F('payment_transfer') - F('payment_wallet'),
+        ),
+        Value(Decimal('0')),
+        output_field=db_models.DecimalField(),
+    )
+
+
+def summed(rows, *group_by):
+    """
+    Sum every SUM_FIELDS column of a SalesDailyRollup queryset per
+    ``group_by`` values. Returns plain dicts keyed like the model fields.
+    """
+    agg = {f'r_{field}': db_models.Sum(field) for field in SUM_FIELDS}
+    result = []
+    for r in rows.values(*group_by).annotate(**agg).order_by(*group_by):
+        result.append({
+            **{key: r[key] for key in group_by},
+            **{field: r[f'r_{field}'] or 0 for field in SUM_FIELDS},
+        })
+    return result
+
+
+def _contribution(sale):
+    """Column deltas one sale adds to its rollup row."""
+    values = {field: getattr(sale, src) or ZERO for field, src in _AMOUNT_FIELDS.items()}
+    cash = sale.payment_cash or ZERO
+    other = values['pos'] + values['transfer'] + values['wallet']
+    values['cash'] = max(min(cash, values['revenue'] - other), ZERO)
+    values['sale_count'] = 1
+    # Counts follow the recorded payment, as in rebuild().
+    values['cash_count'] = int(cash > 0)
+    for method in ('pos', 'transfer', 'wallet'):
+        values[f'{method}_count'] = int(values[method] > 0)
+    return values
+
+
+def _key(sale, status):
+    return {
+        'organization_id': sale.organization_id,
+        'branch_key': sale.branch_id or 0,
+        'day': timezone.localdate(sale.created),
+        'is_wholesale': sale.is_wholesale,
+        'status': status,
+    }
+
+
+def _apply(model, key, values, sign=1):
+    updates = {field: F(field) + sign * delta for field, delta in values.items()}
+    for _ in range(2):
+        if model.objects.filter(**key).update(**updates):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(
+                    **key, **{field: sign * delta for field, delta in values.items()}
+                )
+            return
+        except IntegrityError:
+            continue  # a concurrent first sale created the row — update it
+
+
+def _item_key(sale, line):
+    return {
+        'organization_id': sale.organization_id,
+        'day': timezone.localdate(sale.created),
+        'item_key': line.item_id or 0,
+        'name': line.name,
+    }
+
+
+def _line_cost(line):
+    return line.quantity * (line.unit_cost or ZERO)
+
+
+def record_sale(sale):
+    """Add a newly created sale to its day's rollup row."""
+    from .models import SalesDailyRollup
+
+    if not sale.organization_id:
+        return
+    _apply(SalesDailyRollup, _key(sale, sale.status), _contribution(sale))
+    report_cache.bump(sale.organization_id)
+
+
+def record_items(sale, lines):
+    """Add the SaleItems of a newly created sale to the per-item rows."""
+    from .models import ItemDailyRollup
+
+    if not sale.organization_id:
+        return
+    credit = sale.status == 'credit'
+    merged = {}
+    for line in lines:
+        key = _item_key(sale, line)
+        values = merged.setdefault(
+            tuple(key.values()),
+            (key, {'quantity': ZERO, 'revenue': ZERO, 'credit_revenue': ZERO,
+                   'cost': ZERO}),
+        )[1]
+        values['quantity'] += line.quantity
+        if credit:
+            values['credit_revenue'] += line.quantity * line.price
+        else:
+            values['revenue'] += line.quantity * line.price
+            values['cost'] += _line_cost(line)
+    # Sorted so concurrent sales of overlapping carts lock rows in one order.
+    for _, (key, values) in sorted(merged.items(), key=lambda kv: kv[0][2:]):
+        _apply(ItemDailyRollup, key, values)
+
+
+def record_return(sale, line, qty):
+    """Book ``qty`` returned units of ``line`` against the day it was sold."""
+    from .models import ItemDailyRollup
+
+    if not sale.organization_id or not qty:
+        return
+    _apply(ItemDailyRollup, _item_key(sale, line), {'return_qty': qty})
+    report_cache.bump(sale.organization_id)
+
+
+def move_sale(sale, old_status):
+    """Move a sale whose status changed (e.g. returned) to its new bucket."""
+    from .models import ItemDailyRollup, SalesDailyRollup
+
+    if not sale.organization_id or old_status == sale.status:
+        return
+    values = _contribution(sale)
+    _apply(SalesDailyRollup, _key(sale, old_status), values, sign=-1)
+    _apply(SalesDailyRollup, _key(sale, sale.status), values)
+    report_cache.bump(sale.organization_id)
+
+    if (old_status == 'credit') != (sale.status == 'credit'):
+        # Item revenue and cost exclude credit sales: shift them between columns.
+        sign = 1 if old_status == 'credit' else -1
+        for line in sale.items.all():
+            amount = line.quantity * line.price
+            _apply(ItemDailyRollup, _item_key(sale, line), {
+                'revenue': sign * amount,
+                'credit_revenue': -sign * amount,
+                'cost': sign * _line_cost(line),
+            })
+
+
+def rebuild(organization_id=None, start=None, end=None):
+    """
+    Recompute rollup rows from Sale, optionally limited to one organization
+    and/or an inclusive local-day range. Returns the number of rows written.
+    """
+    from pos.models import Sale
+
+    from .models import SalesDailyRollup
+
+    sales = Sale.objects.filter(organization__isnull=False)
+    rows = SalesDailyRollup.objects.all()
+    if organization_id is not None:
+        sales = sales.filter(organization_id=organization_id)
+        rows = rows.filter(organization_id=organization_id)
+    if start is not None:
+        sales = sales.filter(created__gte=local_day_bounds(start, start)[0])
+        rows = rows.filter(day__gte=start)
+    if end is not None:
+        sales = sales.filter(created__lt=local_day_bounds(end, end)[1])
+        rows = rows.filter(day__lte=end)
+
+    # Aliases are prefixed: an annotation may not shadow a Sale field
+    # (consultation_fee), and cash_applied() must see the raw columns.
+    agg = {f'r_{field}': db_models.Sum(src) for field, src in _AMOUNT_FIELDS.items()}
+    agg['r_cash'] = db_models.Sum(cash_applied())
+    agg['r_sale_count'] = db_models.Count('id')
+    for m in _METHODS:
+        agg[f'r_{m}_count'] = db_models.Count('id', filter=Q(**{f'payment_{m}__gt': 0}))
+    grouped = (
+        sales
+        .annotate(day=TruncDate('created'))
+        .values('organization_id', 'branch_id', 'day', 'is_wholesale', 'status')
+        .annotate(**agg)
+        .order_by()
+    )
+    new_rows = [
+        SalesDailyRollup(
+            organization_id=r['organization_id'],
+            branch_key=r['branch_id'] or 0,
+            day=r['day'],
+            is_wholesale=r['is_wholesale'],
+            status=r['status'],
+            **{field: r[f'r_{field}'] or 0 for field in SUM_FIELDS},
+        )
+        for r in grouped
+    ]
+    with transaction.atomic():
+        rows.delete()
+        SalesDailyRollup.objects.bulk_create(new_rows, batch_size=500)
+    report_cache.bump_many({organization_id, *(r.organization_id for r in new_rows)})
+    return len(new_rows)
+
+
+def rebuild_items(organization_id=None, start=None, end=None):
+    """
+    Recompute ItemDailyRollup rows from SaleItem, with the same filters as
+    rebuild(). Returns the number of rows written.
+    """
+    from pos.models import SaleItem
+
+    from .models import ItemDailyRollup
+
+    lines = SaleItem.objects.filter(sale__organization__isnull=False)
+    rows = ItemDailyRollup.objects.all()
+    if organization_id is not None:
+        lines = lines.filter(sale__organization_id=organization_id)
+        rows = rows.filter(organization_id=organization_id)
+    if start is not None:
+        lines = lines.filter(sale__created__gte=local_day_bounds(start, start)[0])
+        rows = rows.filter(day__gte=start)
+    if end is not None:
+        lines = lines.filter(sale__created__lt=local_day_bounds(end, end)[1])
+        rows = rows.filter(day__lte=end)
+
+    amount = db_models.ExpressionWrapper(
+        F('quantity') * F('price'),
+        output_field=db_models.DecimalField(max_digits=14, decimal_places=2),
+    )
+    credit = Q(sale__status='credit')
+    grouped = (
+        lines
+        .annotate(day=TruncDate('sale__created'))
+        .values('sale__organization_id', 'day', 'item_id', 'name')
+        .annotate(
+            r_quantity=db_models.Sum('quantity'),
+            r_revenue=db_models.Sum(amount, filter=~credit),
+            r_credit_revenue=db_models.Sum(amount, filter=credit),
+            r_cost=db_models.Sum(db_models.ExpressionWrapper(
+                F('quantity') * Coalesce(F('unit_cost'), Value(ZERO)),
+                output_field=db_models.DecimalField(max_digits=14, decimal_places=2),
+            ), filter=~credit),
+            r_return_qty=db_models.Sum('return_qty'),
+        )
+        .order_by()
+    )
+    new_rows = [
+        ItemDailyRollup(
+            organization_id=r['sale__organization_id'],
+            day=r['day'],
+            item_key=r['item_id'] or 0,
+            name=r['name'],
+            **{field: r[f'r_{field}'] or 0 for field in
+               ('quantity', 'revenue', 'credit_revenue', 'cost', 'return_qty')},
+        )
+        for r in grouped
+    ]
+    with transaction.atomic():
+        rows.delete()
+        ItemDailyRollup.objects.bulk_create(new_rows, batch_size=500)
+    report_cache.bump_many({organization_id, *(r.organization_id for r in new_rows)})
+    return len(new_rows)
@@ -0,0 +1,124 @@
+"""
+Versioned report cache.
+
+Verifies:
+- A repeated report request is served from the cache without recomputing.
+- Checkout and expense writes bump the organization's data version, so the
+  next request recomputes; other organizations keep their entries.
+- Customer writes (creation, debt payments) refresh the customer report.
+- Concurrent misses for the same key run the computation once.
+"""
+import threading
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from customers.models import Customer
+from customers.views import record_payment
+from inventory.models import Item
+from pos.models import ExpenseCategory
+from pos.views import checkout, expense_list
+from reports import cache as report_cache
+from reports.views import customer_report, sales_report
+
+
+class ReportCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Cached Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000011", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.item = Item.objects.create(
+            organization=self.org, name="Vitamin C", price=Decimal("100"),
+            stock=Decimal("20"), store="retail",
+        )
+
+    def _report(self):
+        req = self.factory.get("/api/reports/sales/?period=today")
+        force_authenticate(req, user=self.user)
+        return sales_report(req).data
+
+    def test_hit_and_write_invalidation(self):
+        self.assertEqual(self._report()["totalRevenue"], 0.0)
+        with CaptureQueriesContext(connection) as ctx:
+            self._report()
+        # Served from the cache: no report query runs.
+        self.assertFalse([q for q in ctx.captured_queries if "rollup" in q["sql"]])
+
+        req = self.factory.post("/api/pos/checkout/", {
+            "items": [{"itemId": self.item.id, "quantity": 2, "price": 100}],
+            "payment": {"cash": 200}, "paymentMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(checkout(req).status_code, 201)
+        self.assertEqual(self._report()["totalRevenue"], 200.0)
+
+        category = ExpenseCategory.objects.create(name="Fuel")
+        req = self.factory.post("/api/pos/expenses/", {
+            "categoryId": category.pk, "amount": 50, "paymentSource": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(expense_list(req).status_code, 201)
+        self.assertEqual(self._report()["expenses"]["total"], 50.0)
+
+    def test_customer_writes_invalidate(self):
+        def report():
+            req = self.factory.get("/api/reports/customers/")
+            force_authenticate(req, user=self.user)
+            return customer_report(req).data
+
+        self.assertEqual(report()["total"], 0)
+        customer = Customer.objects.create(
+            organization=self.org, name="Ada", phone="0801", outstanding_debt=Decimal("500"))
+        self.assertEqual((report()["total"], report()["totalDebt"]), (1, 500.0))
+
+        req = self.factory.post(f"/api/customers/{customer.pk}/record-payment/",
+                                {"amount": 200}, format="json")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(record_payment(req, pk=customer.pk).status_code, 200)
+        self.assertEqual(report()["totalDebt"], 300.0)
+
+    def test_bump_is_per_organization(self):
+        other = Organization.objects.create(name="Other Pharmacy")
+        calls = []
+        compute = lambda: calls.append(1) or {"n": len(calls)}
+        report_cache.get_or_compute(self.org.pk, "x", {}, compute)
+        report_cache.get_or_compute(other.pk, "x", {}, compute)
+        report_cache.bump(other.pk)
+        report_cache.get_or_compute(self.org.pk, "x", {}, compute)
+        report_cache.get_or_compute(other.pk, "x", {}, compute)
+        self.assertEqual(len(calls), 3)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"ok": True}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                report_cache.get_or_compute(self.org.pk, "slow", {"a": 1}, compute)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        started.wait(5)
+        release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"ok": True}] * 5)
@@ -0,0 +1,110 @@
+"""
+Background report jobs.
+
+Verifies:
+- Submitting a sales job returns 202; once run, polling shows "done" and the
+  result endpoint returns the same payload as the synchronous report.
+- Jobs are private to their requester, bad input is rejected, and roles
+  without report access cannot submit sales/profit jobs.
+- Expired results answer 410 and purge_report_jobs deletes them.
+- A job left running past REPORT_JOB_TIMEOUT_MINUTES polls as "failed".
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from inventory.models import Item
+from pos.views import checkout
+from reports.models import ReportJob
+from reports.views import report_job_detail, report_job_result, report_jobs, sales_report
+
+
+@override_settings(REPORT_JOBS_EAGER=True)
+class ReportJobTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Jobs Pharmacy")
+        self.admin = PharmUser.objects.create_user(
+            phone_number="08000000012", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.cashier = PharmUser.objects.create_user(
+            phone_number="08000000013", password="pass1234", role="Cashier",
+            organization=self.org,
+        )
+        item = Item.objects.create(
+            organization=self.org, name="Ibuprofen", price=Decimal("150"),
+            stock=Decimal("10"), store="retail",
+        )
+        req = self.factory.post("/api/pos/checkout/", {
+            "items": [{"itemId": item.id, "quantity": 2, "price": 150}],
+            "payment": {"cash": 300}, "paymentMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.admin)
+        checkout(req)
+
+    def _call(self, view, user, method="get", data=None, **kwargs):
+        req = getattr(self.factory, method)("/api/reports/jobs/", data, format="json")
+        force_authenticate(req, user=user)
+        return view(req, **kwargs)
+
+    def test_submit_poll_and_fetch(self):
+        today = str(timezone.localdate())
+        resp = self._call(report_jobs, self.admin, "post",
+                          {"report": "sales", "from": today, "to": today})
+        self.assertEqual(resp.status_code, 202)
+        job_id = resp.data["id"]
+
+        poll = self._call(report_job_detail, self.admin, pk=job_id)
+        self.assertEqual(poll.data["status"], "done")
+
+        result = self._call(report_job_result, self.admin, pk=job_id)
+        self.assertEqual(result.status_code, 200)
+        req = self.factory.get(f"/api/reports/sales/?from={today}&to={today}")
+        force_authenticate(req, user=self.admin)
+        self.assertEqual(result.data["totalRevenue"], sales_report(req).data["totalRevenue"])
+        self.assertEqual(result.data["totalRevenue"], 300.0)
+
+        # Another user of the same org cannot see it.
+        self.assertEqual(self._call(report_job_detail, self.cashier, pk=job_id).status_code, 404)
+
+    def test_validation_and_permissions(self):
+        self.assertEqual(self._call(report_jobs, self.admin, "post",
+                                    {"report": "nope"}).status_code, 400)
+        self.assertEqual(self._call(report_jobs, self.admin, "post",
+                                    {"report": "sales", "from": "x", "to": "y"}).status_code, 400)
+        self.assertEqual(self._call(report_jobs, self.cashier, "post",
+                                    {"report": "profit"}).status_code, 403)
+        resp = self._call(report_jobs, self.cashier, "post",
+                          {"report": "cashier-sales", "period": "today"})
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.data["status"], "done")
+
+    def test_expired_result_and_purge(self):
+        resp = self._call(report_jobs, self.admin, "post", {"report": "profit"})
+        ReportJob.objects.filter(pk=resp.data["id"]).update(
+            expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(
+            self._call(report_job_result, self.admin, pk=resp.data["id"]).status_code, 410)
+        call_command("purge_report_jobs", stdout=StringIO())
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_stale_running_job_fails(self):
+        resp = self._call(report_jobs, self.admin, "post", {"report": "profit"})
+        ReportJob.objects.filter(pk=resp.data["id"]).update(
+            status=ReportJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(minutes=5))
+        with override_settings(REPORT_JOB_TIMEOUT_MINUTES=10):
+            poll = self._call(report_job_detail, self.admin, pk=resp.data["id"])
+            self.assertEqual(poll.data["status"], "running")
+        with override_settings(REPORT_JOB_TIMEOUT_MINUTES=1):
+            poll = self._call(report_job_detail, self.admin, pk=resp.data["id"])
+            self.assertEqual(poll.data["status"], "failed")
+            result = self._call(report_job_result, self.admin, pk=resp.data["id"])
+        self.assertEqual(result.status_code, 409)
+        self.assertIn("run it again", result.data["detail"])
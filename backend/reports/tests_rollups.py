@@ -0,0 +1,179 @@
+"""
+Daily sales and item rollups.
+
+Verifies:
+- Checkout adds the sale to its (day, retail/wholesale, status) row, with cash
+  recorded net of change and a per-method count.
+- A full return moves the sale from the 'completed' row to the 'returned' row.
+- sales_report totals read from the rollup match the sales.
+- rebuild() recomputes the same rows from Sale.
+- The item-day rollup tracks quantity, revenue, cost and returns, and feeds
+  topItems, slow movers and the per-item trend; rebuild_items() agrees.
+- Checkout snapshots SaleItem.unit_cost, so profit_report keeps the cost at
+  sale time after the item's cost changes; backfill_sale_item_cost fills
+  legacy lines.
+- sales_report runs a fixed, small number of queries, and local-day bounds
+  put a sale made just before Lagos midnight on that local day.
+"""
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authapp.models import Organization, PharmUser
+from authapp.utils import local_day_bounds
+from inventory.models import Item
+from pos.models import Sale, SaleItem
+from pos.views import checkout, return_item
+from reports import rollups
+from reports.models import ItemDailyRollup, SalesDailyRollup
+from reports.views import (
+    _sales_report_data, item_trend_report, profit_report, sales_report, slow_movers_report,
+)
+
+FIELDS = ('status', 'sale_count', 'revenue', 'cash', 'pos', 'cash_count', 'pos_count')
+
+
+class SalesDailyRollupTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Rollup Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000010", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.item = Item.objects.create(
+            organization=self.org, name="Amoxicillin", price=Decimal("200"),
+            cost=Decimal("120"), stock=Decimal("50"), store="retail",
+        )
+
+    def _checkout(self, qty, payment):
+        req = self.factory.post("/api/pos/checkout/", {
+            "items": [{"itemId": self.item.id, "quantity": qty, "price": 200}],
+            "payment": payment,
+            "paymentMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        resp = checkout(req)
+        self.assertEqual(resp.status_code, 201)
+        return Sale.objects.get(pk=resp.data["id"])
+
+    def _rows(self):
+        return list(
+            SalesDailyRollup.objects.filter(organization=self.org)
+            .order_by("status").values(*FIELDS)
+        )
+
+    def test_checkout_and_return_maintain_rollup(self):
+        self._checkout(2, {"cash": 500})               # 400 due, 100 change
+        sale = self._checkout(1, {"pos": 200})
+
+        self.assertEqual(self._rows(), [{
+            "status": "completed", "sale_count": 2, "revenue": Decimal("600.00"),
+            "cash": Decimal("400.00"), "pos": Decimal("200.00"),
+            "cash_count": 1, "pos_count": 1,
+        }])
+
+        req = self.factory.post(f"/api/pos/sales/{sale.pk}/return/", {
+            "saleItemId": sale.items.get().pk, "quantity": 1, "refundMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        self.assertEqual(return_item(req, pk=sale.pk).status_code, 200)
+
+        rows = self._rows()
+        self.assertEqual([(r["status"], r["sale_count"], r["revenue"]) for r in rows], [
+            ("completed", 1, Decimal("400.00")),
+            ("returned", 1, Decimal("200.00")),
+        ])
+
+        req = self.factory.get("/api/reports/sales/?period=today")
+        force_authenticate(req, user=self.user)
+        report = sales_report(req).data
+        self.assertEqual(report["totalRevenue"], 600.0)
+        self.assertEqual(report["totalSales"], 2)
+        self.assertEqual(report["paymentMethods"]["cash"], 400.0)
+        self.assertEqual(report["dailyBreakdown"],
+                         [{"date": str(timezone.localdate()), "revenue": 600.0}])
+
+        SalesDailyRollup.objects.all().delete()
+        self.assertEqual(rollups.rebuild(organization_id=self.org.pk), 2)
+        self.assertEqual(self._rows(), rows)
+
+    def test_item_rollup_feeds_item_reports(self):
+        idle = Item.objects.create(
+            organization=self.org, name="Zinc", price=Decimal("50"),
+            stock=Decimal("5"), store="retail",
+        )
+        sale = self._checkout(3, {"cash": 600})
+        req = self.factory.post(f"/api/pos/sales/{sale.pk}/return/", {
+            "saleItemId": sale.items.get().pk, "quantity": 1, "refundMethod": "cash",
+        }, format="json")
+        force_authenticate(req, user=self.user)
+        return_item(req, pk=sale.pk)
+
+        fields = ("item_key", "quantity", "revenue", "cost", "return_qty")
+        rows = list(ItemDailyRollup.objects.values(*fields))
+        self.assertEqual(rows, [{
+            "item_key": self.item.pk, "quantity": Decimal("3.00"),
+            "revenue": Decimal("600.00"), "cost": Decimal("360.00"),
+            "return_qty": Decimal("1.00"),
+        }])
+
+        req = self.factory.get("/api/reports/sales/?period=today")
+        force_authenticate(req, user=self.user)
+        top = sales_report(req).data["topItems"]
+        self.assertEqual([(t["itemId"], t["qty"], t["revenue"]) for t in top],
+                         [(self.item.pk, Decimal("3.00"), 600.0)])
+
+        req = self.factory.get("/api/reports/slow-movers/?period=today")
+        force_authenticate(req, user=self.user)
+        movers = slow_movers_report(req).data["items"]
+        self.assertEqual([m["id"] for m in movers], [idle.pk, self.item.pk])
+
+        req = self.factory.get("/api/reports/items/1/trend/?period=week")
+        force_authenticate(req, user=self.user)
+        trend = item_trend_report(req, pk=self.item.pk).data
+        self.assertEqual(len(trend["series"]), 7)
+        self.assertEqual(trend["series"][-1]["returnQty"], Decimal("1.00"))
+        self.assertEqual(trend["totalRevenue"], 600.0)
+
+        ItemDailyRollup.objects.all().delete()
+        self.assertEqual(rollups.rebuild_items(organization_id=self.org.pk), 1)
+        self.assertEqual(list(ItemDailyRollup.objects.values(*fields)), rows)
+
+    def _profit(self):
+        req = self.factory.get("/api/reports/profit/?period=today")
+        force_authenticate(req, user=self.user)
+        return profit_report(req).data
+
+    def test_profit_uses_cost_recorded_at_sale(self):
+        sale = self._checkout(2, {"cash": 400})
+        self.assertEqual(sale.items.get().unit_cost, Decimal("120.00"))
+
+        self.item.cost = Decimal("150")
+        self.item.save()
+        profit = self._profit()
+        self.assertEqual((profit["revenue"], profit["cost"], profit["estimated"]),
+                         (400.0, 240.0, False))
+
+        # Legacy line without a snapshot: backfilled from the current cost.
+        SaleItem.objects.update(unit_cost=None)
+        call_command("backfill_sale_item_cost", stdout=StringIO())
+        self.assertEqual(sale.items.get().unit_cost, Decimal("150.00"))
+        self.assertEqual(self._profit()["cost"], 300.0)
+
+    def test_sales_report_query_count_and_day_bounds(self):
+        self._checkout(1, {"cash": 200})
+        today = timezone.localdate()
+        # Rollup rows, top items, wallet top-ups, expenses.
+        with self.assertNumQueries(4):
+            data = _sales_report_data(self.org, "today", today, today)
+        self.assertEqual(data["totalRevenue"], 200.0)
+
+        lower, upper = local_day_bounds(date(2026, 3, 1), date(2026, 3, 1))
+        self.assertEqual(lower, datetime(2026, 2, 28, 23, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(upper, datetime(2026, 3, 1, 23, 0, tzinfo=dt_timezone.utc))
@@ -3,9 +3,14 @@ from . import views
 
 urlpatterns = [
     path('sales/',             views.sales_report,           name='report-sales'),
+    path('slow-movers/',       views.slow_movers_report,     name='report-slow-movers'),
+    path('items/<int:pk>/trend/', views.item_trend_report,   name='report-item-trend'),
     path('inventory/',         views.inventory_report,        name='report-inventory'),
     path('customers/',         views.customer_report,         name='report-customers'),
     path('profit/',            views.profit_report,           name='report-profit'),
     path('cashier-sales/',     views.cashier_sales_report,    name='report-cashier-sales'),
     path('staff-performance/', views.staff_performance,       name='report-staff-performance'),
+    path('jobs/',              views.report_jobs,             name='report-jobs'),
+    path('jobs/<int:pk>/',     views.report_job_detail,       name='report-job-detail'),
+    path('jobs/<int:pk>/result/', views.report_job_result,    name='report-job-result'),
 ]
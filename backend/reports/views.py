@@ -1,6 +1,8 @@
+import heapq
 from datetime import date, timedelta
 from decimal import Decimal
 from django.db import models as db_models
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import F, Value
 from django.db.models.functions import Greatest, Least
@@ -10,32 +12,19 @@ from rest_framework.response import Response
 
 from authapp.models import CommissionConfig
 from authapp.permissions import IsAdminOrManager, IsReportsUser, SENIOR_ROLES
-from authapp.utils import require_org
+from authapp.utils import local_day_bounds, require_org
 from customers.models import Customer, WalletTransaction
 from inventory.models import Item
-from pos.models import Cashier, Expense, Sale, SaleItem
+from pos.models import Cashier, Expense, Sale
 
+from .models import ItemDailyRollup, ReportJob, SalesDailyRollup
+from . import cache as report_cache
+from . import jobs as report_jobs_runner
+from . import rollups
+from .rollups import cash_applied as _cash_applied
 
-# ── Date range helper ─────────────────────────────────────────────────────────
-
-def _cash_applied():
-    """Cash actually applied to the sale, per row.
-
-    Legacy sales stored cash *tendered* (change not deducted), so summing
-    payment_cash raw overstates money kept. Change is given from cash, so cap
-    cash at total_amount minus the other payment methods, floored at 0.
-    New sales are already clamped at checkout; for them this is a no-op.
-    """
-    return Greatest(
-        Least(
-            F('payment_cash'),
-            F('total_amount') - F('payment_pos')
-            - F('payment_transfer') - F('payment_wallet'),
-        ),
-        Value(Decimal('0')),
-        output_field=db_models.DecimalField(),
-    )
 
+# ── Date range helper ─────────────────────────────────────────────────────────
 
 def _date_range(period: str):
     """
@@ -84,95 +73,76 @@ def _resolve_range(request, default='month'):
     return period, start, end
 
 
-# ── Sales report ──────────────────────────────────────────────────────────────
+def _cached(org, report, compute, **params):
+    """
+    Serve ``compute()`` through the versioned report cache (reports.cache).
+    Reports are org-wide today, hence branch=None; today's date is part of
+    every key because ranges and "today" figures roll at local midnight.
+    """
+    params.update(today=timezone.localdate(), branch=None)
+    return report_cache.get_or_compute(org.pk, report, params, compute)
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated, IsReportsUser])
-def sales_report(request):
-    """Aggregate sales for the given period. Admin / Manager only."""
-    org, err = require_org(request)
-    if err:
-        return err
 
-    period, start, end = _resolve_range(request)
+# ── Sales report ──────────────────────────────────────────────────────────────
 
-    all_sales = Sale.objects.filter(
-        organization=org,
-        created__date__gte=start,
-        created__date__lte=end,
+def _sales_report_data(org, period, start, end):
+    """Payload of sales_report for one organization and local-day range."""
+    # Sale totals come from the daily rollup — a few rows per day instead of
+    # every sale. One query covers the range plus today (todayPaymentMethods).
+    today = timezone.localdate()
+    rollup_rows = rollups.summed(
+        SalesDailyRollup.objects.filter(
+            db_models.Q(day__gte=start, day__lte=end) | db_models.Q(day=today),
+            organization=org,
+        ),
+        'day', 'is_wholesale', 'status',
     )
-    # Credit (insufficient-wallet) sales are tracked separately, not in the total.
-    credit_sales = all_sales.filter(status='credit')
-    credit_total = float(credit_sales.aggregate(t=db_models.Sum('total_amount'))['t'] or 0)
-    credit_count = credit_sales.count()
+    in_range = [r for r in rollup_rows if start <= r['day'] <= end]
+
+    def _total(rows, field):
+        return sum((r[field] for r in rows), Decimal('0'))
 
-    sales = all_sales.exclude(status='credit')
+    # Credit (insufficient-wallet) sales are tracked separately, not in the total.
+    credit_rows = [r for r in in_range if r['status'] == 'credit']
+    credit_total = float(_total(credit_rows, 'revenue'))
+    credit_count = int(_total(credit_rows, 'sale_count'))
 
-    retail_sales    = sales.filter(is_wholesale=False)
-    wholesale_sales = sales.filter(is_wholesale=True)
+    paid_rows = [r for r in in_range if r['status'] != 'credit']
 
-    total_retail = float(
-        retail_sales.aggregate(t=db_models.Sum('total_amount'))['t'] or 0
-    )
-    total_wholesale = float(
-        wholesale_sales.aggregate(t=db_models.Sum('total_amount'))['t'] or 0
-    )
+    total_retail = float(_total([r for r in paid_rows if not r['is_wholesale']], 'revenue'))
+    total_wholesale = float(_total([r for r in paid_rows if r['is_wholesale']], 'revenue'))
     total_revenue = total_retail + total_wholesale
 
     # Dispensed/sold quantities count EVERY sale regardless of payment method
     # or status (credit included) — this is what physically left the shelf.
     # Revenue stays money-accurate: credit sales are excluded so per-item
-    # revenue matches totalRevenue below. Use SaleItem.name (stored at
-    # checkout) so deleted items still appear.
-    dispensed_qty = {
-        (r['item_id'], r['name']): r['qty'] or 0
-        for r in (
-            SaleItem.objects
-            .filter(sale__in=all_sales)
-            .values('item_id', 'name')
-            .annotate(qty=db_models.Sum('quantity'))
-        )
-    }
-    item_revenue = {
-        (r['item_id'], r['name']): float(r['revenue'] or 0)
-        for r in (
-            SaleItem.objects
-            .filter(sale__in=sales)
-            .values('item_id', 'name')
-            .annotate(
-                revenue=db_models.Sum(
-                    db_models.ExpressionWrapper(
-                        db_models.F('quantity') * db_models.F('price'),
-                        output_field=db_models.FloatField(),
-                    )
-                ),
-            )
-        )
-    }
-
+    # revenue matches totalRevenue below. Keyed by SaleItem.name (stored at
+    # checkout) so deleted items still appear. Read from the item-day rollup.
     top_items = [
         {
-            'itemId':  item_id,
-            'name':    name or 'Unknown',
-            'qty':     qty,
-            'revenue': item_revenue.get((item_id, name), 0.0),
+            'itemId':  r['item_key'] or None,
+            'name':    r['name'] or 'Unknown',
+            'qty':     r['qty'] or 0,
+            'revenue': float(r['sold'] or 0),
         }
-        for (item_id, name), qty in sorted(
-            dispensed_qty.items(), key=lambda kv: kv[1], reverse=True
-        )[:10]
+        for r in (
+            ItemDailyRollup.objects
+            .filter(organization=org, day__gte=start, day__lte=end)
+            .values('item_key', 'name')
+            .annotate(qty=db_models.Sum('quantity'), sold=db_models.Sum('revenue'))
+            .order_by('-qty', 'name')[:10]
+        )
     ]
 
     # Daily breakdown for sparkline / bar charts
-    daily_qs = (
-        sales
-        .annotate(day=db_models.functions.TruncDate('created'))
-        .values('day')
-        .annotate(revenue=db_models.Sum('total_amount'))
-        .order_by('day')
-    )
+    daily_map = {}
+    for r in paid_rows:
+        day = daily_map.setdefault(r['day'], {'revenue': Decimal('0'), 'count': 0})
+        day['revenue'] += r['revenue']
+        day['count'] += r['sale_count']
     daily = [
-        {'date': str(r['day']), 'revenue': float(r['revenue'] or 0)}
-        for r in daily_qs
+        {'date': str(day), 'revenue': float(v['revenue'])}
+        for day, v in sorted(daily_map.items()) if v['count']
     ]
 
     # Money actually received. cash/pos/transfer come from sales AND from wallet
@@ -181,32 +151,28 @@ def sales_report(request):
     # already received at top-up, so counting it would double-count. Wallet
     # spends still contribute to totalRevenue above. The "wallet" bucket holds
     # only legacy top-ups recorded before a funding method was captured.
-    topups = WalletTransaction.objects.filter(
-        customer__organization=org, txn_type='topup'
-    )
-
-    def _topups_by_method(qs):
-        agg = {'cash': 0.0, 'pos': 0.0, 'transfer': 0.0, 'wallet': 0.0}
-        for r in qs.values('method').annotate(t=db_models.Sum('amount')):
-            m = r['method'] or ''
-            amt = float(r['t'] or 0)
-            agg[m if m in ('cash', 'pos', 'transfer') else 'wallet'] += amt
-        return agg
-
-    period_topups = _topups_by_method(
-        topups.filter(created__date__gte=start, created__date__lte=end)
-    )
-    today_topups = _topups_by_method(
-        topups.filter(created__date=timezone.localdate())
-    )
+    # Period and today in one conditional aggregation over raw created bounds.
+    lower, upper = local_day_bounds(start, end)
+    today_lower, today_upper = local_day_bounds(today, today)
+    in_period = db_models.Q(created__gte=lower, created__lt=upper)
+    in_today = db_models.Q(created__gte=today_lower, created__lt=today_upper)
+    period_topups = {'cash': 0.0, 'pos': 0.0, 'transfer': 0.0, 'wallet': 0.0}
+    today_topups = dict(period_topups)
+    for r in (
+        WalletTransaction.objects
+        .filter(in_period | in_today, customer__organization=org, txn_type='topup')
+        .values('method')
+        .annotate(
+            in_period=db_models.Sum('amount', filter=in_period),
+            in_today=db_models.Sum('amount', filter=in_today),
+        )
+    ):
+        m = r['method'] if r['method'] in ('cash', 'pos', 'transfer') else 'wallet'
+        period_topups[m] += float(r['in_period'] or 0)
+        today_topups[m] += float(r['in_today'] or 0)
 
     # Payment received per method (cash/pos/transfer) for the period.
-    pay = sales.aggregate(
-        cash=db_models.Sum(_cash_applied()),
-        pos=db_models.Sum('payment_pos'),
-        transfer=db_models.Sum('payment_transfer'),
-        wallet=db_models.Sum('payment_wallet'),
-    )
+    pay = {m: _total(paid_rows, m) for m in ('cash', 'pos', 'transfer', 'wallet')}
     payment_methods = {
         'cash':     round(float(pay['cash'] or 0) + period_topups['cash'], 2),
         'pos':      round(float(pay['pos'] or 0) + period_topups['pos'], 2),
@@ -215,13 +181,8 @@ def sales_report(request):
     }
 
     # Today's payments per method — always for the current day, independent of period.
-    today_pay = Sale.objects.filter(
-        organization=org, created__date=timezone.localdate(),
-    ).exclude(status='credit').aggregate(
-        cash=db_models.Sum(_cash_applied()),
-        pos=db_models.Sum('payment_pos'),
-        transfer=db_models.Sum('payment_transfer'),
-    )
+    today_rows = [r for r in rollup_rows if r['day'] == today and r['status'] != 'credit']
+    today_pay = {m: _total(today_rows, m) for m in ('cash', 'pos', 'transfer')}
     today_payment_methods = {
         'cash':     round(float(today_pay['cash'] or 0) + today_topups['cash'], 2),
         'pos':      round(float(today_pay['pos'] or 0) + today_topups['pos'], 2),
@@ -234,16 +195,13 @@ def sales_report(request):
     range_exp = (
         Expense.objects
         .filter(organization=org, date__gte=start, date__lte=end)
-        .values('payment_source')
-        .annotate(t=db_models.Sum('amount'))
+        .aggregate(
+            cash=db_models.Sum('amount', filter=db_models.Q(payment_source='cash')),
+            other=db_models.Sum('amount', filter=~db_models.Q(payment_source='cash')),
+        )
     )
-    exp_cash = exp_other = 0.0
-    for r in range_exp:
-        amt = float(r['t'] or 0)
-        if r['payment_source'] == 'cash':
-            exp_cash += amt
-        else:
-            exp_other += amt
+    exp_cash = float(range_exp['cash'] or 0)
+    exp_other = float(range_exp['other'] or 0)
 
     # The net card is labeled "Sales − Expenses" in the app, so it must
     # reconcile with totalRevenue exactly: cash is the applied (change-clamped)
@@ -264,7 +222,7 @@ def sales_report(request):
         'total': round(cash_sales + other_sales - exp_cash - exp_other, 2),
     }
 
-    return Response({
+    return {
         'period':         period,
         'dateFrom':       str(start),
         'dateTo':         str(end),
@@ -273,26 +231,137 @@ def sales_report(request):
         'totalWholesale': total_wholesale,
         'creditSales':    round(credit_total, 2),
         'creditCount':    credit_count,
-        'totalSales':     sales.count(),
+        'totalSales':     int(_total(paid_rows, 'sale_count')),
         'topItems':       top_items,
         'dailyBreakdown': daily,
         'paymentMethods': payment_methods,
         'todayPaymentMethods': today_payment_methods,
         'expenses': expenses,
         'net': net,
-    })
+    }
 
 
-# ── Inventory report ──────────────────────────────────────────────────────────
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsReportsUser])
+def sales_report(request):
+    """Aggregate sales for the given period. Admin / Manager only."""
+    org, err = require_org(request)
+    if err:
+        return err
+
+    period, start, end = _resolve_range(request)
+    return Response(_cached(
+        org, 'sales', lambda: _sales_report_data(org, period, start, end),
+        period=period, start=start, end=end,
+    ))
+
+
+# ── Item analytics ────────────────────────────────────────────────────────────
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsReportsUser])
-def inventory_report(request):
-    """Stock overview — Admin / Manager only."""
+def slow_movers_report(request):
+    """
+    Active in-stock items that sold the least in the period (unsold first).
+    Query params: ?period= or ?from=&to=, ?limit= (default 20, max 100).
+    """
+    org, err = require_org(request)
+    if err:
+        return err
+
+    period, start, end = _resolve_range(request)
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+    except (TypeError, ValueError):
+        limit = 20
+
+    sold = dict(
+        ItemDailyRollup.objects
+        .filter(organization=org, day__gte=start, day__lte=end, item_key__gt=0)
+        .values('item_key')
+        .annotate(qty=db_models.Sum('quantity'))
+        .values_list('item_key', 'qty')
+    )
+    items = Item.objects.filter(
+        organization=org, status='active', stock__gt=0,
+    ).values_list('id', 'name', 'stock', 'price', 'cost')
+    slowest = heapq.nsmallest(
+        limit, items, key=lambda i: (sold.get(i[0]) or 0, i[1].lower(), i[0]),
+    )
+
+    return Response({
+        'period':   period,
+        'dateFrom': str(start),
+        'dateTo':   str(end),
+        'items': [
+            {
+                'id':         pk,
+                'name':       name,
+                'stock':      stock,
+                'soldQty':    sold.get(pk) or 0,
+                'stockValue': round(float(stock * (cost or price or 0)), 2),
+            }
+            for pk, name, stock, price, cost in slowest
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsReportsUser])
+def item_trend_report(request, pk):
+    """
+    Daily quantity / revenue / returns of one item, zero-filled for charts.
+    Query params: ?period= or ?from=&to=
+    """
     org, err = require_org(request)
     if err:
         return err
 
+    period, start, end = _resolve_range(request)
+    name = Item.objects.filter(organization=org, pk=pk).values_list('name', flat=True).first()
+
+    rows = (
+        ItemDailyRollup.objects
+        .filter(organization=org, item_key=pk, day__gte=start, day__lte=end)
+        .values('day')
+        .annotate(
+            qty=db_models.Sum('quantity'),
+            sold=db_models.Sum('revenue'),
+            returned=db_models.Sum('return_qty'),
+        )
+    )
+    by_day = {r['day']: r for r in rows}
+    if name is None and not by_day:
+        return Response({'detail': 'Item not found.'}, status=404)
+
+    series = []
+    current = start
+    while current <= end:
+        r = by_day.get(current, {})
+        series.append({
+            'date':      str(current),
+            'qty':       r.get('qty') or 0,
+            'revenue':   float(r.get('sold') or 0),
+            'returnQty': r.get('returned') or 0,
+        })
+        current += timedelta(days=1)
+
+    return Response({
+        'itemId':       pk,
+        'name':         name or '',
+        'period':       period,
+        'dateFrom':     str(start),
+        'dateTo':       str(end),
+        'totalQty':     sum(r['qty'] for r in series),
+        'totalRevenue': round(sum(r['revenue'] for r in series), 2),
+        'series':       series,
+    })
+
+
+# ── Inventory report ──────────────────────────────────────────────────────────
+
+def _inventory_report_data(org):
+    """Payload of inventory_report."""
     items     = Item.objects.filter(organization=org)
     low_stock = items.filter(stock__lte=db_models.F('low_stock_threshold'))
 
@@ -347,7 +416,7 @@ def inventory_report(request):
         for i in expiring
     ]
 
-    return Response({
+    return {
         'totalItems':    items.count(),
         'activeItems':   items.filter(status='active').count(),
         'lowStockCount': low_stock.count(),
@@ -355,19 +424,24 @@ def inventory_report(request):
         'costValue':     round(cost_value, 2),
         'lowStockItems': low_stock_items,
         'expiringItems': expiring_items,
-    })
-
+    }
 
-# ── Customer report ───────────────────────────────────────────────────────────
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsReportsUser])
-def customer_report(request):
-    """Customer analytics — Admin / Manager only."""
+def inventory_report(request):
+    """Stock overview — Admin / Manager only."""
     org, err = require_org(request)
     if err:
         return err
 
+    return Response(_cached(org, 'inventory', lambda: _inventory_report_data(org)))
+
+
+# ── Customer report ───────────────────────────────────────────────────────────
+
+def _customer_report_data(org):
+    """Payload of customer_report."""
     all_customers = Customer.objects.filter(organization=org)
 
     top_customers_qs = (
@@ -391,45 +465,42 @@ def customer_report(request):
         all_customers.aggregate(d=db_models.Sum('outstanding_debt'))['d'] or 0
     )
 
-    return Response({
+    return {
         'total':        all_customers.count(),
         'retail':       all_customers.filter(is_wholesale=False).count(),
         'wholesale':    all_customers.filter(is_wholesale=True).count(),
         'totalDebt':    round(total_debt, 2),
         'topCustomers': top_customers,
-    })
+    }
 
 
-# ── Profit report ─────────────────────────────────────────────────────────────
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsReportsUser])
-def profit_report(request):
-    """Profit & margin analytics — Admin / Manager only."""
+def customer_report(request):
+    """Customer analytics — Admin / Manager only."""
     org, err = require_org(request)
     if err:
         return err
 
-    period, start, end = _resolve_range(request)
+    return Response(_cached(org, 'customers', lambda: _customer_report_data(org)))
 
-    sales = Sale.objects.filter(
-        organization=org,
-        created__date__gte=start,
-        created__date__lte=end,
-    ).exclude(status='credit')
-    revenue = float(sales.aggregate(t=db_models.Sum('total_amount'))['t'] or 0)
-
-    cogs_result = SaleItem.objects.filter(
-        sale__in=sales,
-        item__isnull=False,
-        item__cost__gt=0,
-    ).aggregate(
-        total_cost=db_models.Sum(
-            db_models.ExpressionWrapper(
-                db_models.F('quantity') * F('item__cost'),
-                output_field=db_models.FloatField(),
-            )
-        )
+
+# ── Profit report ─────────────────────────────────────────────────────────────
+
+def _profit_report_data(org, period, start, end):
+    """Payload of profit_report for one organization and local-day range."""
+    # Both sides come from the daily rollups: revenue excludes credit sales,
+    # and cost is the unit cost recorded on each non-credit sale line.
+    revenue = float(
+        SalesDailyRollup.objects
+        .filter(organization=org, day__gte=start, day__lte=end)
+        .exclude(status='credit')
+        .aggregate(t=db_models.Sum('revenue'))['t'] or 0
+    )
+    cogs_result = (
+        ItemDailyRollup.objects
+        .filter(organization=org, day__gte=start, day__lte=end)
+        .aggregate(total_cost=db_models.Sum('cost'))
     )
     cogs = float(cogs_result['total_cost'] or 0)
 
@@ -444,7 +515,7 @@ def profit_report(request):
         margin    = 30.0
         estimated = True   # no item cost data — margin is an estimate
 
-    return Response({
+    return {
         'period':    period,
         'dateFrom':  str(start),
         'dateTo':    str(end),
@@ -453,7 +524,22 @@ def profit_report(request):
         'profit':    round(profit, 2),
         'margin':    round(margin, 1),
         'estimated': estimated,
-    })
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsReportsUser])
+def profit_report(request):
+    """Profit & margin analytics — Admin / Manager only."""
+    org, err = require_org(request)
+    if err:
+        return err
+
+    period, start, end = _resolve_range(request)
+    return Response(_cached(
+        org, 'profit', lambda: _profit_report_data(org, period, start, end),
+        period=period, start=start, end=end,
+    ))
 
 
 # ── Monthly summary ───────────────────────────────────────────────────────────
@@ -481,25 +567,15 @@ def monthly_report(request):
     start = date(year, month, 1)
     end   = date(year, month, last_day)
 
-    sales = Sale.objects.filter(
-        organization=org,
-        created__date__gte=start,
-        created__date__lte=end,
-    ).exclude(status='credit')
-
-    daily_qs = (
-        sales
-        .annotate(day=db_models.functions.TruncDate('created'))
-        .values('day')
-        .annotate(
-            revenue=db_models.Sum('total_amount'),
-            count=db_models.Count('id'),
-        )
-        .order_by('day')
+    rows = rollups.summed(
+        SalesDailyRollup.objects
+        .filter(organization=org, day__gte=start, day__lte=end)
+        .exclude(status='credit'),
+        'day',
     )
     daily_map = {
-        str(r['day']): {'revenue': float(r['revenue'] or 0), 'count': r['count']}
-        for r in daily_qs
+        str(r['day']): {'revenue': float(r['revenue']), 'count': r['sale_count']}
+        for r in rows if r['sale_count']
     }
 
     # Continuous series (zero-fill days with no sales)
@@ -514,41 +590,29 @@ def monthly_report(request):
     return Response({
         'year':         year,
         'month':        month,
-        'totalRevenue': round(float(sales.aggregate(t=db_models.Sum('total_amount'))['t'] or 0), 2),
-        'totalSales':   sales.count(),
+        'totalRevenue': round(float(sum(r['revenue'] for r in rows)), 2),
+        'totalSales':   sum(r['sale_count'] for r in rows),
         'dailySeries':  full_series,
     })
 
 
 # ── Cashier / staff daily sales ───────────────────────────────────────────────
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def cashier_sales_report(request):
-    """
-    Daily sales processed by cashier/staff.
-    - Any authenticated user sees their own data.
-    - Admin / Manager / Wholesale Manager can see all users (is_admin_view=true)
-      or filter by ?user_id=<id>.
-    """
-    org, err = require_org(request)
-    if err:
-        return err
-
-    period, start, end = _resolve_range(request, default='today')
+def _cashier_sales_data(org, user, period, start, end, user_id_param=None):
+    """Payload of cashier_sales_report as seen by ``user``."""
+    lower, upper = local_day_bounds(start, end)
 
-    is_senior = request.user.role in ('Admin', 'Manager', 'Wholesale Manager')
+    is_senior = user.role in ('Admin', 'Manager', 'Wholesale Manager')
 
     base_qs = Sale.objects.filter(
         organization=org,
-        created__date__gte=start,
-        created__date__lte=end,
+        created__gte=lower,
+        created__lt=upper,
         status__in=['completed', 'partial_return'],
         dispenser__isnull=False,
     )
 
     if is_senior:
-        user_id_param = request.query_params.get('user_id')
         if user_id_param:
             try:
                 uid = int(user_id_param)
@@ -561,7 +625,7 @@ def cashier_sales_report(request):
             sales_qs = base_qs
             is_admin_view = True
     else:
-        sales_qs = base_qs.filter(dispenser=request.user)
+        sales_qs = base_qs.filter(dispenser=user)
         is_admin_view = False
 
     user_stats = (
@@ -607,7 +671,7 @@ def cashier_sales_report(request):
             'walletAmount':   round(float(u['wallet_amount'] or 0), 2),
         })
 
-    return Response({
+    return {
         'period':      period,
         'dateFrom':    str(start),
         'dateTo':      str(end),
@@ -615,7 +679,27 @@ def cashier_sales_report(request):
         'totalAmount': round(grand_total, 2),
         'totalSales':  grand_count,
         'users':       users,
-    })
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cashier_sales_report(request):
+    """
+    Daily sales processed by cashier/staff.
+    - Any authenticated user sees their own data.
+    - Admin / Manager / Wholesale Manager can see all users (is_admin_view=true)
+      or filter by ?user_id=<id>.
+    """
+    org, err = require_org(request)
+    if err:
+        return err
+
+    period, start, end = _resolve_range(request, default='today')
+    return Response(_cashier_sales_data(
+        org, request.user, period, start, end,
+        user_id_param=request.query_params.get('user_id'),
+    ))
 
 
 # ── Staff performance / commissions ───────────────────────────────────────────
@@ -629,11 +713,12 @@ def staff_performance(request):
         return err
 
     period, start, end = _resolve_range(request, default='today')
+    lower, upper = local_day_bounds(start, end)
 
     sales_qs = Sale.objects.filter(
         organization=org,
-        created__date__gte=start,
-        created__date__lte=end,
+        created__gte=lower,
+        created__lt=upper,
         status__in=['completed', 'partial_return'],
         dispenser__isnull=False,
     )
@@ -742,3 +827,110 @@ def commission_config_detail(request, user_id):
 
     cfg.save()
     return Response(cfg.to_api_dict())
+
+
+# ── Background report jobs ────────────────────────────────────────────────────
+
+# report name → (needs IsReportsUser, compute(job) → payload)
+_JOB_REPORTS = {
+    'sales': (True, lambda job, period, start, end:
+              _sales_report_data(job.organization, period, start, end)),
+    'profit': (True, lambda job, period, start, end:
+               _profit_report_data(job.organization, period, start, end)),
+    'cashier-sales': (False, lambda job, period, start, end: _cashier_sales_data(
+        job.organization, job.requested_by, period, start, end,
+        user_id_param=job.params.get('userId'))),
+}
+
+
+def _compute_job(job):
+    _, compute = _JOB_REPORTS[job.report]
+    params = job.params
+    start = date.fromisoformat(params['from'])
+    end = date.fromisoformat(params['to'])
+    return compute(job, params.get('period') or 'custom', start, end)
+
+
+def _job_range(data):
+    """(period, start, end) from a job body: from/to (yyyy-mm-dd) or period."""
+    f, t = data.get('from'), data.get('to')
+    if f or t:
+        start = date.fromisoformat(str(f))
+        end = date.fromisoformat(str(t))
+        if start > end:
+            start, end = end, start
+        return 'custom', start, end
+    period = data.get('period') or 'month'
+    start, end = _date_range(period)
+    return period, start, end
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def report_jobs(request):
+    """
+    GET  — the caller's recent report jobs.
+    POST — {"report": "sales"|"profit"|"cashier-sales", "from", "to"
+           | "period", "userId"?} → 202 with the queued job.
+    """
+    org, err = require_org(request)
+    if err:
+        return err
+
+    if request.method == 'GET':
+        jobs = ReportJob.objects.filter(organization=org, requested_by=request.user)
+        report_jobs_runner.fail_stale_jobs(jobs)
+        jobs = jobs[:20]
+        return Response([j.to_api_dict() for j in jobs])
+
+    report = request.data.get('report')
+    if report not in _JOB_REPORTS:
+        return Response({'detail': f'report must be one of: {", ".join(_JOB_REPORTS)}.'},
+                        status=400)
+    needs_reports, _ = _JOB_REPORTS[report]
+    if needs_reports and not IsReportsUser().has_permission(request, None):
+        return Response({'detail': IsReportsUser.message}, status=403)
+    try:
+        period, start, end = _job_range(request.data)
+    except ValueError:
+        return Response({'detail': 'from and to must be dates (yyyy-mm-dd).'}, status=400)
+
+    params = {'period': period, 'from': str(start), 'to': str(end)}
+    if request.data.get('userId') not in (None, ''):
+        params['userId'] = str(request.data['userId'])
+    job = ReportJob.objects.create(
+        organization=org, requested_by=request.user, report=report,
+        params=params, expires_at=report_jobs_runner.expiry(),
+    )
+    report_jobs_runner.enqueue(job, _compute_job)
+    job.refresh_from_db()
+    return Response(job.to_api_dict(), status=202)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_job_detail(request, pk):
+    """Poll one of the caller's report jobs."""
+    org, err = require_org(request)
+    if err:
+        return err
+    job = get_object_or_404(ReportJob, pk=pk, organization=org, requested_by=request.user)
+    return Response(report_jobs_runner.check_stale(job).to_api_dict())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_job_result(request, pk):
+    """The finished payload; 409 while pending/running or failed, 410 once expired."""
+    org, err = require_org(request)
+    if err:
+        return err
+    job = report_jobs_runner.check_stale(
+        get_object_or_404(ReportJob, pk=pk, organization=org, requested_by=request.user))
+    if job.expires_at <= timezone.now():
+        return Response({'detail': 'This report has expired. Please run it again.'},
+                        status=410)
+    if job.status != ReportJob.STATUS_DONE:
+        return Response({'detail': job.error or 'The report is not ready yet.',
+                         'status': job.status}, status=409)
+    return Response(job.result)
@@ -0,0 +1,56 @@
+"""
+Cached subscription status per organization.
+
+authapp.permissions.OrgSubscriptionPermission runs on every API request; it
+reads the status from here instead of dereferencing ``org.subscription``:
+
+    subscription:status:<org id>  →  status string ('' = no subscription row)
+
+Subscription.save() / delete() call ``invalidate(org_id)``, which deletes the
+entry immediately and, once the write commits, stores the committed status.
+Readers only ever *add* the entry, so a request that re-read the old row while
+the write was in flight cannot overwrite it: a suspension is seen by the very
+next request. Every status change (app upgrade/cancel, superuser endpoints,
+admin actions, expire_trials) goes through save().
+SUBSCRIPTION_STATUS_CACHE_TIMEOUT only bounds how long an entry can outlive a
+write that bypasses save().
+
+The entry must be shared by every worker; prod.py configures a shared cache.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+_KEY = 'subscription:status:{}'
+
+
+def _timeout():
+    return getattr(settings, 'SUBSCRIPTION_STATUS_CACHE_TIMEOUT', 60)
+
+
+def get_status(org_id):
+    """Subscription status of ``org_id``, or None when it has no subscription."""
+    key = _KEY.format(org_id)
+    status = cache.get(key)
+    if status is None:
+        status = _stored_status(org_id)
+        cache.add(key, status, _timeout())
+    return status or None
+
+
+def _stored_status(org_id):
+    from .models import Subscription
+
+    return (
+        Subscription.objects.filter(organization_id=org_id)
+        .values_list('status', flat=True).first()
+    ) or ''
+
+
+def invalidate(org_id):
+    """Drop the cached status of ``org_id`` now; store the committed one on commit."""
+    if not org_id:
+        return
+    key = _KEY.format(org_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.set(key, _stored_status(org_id), _timeout()))
@@ -418,6 +418,15 @@ class Subscription(models.Model):
     def save(self, *args, **kwargs):
         self.refresh_status()
         super().save(*args, **kwargs)
+        from .cache import invalidate
+        invalidate(self.organization_id)
+
+    def delete(self, *args, **kwargs):
+        org_id = self.organization_id
+        result = super().delete(*args, **kwargs)
+        from .cache import invalidate
+        invalidate(org_id)
+        return result
 
     # ── Usage snapshot ────────────────────────────────────────────────────────
 
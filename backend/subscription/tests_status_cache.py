@@ -0,0 +1,67 @@
+"""
+Cached subscription status in OrgSubscriptionPermission.
+
+Verifies:
+- After the first request the status is served from the cache: no
+  subscription query runs.
+- Suspending or reactivating through Subscription.save() takes effect on the
+  very next request.
+- A status read from the old row while a suspension was in flight cannot
+  outlive the commit.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from authapp.models import Organization, PharmUser
+from authapp.permissions import OrgSubscriptionPermission
+from subscription.models import Subscription
+
+
+class SubscriptionStatusCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.org = Organization.objects.create(name="Sub Pharmacy")
+        self.user = PharmUser.objects.create_user(
+            phone_number="08000000021", password="pass1234", role="Admin",
+            organization=self.org,
+        )
+        self.sub = Subscription.get_or_create_trial(self.org)
+
+    def _allowed(self):
+        req = self.factory.get("/api/pos/sales/")
+        force_authenticate(req, user=self.user)
+        request = APIView().initialize_request(req)
+        return OrgSubscriptionPermission().has_permission(request, None)
+
+    def test_status_cached_and_invalidated_on_save(self):
+        self.assertTrue(self._allowed())
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(self._allowed())
+        self.assertFalse([q for q in ctx.captured_queries
+                          if "subscription_subscription" in q["sql"]])
+
+        self.sub.status = "suspended"
+        self.sub.save()
+        with self.assertRaises(PermissionDenied) as denied:
+            self._allowed()
+        self.assertEqual(denied.exception.detail["code"], "org_suspended")
+
+        self.sub.status = "active"
+        self.sub.plan = "starter"
+        self.sub.save()
+        self.assertTrue(self._allowed())
+
+    def test_in_flight_read_cannot_keep_a_stale_status(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sub.status = "suspended"
+            self.sub.save()
+        # Another worker read the row before the commit and stores it late.
+        self.assertFalse(cache.add(f"subscription:status:{self.org.pk}", "active"))
+        with self.assertRaises(PermissionDenied):
+            self._allowed()
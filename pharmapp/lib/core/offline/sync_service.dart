@@ -1,3 +1,5 @@
+import 'dart:math';
+
 import 'package:dio/dio.dart';
 import 'package:flutter_riverpod/flutter_riverpod.dart';
 import 'package:shared_preferences/shared_preferences.dart';
@@ -29,6 +31,10 @@ const _kSyncCacheKeys = [
   'cache_notifications',
 ];
 
+/// Mutations sent per `POST /sync/batch/` — must not exceed the backend's
+/// SYNC_BATCH_MAX_OPERATIONS.
+const _kSyncBatchSize = 100;
+
 /// Sync result summary returned by [SyncService.syncAll].
 class SyncResult {
   final int salesSynced;
@@ -99,6 +105,7 @@ class SyncService {
                 CheckoutPayload.fromJson(sale.payload),
                 consultationFee:
                     (sale.payload['consultationFee'] as num?)?.toDouble(),
+                idempotencyKey: 'sale-${sale.id}',
               );
           // Remove local dispensing entries created while the sale was offline
           // to prevent them showing alongside the just-synced backend record.
@@ -129,8 +136,31 @@ class SyncService {
 
       // ── 2. Sync generic mutations ────────────────────────────────────────
       if (!connectionFailed && !authExpired) {
-        final mutationQueue = ref.read(offlineMutationQueueProvider);
-        for (final mut in List<PendingMutation>.from(mutationQueue)) {
+        final mutationQueue =
+            List<PendingMutation>.from(ref.read(offlineMutationQueueProvider));
+        var batched = false;
+        if (mutationQueue.isNotEmpty) {
+          try {
+            final outcome = await _syncMutationsBatch(mutationQueue);
+            mutationsSynced += outcome.synced;
+            failedMutations += outcome.failed;
+            batched = true;
+          } on DioException catch (e) {
+            if (e.response?.statusCode == 401) {
+              authExpired = true;
+            } else if (e.response == null) {
+              connectionFailed = true;
+              connectionErrorDetail ??= _describeConnectionError(e);
+            }
+            // Any other status (e.g. 404 from a backend without the batch
+            // endpoint) falls back to one request per mutation below. The
+            // idempotency keys make re-sending already-applied entries safe.
+          }
+        }
+        final pending = batched || connectionFailed || authExpired
+            ? const <PendingMutation>[]
+            : ref.read(offlineMutationQueueProvider);
+        for (final mut in List<PendingMutation>.from(pending)) {
           try {
             await _syncMutation(mut);
             await ref.read(offlineMutationQueueProvider.notifier).remove(mut.id);
@@ -194,6 +224,48 @@ class SyncService {
     }
   }
 
+  /// Replay queued mutations through `POST /sync/batch/` — one round trip per
+  /// [_kSyncBatchSize] mutations instead of one per mutation.
+  ///
+  /// Entries are applied independently and in queue order; each one carries
+  /// its [PendingMutation.id] as the idempotency key. Applied entries (2xx)
+  /// are removed from the queue, the rest get an attempt mark.
+  Future<({int synced, int failed})> _syncMutationsBatch(
+      List<PendingMutation> queue) async {
+    final dio = ref.read(dioProvider);
+    final notifier = ref.read(offlineMutationQueueProvider.notifier);
+    int synced = 0, failed = 0;
+    for (var start = 0; start < queue.length; start += _kSyncBatchSize) {
+      final chunk =
+          queue.sublist(start, min(start + _kSyncBatchSize, queue.length));
+      final res = await dio.post('/sync/batch/', data: {
+        'atomic': false,
+        'operations': [
+          for (final mut in chunk)
+            {
+              'method': mut.method,
+              'path': mut.path,
+              'body': mut.body,
+              'idempotency_key': mut.id,
+            },
+        ],
+      });
+      final results = (res.data['results'] as List).cast<Map>();
+      for (final r in results) {
+        final mut = chunk[(r['index'] as num).toInt()];
+        final code = (r['status'] as num).toInt();
+        if (code >= 200 && code < 300) {
+          await notifier.remove(mut.id);
+          synced++;
+        } else {
+          await notifier.markAttempt(mut.id);
+          failed++;
+        }
+      }
+    }
+    return (synced: synced, failed: failed);
+  }
+
   /// Replay a single mutation against the backend.
   ///
   /// The mutation's stable [PendingMutation.id] is sent as the
@@ -206,18 +278,19 @@ class SyncService {
       throw ArgumentError('Rejected mutation with non-relative path: ${mut.path}');
     }
     final dio = ref.read(dioProvider);
+    final options = Options(headers: {'Idempotency-Key': mut.id});
     switch (mut.method) {
       case 'POST':
-        await dio.post(mut.path, data: mut.body);
+        await dio.post(mut.path, data: mut.body, options: options);
         break;
       case 'PATCH':
-        await dio.patch(mut.path, data: mut.body);
+        await dio.patch(mut.path, data: mut.body, options: options);
         break;
       case 'PUT':
-        await dio.put(mut.path, data: mut.body);
+        await dio.put(mut.path, data: mut.body, options: options);
         break;
       case 'DELETE':
-        await dio.delete(mut.path);
+        await dio.delete(mut.path, options: options);
         break;
       default:
         throw UnsupportedError('Unsupported HTTP method: ${mut.method}');
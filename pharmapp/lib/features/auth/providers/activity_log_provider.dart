@@ -44,6 +44,8 @@ class ActivityLogState {
   final bool hasMore;
   final String? error;
   final ActivityLogFilter filter;
+  /// Server cursor for the page after [logs]; null before the first page.
+  final String? nextCursor;
 
   const ActivityLogState({
     this.logs = const [],
@@ -51,6 +53,7 @@ class ActivityLogState {
     this.hasMore = true,
     this.error,
     this.filter = const ActivityLogFilter(),
+    this.nextCursor,
   });
 
   ActivityLogState copyWith({
@@ -59,6 +62,7 @@ class ActivityLogState {
     bool? hasMore,
     String? error,
     ActivityLogFilter? filter,
+    String? nextCursor,
   }) {
     return ActivityLogState(
       logs: logs ?? this.logs,
@@ -66,6 +70,7 @@ class ActivityLogState {
       hasMore: hasMore ?? this.hasMore,
       error: error,
       filter: filter ?? this.filter,
+      nextCursor: nextCursor ?? this.nextCursor,
     );
   }
 }
@@ -88,12 +93,14 @@ class ActivityLogNotifier extends StateNotifier<ActivityLogState> {
     state = state.copyWith(isLoading: true, error: null, filter: filter);
 
     try {
-      final fetched = await _fetchPage(filter);
+      final (fetched, next) =
+          await _fetchPage(filter, reset ? '' : state.nextCursor ?? '');
       state = state.copyWith(
         logs: [...logs, ...fetched],
         isLoading: false,
-        hasMore: fetched.length >= 30,
+        hasMore: next != null,
         filter: filter,
+        nextCursor: next,
       );
     } catch (e) {
       state = state.copyWith(
@@ -120,12 +127,14 @@ class ActivityLogNotifier extends StateNotifier<ActivityLogState> {
     fetch();
   }
 
-  Future<List<ActivityLog>> _fetchPage(ActivityLogFilter filter) async {
+  /// One page of entries and the cursor of the next page (null = last page).
+  Future<(List<ActivityLog>, String?)> _fetchPage(
+      ActivityLogFilter filter, String cursor) async {
     final dio = _dio;
-    if (dio == null) return const [];
+    if (dio == null) return (const <ActivityLog>[], null);
 
     final params = <String, dynamic>{
-      'page': filter.page,
+      'cursor': cursor,
       'page_size': 30,
       if (filter.category != 'all') 'category': filter.category,
       if (filter.search.isNotEmpty) 'search': filter.search,
@@ -135,16 +144,21 @@ class ActivityLogNotifier extends StateNotifier<ActivityLogState> {
       final res = await dio.get('/auth/activity-log/', queryParameters: params);
       final data = res.data;
       List<dynamic> results;
+      String? next;
       if (data is Map) {
         results = (data['results'] ?? data['logs'] ?? []) as List<dynamic>;
+        next = data['next'] as String?;
       } else if (data is List) {
         results = data;
       } else {
         results = [];
       }
-      return results
-          .map((e) => ActivityLog.fromJson(e as Map<String, dynamic>))
-          .toList();
+      return (
+        results
+            .map((e) => ActivityLog.fromJson(e as Map<String, dynamic>))
+            .toList(),
+        next,
+      );
     } on DioException catch (e) {
       final body = e.response?.data;
       if (body is Map) throw Exception(body['detail'] ?? 'Failed to load activity log');
@@ -50,6 +50,7 @@ class PosApiClient {
     double? hmoAmount,
     String? hmoProvider,
     double? consultationFee,
+    String? idempotencyKey,
   }) async {
     if (_isLocal) {
       // Explicitly deep-serialize nested models — freezed toJson() does not
@@ -80,7 +81,15 @@ class PosApiClient {
           if (hmoProvider != null) 'hmo_provider': hmoProvider,
         },
       };
-      final res = await _dio!.post('/pos/checkout/', data: body);
+      final res = await _dio!.post(
+        '/pos/checkout/',
+        data: body,
+        // Lets the backend return the original receipt if this replay already
+        // went through before the connection dropped.
+        options: idempotencyKey != null
+            ? Options(headers: {'Idempotency-Key': idempotencyKey})
+            : null,
+      );
       return res.data as Map<String, dynamic>;
     } on DioException catch (e) {
       // No response means a connection-level failure (no internet, timeout, etc.).